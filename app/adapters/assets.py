@@ -3,16 +3,24 @@ import logging
 import httpx
 
 from app import settings
+from app import state
+from app.adapters.http import InstrumentedTransport
 
-assets_service_http_client = httpx.AsyncClient(
-    base_url=settings.ASSETS_SERVICE_BASE_URL,
-    headers={"X-Api-Key": settings.ASSETS_SERVICE_API_KEY},
-)
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=settings.ASSETS_SERVICE_BASE_URL,
+        headers={"X-Api-Key": settings.ASSETS_SERVICE_API_KEY},
+        transport=InstrumentedTransport(
+            client_name="assets",
+            propagate_trace_context=True,
+        ),
+    )
 
 
 async def delete_avatar_by_user_id(user_id: int) -> None:
     try:
-        response = await assets_service_http_client.delete(
+        response = await state.assets_service_http_client.delete(
             f"/api/v1/users/{user_id}/avatar",
         )
         if response.status_code == 404:
@@ -1,15 +1,110 @@
+import asyncio
+import io
 import logging
+import time
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
 from typing import Any
 
+from opentelemetry.trace import Span
+from opentelemetry.trace import SpanKind
+from opentelemetry.trace import Status
+from opentelemetry.trace import StatusCode
+
+from app import metrics
 from app import settings
 from app import state
+from app import tracing
+
+if TYPE_CHECKING:
+    from aiobotocore.response import StreamingBody
+    from botocore.model import OperationModel
+    from types_aiobotocore_s3.client import S3Client
+    from types_aiobotocore_s3.type_defs import CompletedPartTypeDef
+
+STREAMING_READ_CHUNK_SIZE = 1024 * 1024
+
+# S3 requires all parts of a multipart upload but the last to be >= 5MiB
+MULTIPART_UPLOAD_PART_SIZE = 8 * 1024 * 1024
+MULTIPART_UPLOAD_CONCURRENCY = 4
+
+DELETE_OBJECTS_MAX_ATTEMPTS = 3
+DELETE_OBJECTS_CONCURRENCY = 4
+
+
+def register_instrumentation_handlers(s3_client: "S3Client") -> None:
+    """\
+    Record and trace the time taken to receive the response to each of the
+    client's requests. Reading streamed response bodies is not included.
+    """
+    s3_client.meta.events.register("before-call.s3", _start_request)
+    s3_client.meta.events.register("after-call.s3", _finish_request)
+    s3_client.meta.events.register("after-call-error.s3", _finish_request)
+
+
+def _start_request(
+    model: "OperationModel",
+    context: dict[str, Any],
+    **kwargs: Any,
+) -> None:
+    context["instrumentation_operation"] = model.name
+    context["instrumentation_span"] = tracing.tracer.start_span(
+        f"S3 {model.name}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "rpc.system": "aws-api",
+            "rpc.service": "S3",
+            "rpc.method": model.name,
+        },
+    )
+    context["instrumentation_start"] = time.perf_counter()
+
+
+def _finish_request(
+    context: dict[str, Any],
+    exception: Exception | None = None,
+    **kwargs: Any,
+) -> None:
+    start = context.pop("instrumentation_start", None)
+    if start is None:
+        return None
 
+    metrics.S3_REQUEST_DURATION.labels(context["instrumentation_operation"]).observe(
+        time.perf_counter() - start,
+    )
 
-async def get_object_data(key: str) -> bytes | None:
+    span: Span = context.pop("instrumentation_span")
+    if exception is not None:
+        span.record_exception(exception)
+        span.set_status(Status(StatusCode.ERROR))
+    span.end()
+
+
+def _make_range_header(byte_range: tuple[int, int]) -> str:
+    start, end = byte_range
+    return f"bytes={start}-{end}"
+
+
+async def get_object_data(
+    key: str,
+    *,
+    byte_range: tuple[int, int] | None = None,
+) -> bytes | None:
+    """\
+    Fetch an object's data, or only the (inclusive) `byte_range` of it.
+
+    The whole response is read into memory; prefer `iter_object_data`
+    for large objects.
+    """
     try:
+        params: dict[str, Any] = {}
+        if byte_range is not None:
+            params["Range"] = _make_range_header(byte_range)
+
         s3_object = await state.s3_client.get_object(
             Bucket=settings.AWS_S3_BUCKET_NAME,
             Key=key,
+            **params,
         )
     except state.s3_client.exceptions.NoSuchKey:
         return None
@@ -24,6 +119,50 @@ async def get_object_data(key: str) -> bytes | None:
     return await s3_object["Body"].read()
 
 
+async def iter_object_data(
+    key: str,
+    *,
+    byte_range: tuple[int, int] | None = None,
+    chunk_size: int = STREAMING_READ_CHUNK_SIZE,
+) -> AsyncIterator[bytes] | None:
+    """\
+    Stream an object's data, or only the (inclusive) `byte_range` of it,
+    in chunks of up to `chunk_size` bytes. Returns None if the object
+    does not exist, or could not be fetched.
+    """
+    try:
+        params: dict[str, Any] = {}
+        if byte_range is not None:
+            params["Range"] = _make_range_header(byte_range)
+
+        s3_object = await state.s3_client.get_object(
+            Bucket=settings.AWS_S3_BUCKET_NAME,
+            Key=key,
+            **params,
+        )
+    except state.s3_client.exceptions.NoSuchKey:
+        return None
+    except Exception:
+        logging.exception(
+            "Unexpected error when fetching object data from S3",
+            exc_info=True,
+            extra={"object_key": key},
+        )
+        return None
+
+    return _iter_body_chunks(s3_object["Body"], chunk_size)
+
+
+async def _iter_body_chunks(
+    body: "StreamingBody",
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    # the connection is released even if the consumer stops early
+    async with body:
+        async for chunk in body.iter_chunks(chunk_size):
+            yield chunk
+
+
 async def save_object_data(
     key: str,
     data: bytes,
@@ -50,6 +189,142 @@ async def save_object_data(
         return None
 
 
+async def save_object_data_from_stream(
+    key: str,
+    chunks: AsyncIterator[bytes],
+    *,
+    content_type: str | None = None,
+) -> bool:
+    """\
+    Save an object's data from a stream of chunks, using a multipart upload.
+
+    Parts are uploaded concurrently while the stream is read. Part buffers
+    are taken from a fixed-size pool, so at most a few parts' worth of data
+    is held in memory, and reading is paused while all buffers are in use.
+    If the upload fails, it is aborted, and no object is created. Returns
+    whether the object was saved.
+    """
+    try:
+        params: dict[str, Any] = {}
+        if content_type is not None:
+            params["ContentType"] = content_type
+
+        multipart_upload = await state.s3_client.create_multipart_upload(
+            Bucket=settings.AWS_S3_BUCKET_NAME,
+            Key=key,
+            **params,
+        )
+    except Exception:
+        logging.exception(
+            "Unexpected error when creating multipart upload to S3",
+            exc_info=True,
+            extra={"object_key": key},
+        )
+        return False
+
+    upload_id = multipart_upload["UploadId"]
+
+    # one buffer per concurrent upload, plus one being filled
+    buffer_pool: asyncio.Queue[io.BytesIO] = asyncio.Queue()
+    for _ in range(MULTIPART_UPLOAD_CONCURRENCY + 1):
+        buffer_pool.put_nowait(io.BytesIO())
+
+    upload_tasks: list[asyncio.Task["CompletedPartTypeDef"]] = []
+    try:
+        buffer = buffer_pool.get_nowait()
+        async for chunk in chunks:
+            buffer.write(chunk)
+            if buffer.tell() >= MULTIPART_UPLOAD_PART_SIZE:
+                upload_tasks.append(
+                    asyncio.create_task(
+                        _upload_part(
+                            key,
+                            upload_id,
+                            len(upload_tasks) + 1,
+                            buffer,
+                            buffer_pool,
+                        ),
+                    ),
+                )
+                buffer = await buffer_pool.get()
+
+                # stop early if any part has already failed
+                for task in upload_tasks:
+                    if task.done():
+                        task.result()
+
+        # the last part may be smaller; and an empty object still needs one
+        if buffer.tell() or not upload_tasks:
+            upload_tasks.append(
+                asyncio.create_task(
+                    _upload_part(
+                        key,
+                        upload_id,
+                        len(upload_tasks) + 1,
+                        buffer,
+                        buffer_pool,
+                    ),
+                ),
+            )
+
+        parts = await asyncio.gather(*upload_tasks)
+        await state.s3_client.complete_multipart_upload(
+            Bucket=settings.AWS_S3_BUCKET_NAME,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except Exception:
+        logging.exception(
+            "Unexpected error when streaming object data to S3",
+            exc_info=True,
+            extra={"object_key": key},
+        )
+        for task in upload_tasks:
+            task.cancel()
+        await asyncio.gather(*upload_tasks, return_exceptions=True)
+
+        try:
+            await state.s3_client.abort_multipart_upload(
+                Bucket=settings.AWS_S3_BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+            )
+        except Exception:
+            logging.warning(
+                "Failed to abort multipart upload to S3",
+                exc_info=True,
+                extra={"object_key": key},
+            )
+        return False
+
+    return True
+
+
+async def _upload_part(
+    key: str,
+    upload_id: str,
+    part_number: int,
+    buffer: io.BytesIO,
+    buffer_pool: asyncio.Queue[io.BytesIO],
+) -> "CompletedPartTypeDef":
+    try:
+        buffer.seek(0)
+        part = await state.s3_client.upload_part(
+            Bucket=settings.AWS_S3_BUCKET_NAME,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=buffer,
+        )
+    finally:
+        buffer.seek(0)
+        buffer.truncate()
+        buffer_pool.put_nowait(buffer)
+
+    return {"ETag": part["ETag"], "PartNumber": part_number}
+
+
 async def delete_object(key: str) -> None:
     try:
         await state.s3_client.delete_object(
@@ -63,3 +338,83 @@ async def delete_object(key: str) -> None:
             extra={"object_key": key},
         )
         return None
+
+
+async def iter_object_keys(prefix: str) -> AsyncIterator[list[str]]:
+    """Iterate over the keys of all objects under a prefix, a page at a time."""
+    paginator = state.s3_client.get_paginator("list_objects_v2")
+    async for page in paginator.paginate(
+        Bucket=settings.AWS_S3_BUCKET_NAME,
+        Prefix=prefix,
+    ):
+        keys = [s3_object["Key"] for s3_object in page.get("Contents", [])]
+        if keys:
+            yield keys
+
+
+async def delete_objects_by_prefix(prefix: str) -> bool:
+    """\
+    Delete all objects under a prefix.
+
+    Pages of keys are deleted concurrently while further pages are
+    listed. Returns whether all objects were deleted.
+
+    Pages hold at most 1000 keys, as does a DeleteObjects request.
+    """
+    semaphore = asyncio.Semaphore(DELETE_OBJECTS_CONCURRENCY)
+
+    async def delete_page(keys: list[str]) -> list[str]:
+        try:
+            return await _delete_object_batch(keys)
+        finally:
+            semaphore.release()
+
+    delete_tasks: list[asyncio.Task[list[str]]] = []
+    try:
+        async for keys in iter_object_keys(prefix):
+            await semaphore.acquire()
+            delete_tasks.append(asyncio.create_task(delete_page(keys)))
+    except Exception:
+        logging.exception(
+            "Unexpected error when listing objects in S3",
+            exc_info=True,
+            extra={"object_key_prefix": prefix},
+        )
+        await asyncio.gather(*delete_tasks)
+        return False
+
+    failed_keys = [key for keys in await asyncio.gather(*delete_tasks) for key in keys]
+    return not failed_keys
+
+
+async def _delete_object_batch(keys: list[str]) -> list[str]:
+    for attempt in range(DELETE_OBJECTS_MAX_ATTEMPTS):
+        if attempt > 0:
+            await asyncio.sleep(0.5 * 2**attempt)
+
+        try:
+            response = await state.s3_client.delete_objects(
+                Bucket=settings.AWS_S3_BUCKET_NAME,
+                Delete={
+                    "Objects": [{"Key": key} for key in keys],
+                    "Quiet": True,
+                },
+            )
+        except Exception:
+            logging.warning(
+                "Failed to delete objects from S3",
+                exc_info=True,
+                extra={"object_keys_count": len(keys), "attempt": attempt + 1},
+            )
+            continue
+
+        # partial failures are reported per key, and only those are retried
+        keys = [error["Key"] for error in response.get("Errors", [])]
+        if not keys:
+            return []
+
+    logging.warning(
+        "Failed to delete objects from S3 after retries",
+        extra={"object_keys": keys},
+    )
+    return keys
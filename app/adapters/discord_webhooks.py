@@ -9,8 +9,14 @@ import httpx
 
 from app import job_scheduling
 from app import settings
+from app import state
+from app.adapters.http import InstrumentedTransport
 
-discord_webhooks_http_client = httpx.AsyncClient()
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=InstrumentedTransport(client_name="discord_webhooks"),
+    )
 
 
 EDIT_COL = "4360181"
@@ -163,7 +169,7 @@ class Webhook:
 
     async def post(self) -> None:
         """Post the webhook in JSON format."""
-        response = await discord_webhooks_http_client.post(
+        response = await state.discord_webhooks_http_client.post(
             self.url,
             json=self.json,
         )
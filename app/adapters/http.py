@@ -0,0 +1,64 @@
+import time
+
+import httpx
+from opentelemetry import propagate
+from opentelemetry.trace import SpanKind
+from opentelemetry.trace import Status
+from opentelemetry.trace import StatusCode
+
+from app import metrics
+from app import tracing
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """\
+    An HTTP transport which records and traces each request, labelled by
+    `client_name`. Timings cover the time taken to receive the response
+    headers.
+
+    With `propagate_trace_context`, the W3C trace context is sent with
+    requests; this should only be enabled for our own services.
+    """
+
+    def __init__(
+        self,
+        client_name: str,
+        *,
+        propagate_trace_context: bool = False,
+    ) -> None:
+        self.client_name = client_name
+        self.propagate_trace_context = propagate_trace_context
+        self._transport = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        status_code = "error"
+        try:
+            with tracing.tracer.start_as_current_span(
+                f"{self.client_name} {request.method}",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "http.request.method": request.method,
+                    "server.address": request.url.host,
+                    "url.path": request.url.path,
+                },
+            ) as span:
+                if self.propagate_trace_context:
+                    propagate.inject(request.headers)
+
+                response = await self._transport.handle_async_request(request)
+                status_code = str(response.status_code)
+
+                span.set_attribute("http.response.status_code", response.status_code)
+                if response.status_code >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
+                return response
+        finally:
+            metrics.HTTP_CLIENT_REQUEST_DURATION.labels(
+                self.client_name,
+                request.method,
+                status_code,
+            ).observe(time.perf_counter() - start)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
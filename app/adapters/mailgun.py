@@ -3,16 +3,21 @@ import logging
 import httpx
 
 from app import settings
+from app import state
+from app.adapters.http import InstrumentedTransport
 
-mailgun_http_client = httpx.AsyncClient(
-    base_url=settings.MAILGUN_BASE_URL,
-    auth=httpx.BasicAuth("api", settings.MAILGUN_API_KEY),
-)
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=settings.MAILGUN_BASE_URL,
+        auth=httpx.BasicAuth("api", settings.MAILGUN_API_KEY),
+        transport=InstrumentedTransport(client_name="mailgun"),
+    )
 
 
 async def send_html_email(*, to_address: str, subject: str, message: str) -> None:
     try:
-        response = await mailgun_http_client.post(
+        response = await state.mailgun_http_client.post(
             f"/v3/{settings.MAILGUN_DOMAIN_NAME}/messages",
             data={
                 "from": f"Akatsuki <noreply@{settings.MAILGUN_DOMAIN_NAME}>",
@@ -1,4 +1,47 @@
+import collections
+import logging
+import time
 import urllib.parse
+from collections.abc import AsyncGenerator
+from collections.abc import Iterator
+from collections.abc import Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from databases import Database
+from databases.interfaces import Record
+from opentelemetry.trace import SpanKind
+from sqlalchemy.sql import ClauseElement
+
+from app import metrics
+from app import settings
+from app import tracing
+
+# A request which runs the same repository function this many times is
+# likely fetching rows one at a time (an "N+1" query pattern).
+REPEATED_QUERY_THRESHOLD = 10
+
+# Query parameters are logged with the values of any parameters whose names
+# contain one of these words redacted, e.g. `new_email_address`, `ip_0`.
+REDACTED_PARAM_NAME_PARTS = frozenset(
+    (
+        "email",
+        "password",
+        "hashed",
+        "token",
+        "username",
+        "ip",
+        "hwid",
+        "notes",
+        "userpage",
+    ),
+)
+
+_request_query_counts: ContextVar[collections.Counter[str] | None] = ContextVar(
+    "request_query_counts",
+    default=None,
+)
 
 
 def create_dsn(
@@ -12,3 +55,184 @@ def create_dsn(
     driver_str = f"+{driver}" if driver else ""
     passwd_str = urllib.parse.quote_plus(password) if password else ""
     return f"mysql{driver_str}://{username}:{passwd_str}@{host}:{port}/{database}"
+
+
+def _redact_values(values: Mapping[str, Any] | None) -> dict[str, Any] | None:
+    if values is None:
+        return None
+
+    return {
+        key: (
+            "<redacted>"
+            if REDACTED_PARAM_NAME_PARTS.intersection(key.lower().split("_"))
+            else value
+        )
+        for key, value in values.items()
+    }
+
+
+@contextmanager
+def track_queries() -> Iterator[collections.Counter[str]]:
+    """\
+    Count the queries run by each repository function within the block
+    (including in tasks it creates).
+    """
+    query_counts: collections.Counter[str] = collections.Counter()
+    token = _request_query_counts.set(query_counts)
+    try:
+        yield query_counts
+    finally:
+        _request_query_counts.reset(token)
+
+
+def report_repeated_queries(
+    query_counts: collections.Counter[str],
+    *,
+    route: str,
+) -> None:
+    for function, count in query_counts.items():
+        if count < REPEATED_QUERY_THRESHOLD:
+            continue
+
+        metrics.DB_REPEATED_QUERIES.labels(route, function).inc()
+        logging.warning(
+            "Repository function queried repeatedly within one request",
+            extra={"route": route, "function": function, "count": count},
+        )
+
+
+class _QueryStats:
+    row_count: int | None = None
+
+
+@contextmanager
+def _instrument_query(
+    function: str,
+    query: ClauseElement | str,
+    values: Mapping[str, Any] | None,
+) -> Iterator[_QueryStats]:
+    stats = _QueryStats()
+    start = time.perf_counter()
+    with tracing.tracer.start_as_current_span(
+        function,
+        kind=SpanKind.CLIENT,
+        attributes={"db.system": "mysql", "db.statement": str(query)},
+    ) as span:
+        try:
+            yield stats
+        finally:
+            if stats.row_count is not None:
+                span.set_attribute("db.row_count", stats.row_count)
+            _record_query(
+                function,
+                query,
+                values,
+                duration=time.perf_counter() - start,
+                row_count=stats.row_count,
+            )
+
+
+def _record_query(
+    function: str,
+    query: ClauseElement | str,
+    values: Mapping[str, Any] | None,
+    *,
+    duration: float,
+    row_count: int | None,
+) -> None:
+    metrics.DB_QUERY_DURATION.labels(function).observe(duration)
+    if row_count is not None:
+        metrics.DB_QUERY_ROWS.labels(function).observe(row_count)
+
+    query_counts = _request_query_counts.get()
+    if query_counts is not None:
+        query_counts[function] += 1
+
+    if duration * 1000 >= settings.DB_SLOW_QUERY_THRESHOLD_MS:
+        logging.warning(
+            "Slow database query",
+            extra={
+                "function": function,
+                "query": str(query),
+                "values": _redact_values(values),
+                "row_count": row_count,
+                "duration_ms": round(duration * 1000, 2),
+            },
+        )
+
+
+class InstrumentedDatabase(Database):
+    """\
+    A database which records the duration and row count of each query,
+    labelled by the repository function which ran it, and traces each
+    query in a span. Slow queries, and queries repeated many times within
+    a request, are logged.
+    """
+
+    async def fetch_all(
+        self,
+        query: ClauseElement | str,
+        values: dict[str, Any] | None = None,
+    ) -> list[Record]:
+        function = metrics.find_repository_caller(1)
+        with _instrument_query(function, query, values) as stats:
+            records = await super().fetch_all(query, values)
+            stats.row_count = len(records)
+            return records
+
+    async def fetch_one(
+        self,
+        query: ClauseElement | str,
+        values: dict[str, Any] | None = None,
+    ) -> Record | None:
+        function = metrics.find_repository_caller(1)
+        with _instrument_query(function, query, values) as stats:
+            record = await super().fetch_one(query, values)
+            stats.row_count = 0 if record is None else 1
+            return record
+
+    async def fetch_val(
+        self,
+        query: ClauseElement | str,
+        values: dict[str, Any] | None = None,
+        column: Any = 0,
+    ) -> Any:
+        function = metrics.find_repository_caller(1)
+        with _instrument_query(function, query, values) as stats:
+            value = await super().fetch_val(query, values, column=column)
+            stats.row_count = 0 if value is None else 1
+            return value
+
+    # The row counts of writes are not recorded, as `execute` returns either
+    # the last inserted id or the number of changed rows, indistinguishably.
+
+    async def execute(
+        self,
+        query: ClauseElement | str,
+        values: dict[str, Any] | None = None,
+    ) -> Any:
+        function = metrics.find_repository_caller(1)
+        with _instrument_query(function, query, values):
+            return await super().execute(query, values)
+
+    async def execute_many(
+        self,
+        query: ClauseElement | str,
+        values: list[dict[str, Any]],
+    ) -> None:
+        function = metrics.find_repository_caller(1)
+        with _instrument_query(function, query, None):
+            return await super().execute_many(query, values)
+
+    async def iterate(
+        self,
+        query: ClauseElement | str,
+        values: dict[str, Any] | None = None,
+    ) -> AsyncGenerator[Mapping[Any, Any], None]:
+        # Timed until the last row is read, as rows are fetched lazily.
+        function = metrics.find_repository_caller(1)
+        with _instrument_query(function, query, values) as stats:
+            stats.row_count = 0
+            async for record in super().iterate(query, values):
+                stats.row_count += 1
+                yield record
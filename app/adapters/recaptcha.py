@@ -3,10 +3,15 @@ import logging
 import httpx
 
 from app import settings
+from app import state
+from app.adapters.http import InstrumentedTransport
 
-recaptcha_http_client = httpx.AsyncClient(
-    base_url="https://www.google.com/recaptcha",
-)
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url="https://www.google.com/recaptcha",
+        transport=InstrumentedTransport(client_name="recaptcha"),
+    )
 
 
 async def verify_recaptcha(
@@ -15,7 +20,7 @@ async def verify_recaptcha(
     client_ip_address: str,
 ) -> bool:
     try:
-        response = await recaptcha_http_client.post(
+        response = await state.recaptcha_http_client.post(
             "/api/siteverify",
             data={
                 "secret": settings.RECAPTCHA_SECRET_KEY,
@@ -0,0 +1,31 @@
+import time
+from typing import Any
+
+from opentelemetry.trace import SpanKind
+from redis.asyncio import Redis
+
+from app import metrics
+from app import tracing
+
+
+class InstrumentedRedis(Redis):
+    """A redis client which records and traces each command."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        command = str(args[0]).upper()
+        start = time.perf_counter()
+        try:
+            # Command arguments are not recorded, as they may contain PII.
+            with tracing.tracer.start_as_current_span(
+                command,
+                kind=SpanKind.CLIENT,
+                attributes={"db.system": "redis"},
+            ):
+                return await super().execute_command(  # type: ignore[no-untyped-call]
+                    *args,
+                    **options,
+                )
+        finally:
+            metrics.REDIS_COMMAND_DURATION.labels(command).observe(
+                time.perf_counter() - start,
+            )
@@ -1,7 +1,13 @@
 from fastapi import APIRouter
 
+from app.api.internal.v1 import data_exports
+from app.api.internal.v1 import profiling
+from app.api.internal.v1 import user_deletion_jobs
 from app.api.internal.v1 import users
 
 v1_router = APIRouter()
 
 v1_router.include_router(users.router)
+v1_router.include_router(user_deletion_jobs.router)
+v1_router.include_router(data_exports.router)
+v1_router.include_router(profiling.router)
@@ -0,0 +1,63 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+from app.api.responses import JSONResponse
+from app.errors import Error
+from app.errors import ErrorCode
+from app.usecases import data_exports
+
+router = APIRouter(tags=["(Internal) Data Exports API"])
+
+
+def map_error_code_to_http_status_code(error_code: ErrorCode) -> int:
+    status_code = _error_code_to_http_status_code_map.get(error_code)
+    if status_code is None:
+        logging.warning(
+            "No HTTP status code mapping found for error code: %s",
+            error_code,
+            extra={"error_code": error_code},
+        )
+        return 500
+    return status_code
+
+
+_error_code_to_http_status_code_map: dict[ErrorCode, int] = {
+    ErrorCode.NOT_FOUND: 404,
+    ErrorCode.INTERNAL_SERVER_ERROR: 500,
+}
+
+
+@router.get("/api/v1/users/{user_id}/data-export")
+async def stream_user_data_export(user_id: int) -> Response:
+    response = await data_exports.stream_one_by_user_id(user_id)
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return StreamingResponse(
+        content=response,
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="user-{user_id}.ndjson"',
+        },
+    )
+
+
+@router.post("/api/v1/users/{user_id}/data-exports")
+async def create_user_data_export(user_id: int) -> Response:
+    response = await data_exports.save_one_by_user_id(user_id)
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=201,
+    )
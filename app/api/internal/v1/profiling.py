@@ -0,0 +1,51 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi import Header
+from fastapi import Query
+from fastapi import Response
+from fastapi.responses import PlainTextResponse
+
+from app.api.responses import JSONResponse
+from app.errors import Error
+from app.errors import ErrorCode
+from app.usecases import profiling
+
+router = APIRouter(tags=["(Internal) Profiling API"])
+
+
+def map_error_code_to_http_status_code(error_code: ErrorCode) -> int:
+    status_code = _error_code_to_http_status_code_map.get(error_code)
+    if status_code is None:
+        logging.warning(
+            "No HTTP status code mapping found for error code: %s",
+            error_code,
+            extra={"error_code": error_code},
+        )
+        return 500
+    return status_code
+
+
+_error_code_to_http_status_code_map: dict[ErrorCode, int] = {
+    ErrorCode.INCORRECT_CREDENTIALS: 401,
+    ErrorCode.NOT_FOUND: 404,
+    ErrorCode.CONFLICT: 409,
+}
+
+
+@router.post("/api/v1/profiles")
+async def create_profile(
+    duration: float = Query(10, gt=0, le=60),
+    api_key: str = Header(..., alias="X-Api-Key"),
+) -> Response:
+    response = await profiling.profile_event_loop(api_key=api_key, duration=duration)
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return PlainTextResponse(
+        content=response,
+        headers={"Content-Disposition": 'attachment; filename="profile.folded"'},
+    )
@@ -0,0 +1,65 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.api.responses import JSONResponse
+from app.errors import Error
+from app.errors import ErrorCode
+from app.usecases import user_deletion_jobs
+
+router = APIRouter(tags=["(Internal) User Deletion Jobs API"])
+
+
+def map_error_code_to_http_status_code(error_code: ErrorCode) -> int:
+    status_code = _error_code_to_http_status_code_map.get(error_code)
+    if status_code is None:
+        logging.warning(
+            "No HTTP status code mapping found for error code: %s",
+            error_code,
+            extra={"error_code": error_code},
+        )
+        return 500
+    return status_code
+
+
+_error_code_to_http_status_code_map: dict[ErrorCode, int] = {
+    ErrorCode.BAD_REQUEST: 400,
+    ErrorCode.NOT_FOUND: 404,
+    ErrorCode.INTERNAL_SERVER_ERROR: 500,
+}
+
+
+class UserDeletionJobCreate(BaseModel):
+    user_ids: list[int]
+
+
+@router.post("/api/v1/user-deletion-jobs")
+async def create_user_deletion_job(args: UserDeletionJobCreate) -> Response:
+    response = await user_deletion_jobs.create(args.user_ids)
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=202,
+    )
+
+
+@router.get("/api/v1/user-deletion-jobs/{job_id}")
+async def get_user_deletion_job(job_id: str) -> Response:
+    response = await user_deletion_jobs.fetch_one(job_id)
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=200,
+    )
@@ -0,0 +1,24 @@
+import os
+
+from fastapi import APIRouter
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client import REGISTRY
+from prometheus_client import CollectorRegistry
+from prometheus_client import generate_latest
+from prometheus_client import multiprocess
+
+metrics_router = APIRouter(tags=["Service Metrics API"])
+
+
+@metrics_router.get("/metrics")
+async def get_metrics() -> Response:
+    # With multiple workers, each writes its metrics to a shared directory,
+    # so whichever worker serves the scrape reports the totals of them all.
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    else:
+        registry = REGISTRY
+
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
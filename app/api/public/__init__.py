@@ -1,13 +1,19 @@
 from fastapi import APIRouter
 
 from . import authentication
+from . import clans
+from . import leaderboards
 from . import overall_stats
+from . import user_relationships
 from . import user_stats
 from . import users
 
 public_router = APIRouter()
 
 public_router.include_router(authentication.router)
+public_router.include_router(clans.router)
+public_router.include_router(leaderboards.router)
 public_router.include_router(overall_stats.router)
 public_router.include_router(users.router)
+public_router.include_router(user_relationships.router)
 public_router.include_router(user_stats.router)
@@ -4,6 +4,7 @@ from fastapi import Header
 from fastapi import Response
 from pydantic import BaseModel
 
+from app import rate_limiting
 from app.api import authorization
 from app.api.responses import JSONResponse
 from app.errors import Error
@@ -22,10 +23,23 @@ _error_code_to_http_status_code_map: dict[ErrorCode, int] = {
     ErrorCode.INSUFFICIENT_PRIVILEGES: 401,
     ErrorCode.PENDING_VERIFICATION: 401,
     ErrorCode.NOT_FOUND: 404,
+    ErrorCode.TOO_MANY_REQUESTS: 429,
     ErrorCode.INTERNAL_SERVER_ERROR: 500,
 }
 
 
+def make_rate_limited_response(retry_after: int) -> Response:
+    error = Error(
+        error_code=ErrorCode.TOO_MANY_REQUESTS,
+        user_feedback="Too many attempts. Please try again later.",
+    )
+    return JSONResponse(
+        content=error.model_dump(),
+        status_code=map_error_code_to_http_status_code(error.error_code),
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
 class AuthenticationRequest(BaseModel):
     username: str
     password: str
@@ -37,6 +51,26 @@ async def authenticate(
     client_ip_address: str = Header(..., alias="X-Real-IP"),
     client_user_agent: str = Header(..., alias="User-Agent"),
 ) -> Response:
+    # checked before any sql lookups or bcrypt work to
+    # limit the cost of brute force & credential stuffing
+    username_safe = args.username.lower().replace(" ", "_")
+    retry_after = await rate_limiting.acquire(
+        [
+            rate_limiting.RateLimit(
+                key=f"authenticate:ip:{client_ip_address}",
+                limit=10,
+                period=60,
+            ),
+            rate_limiting.RateLimit(
+                key=f"authenticate:username:{username_safe}",
+                limit=10,
+                period=60 * 15,
+            ),
+        ],
+    )
+    if retry_after is not None:
+        return make_rate_limited_response(retry_after)
+
     response = await authentication.authenticate(
         username=args.username,
         password=args.password,
@@ -116,6 +150,24 @@ async def initialize_password_reset(
     client_ip_address: str = Header(..., alias="X-Real-IP"),
     client_user_agent: str = Header(..., alias="User-Agent"),
 ) -> Response:
+    username_safe = args.username.lower().replace(" ", "_")
+    retry_after = await rate_limiting.acquire(
+        [
+            rate_limiting.RateLimit(
+                key=f"init-password-reset:ip:{client_ip_address}",
+                limit=5,
+                period=60 * 15,
+            ),
+            rate_limiting.RateLimit(
+                key=f"init-password-reset:username:{username_safe}",
+                limit=3,
+                period=60 * 60,
+            ),
+        ],
+    )
+    if retry_after is not None:
+        return make_rate_limited_response(retry_after)
+
     response = await authentication.initialize_password_reset(
         username=args.username,
         recaptcha_token=args.recaptcha_token,
@@ -0,0 +1,69 @@
+from fastapi import APIRouter
+from fastapi import Query
+from fastapi import Response
+
+from app.api.responses import JSONResponse
+from app.common_types import AkatsukiMode
+from app.common_types import GameMode
+from app.common_types import RelaxMode
+from app.errors import Error
+from app.errors import ErrorCode
+from app.usecases import clans
+
+router = APIRouter(tags=["(Public) Clans API"])
+
+
+def map_error_code_to_http_status_code(error_code: ErrorCode) -> int:
+    return _error_code_to_http_status_code_map[error_code]
+
+
+_error_code_to_http_status_code_map: dict[ErrorCode, int] = {
+    ErrorCode.NOT_FOUND: 404,
+    ErrorCode.INTERNAL_SERVER_ERROR: 500,
+}
+
+
+@router.get("/public/api/v1/clans/{clan_id}")
+async def get_clan(clan_id: int) -> Response:
+    response = await clans.fetch_one_by_clan_id(clan_id)
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=200,
+    )
+
+
+@router.get("/public/api/v1/clans/{clan_id}/members")
+async def get_clan_members(
+    clan_id: int,
+    after_user_id: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    include_stats: bool = Query(False),
+    game_mode: GameMode = Query(GameMode.OSU),
+    relax_mode: RelaxMode = Query(RelaxMode.VANILLA),
+) -> Response:
+    response = await clans.fetch_members(
+        clan_id,
+        after_user_id=after_user_id,
+        limit=limit,
+        stats_akatsuki_mode=(
+            AkatsukiMode.from_game_mode_and_relax_mode(game_mode, relax_mode)
+            if include_stats
+            else None
+        ),
+    )
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=200,
+    )
@@ -0,0 +1,81 @@
+from fastapi import APIRouter
+from fastapi import Query
+from fastapi import Response
+
+from app.api.responses import JSONResponse
+from app.common_types import AkatsukiMode
+from app.common_types import GameMode
+from app.common_types import RankingMetric
+from app.common_types import RelaxMode
+from app.errors import Error
+from app.errors import ErrorCode
+from app.usecases import leaderboards
+
+router = APIRouter(tags=["(Public) Leaderboards API"])
+
+
+def map_error_code_to_http_status_code(error_code: ErrorCode) -> int:
+    return _error_code_to_http_status_code_map[error_code]
+
+
+_error_code_to_http_status_code_map: dict[ErrorCode, int] = {
+    ErrorCode.NOT_FOUND: 404,
+    ErrorCode.INTERNAL_SERVER_ERROR: 500,
+    ErrorCode.SERVICE_UNAVAILABLE: 503,
+}
+
+
+@router.get("/public/api/v1/leaderboards")
+async def get_leaderboard(
+    game_mode: GameMode = Query(...),
+    relax_mode: RelaxMode = Query(...),
+    sort: RankingMetric = Query(RankingMetric.PP),
+    country: str | None = Query(None, min_length=2, max_length=2),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=100),
+) -> Response:
+    akatsuki_mode = AkatsukiMode.from_game_mode_and_relax_mode(game_mode, relax_mode)
+
+    response = await leaderboards.fetch_leaderboard(
+        akatsuki_mode,
+        sort,
+        country=country.upper() if country is not None else None,
+        page=page,
+        page_size=page_size,
+    )
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=200,
+    )
+
+
+@router.get("/public/api/v1/users/{user_id}/leaderboard-position")
+async def get_user_leaderboard_position(
+    user_id: int,
+    game_mode: GameMode = Query(...),
+    relax_mode: RelaxMode = Query(...),
+    sort: RankingMetric = Query(RankingMetric.PP),
+) -> Response:
+    akatsuki_mode = AkatsukiMode.from_game_mode_and_relax_mode(game_mode, relax_mode)
+
+    response = await leaderboards.fetch_leaderboard_position(
+        user_id,
+        akatsuki_mode,
+        sort,
+    )
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=200,
+    )
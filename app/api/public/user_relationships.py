@@ -0,0 +1,76 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi import Query
+from fastapi import Response
+
+from app.api.responses import JSONResponse
+from app.errors import Error
+from app.errors import ErrorCode
+from app.usecases import user_relationships
+
+router = APIRouter(tags=["(Public) User Relationships API"])
+
+
+def map_error_code_to_http_status_code(error_code: ErrorCode) -> int:
+    status_code = _error_code_to_http_status_code_map.get(error_code)
+    if status_code is None:
+        logging.warning(
+            "No HTTP status code mapping found for error code: %s",
+            error_code,
+            extra={"error_code": error_code},
+        )
+        return 500
+    return status_code
+
+
+_error_code_to_http_status_code_map: dict[ErrorCode, int] = {
+    ErrorCode.NOT_FOUND: 404,
+    ErrorCode.INTERNAL_SERVER_ERROR: 500,
+}
+
+
+@router.get("/public/api/v1/users/{user_id}/followers")
+async def get_followers(
+    user_id: int,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+) -> Response:
+    response = await user_relationships.fetch_followers(
+        user_id,
+        after_id=after_id,
+        limit=limit,
+    )
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=200,
+    )
+
+
+@router.get("/public/api/v1/users/{user_id}/following")
+async def get_following(
+    user_id: int,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+) -> Response:
+    response = await user_relationships.fetch_following(
+        user_id,
+        after_id=after_id,
+        limit=limit,
+    )
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=200,
+    )
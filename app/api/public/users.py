@@ -2,6 +2,7 @@ import logging
 
 from fastapi import APIRouter
 from fastapi import Cookie
+from fastapi import Query
 from fastapi import Response
 from pydantic import BaseModel
 
@@ -34,12 +35,35 @@ _error_code_to_http_status_code_map: dict[ErrorCode, int] = {
     ErrorCode.NOT_FOUND: 404,
     ErrorCode.CONFLICT: 409,
     ErrorCode.INTERNAL_SERVER_ERROR: 500,
+    ErrorCode.SERVICE_UNAVAILABLE: 503,
 }
 
 
+# NOTE: must be registered before /users/{user_id}
+@router.get("/public/api/v1/users/search")
+async def search_users(
+    query: str = Query(..., alias="q", min_length=1, max_length=32),
+    limit: int = Query(10, ge=1, le=50),
+) -> Response:
+    response = await users.search_by_username_prefix(query, limit=limit)
+    if isinstance(response, Error):
+        return JSONResponse(
+            content=response.model_dump(),
+            status_code=map_error_code_to_http_status_code(response.error_code),
+        )
+
+    return JSONResponse(
+        content=[search_result.model_dump() for search_result in response],
+        status_code=200,
+    )
+
+
 @router.get("/public/api/v1/users/{user_id}")
-async def get_user(user_id: int) -> Response:
-    response = await users.fetch_one_by_user_id(user_id)
+async def get_user(
+    user_id: int,
+    include_clan: bool = Query(False),
+) -> Response:
+    response = await users.fetch_one_by_user_id(user_id, include_clan=include_clan)
     if isinstance(response, Error):
         return JSONResponse(
             content=response.model_dump(),
@@ -0,0 +1,53 @@
+import hashlib
+import math
+
+
+def optimal_size(*, capacity: int, error_rate: float) -> int:
+    """The number of bits needed to hold `capacity` items at `error_rate`."""
+    return math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+
+
+def optimal_hash_count(*, capacity: int, size: int) -> int:
+    return max(1, round(size / capacity * math.log(2)))
+
+
+def bit_positions(item: str, *, size: int, hash_count: int) -> list[int]:
+    # double hashing; derives k positions from two 64-bit hashes
+    digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % size for i in range(hash_count)]
+
+
+class BloomFilter:
+    """\
+    A space-efficient probabilistic set of strings.
+
+    Membership tests may return false positives (at roughly `error_rate`
+    while holding at most `capacity` items), but never false negatives.
+    Items cannot be removed.
+
+    Bits are numbered from the most significant bit of each byte, as in
+    redis' GETBIT & SETBIT, so `to_bytes()` can be loaded into redis.
+    """
+
+    def __init__(self, *, capacity: int, error_rate: float) -> None:
+        self.size = optimal_size(capacity=capacity, error_rate=error_rate)
+        self.hash_count = optimal_hash_count(capacity=capacity, size=self.size)
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    def bit_positions(self, item: str) -> list[int]:
+        return bit_positions(item, size=self.size, hash_count=self.hash_count)
+
+    def add(self, item: str) -> None:
+        for position in self.bit_positions(item):
+            self._bits[position >> 3] |= 0x80 >> (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (0x80 >> (position & 7))
+            for position in self.bit_positions(item)
+        )
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._bits)
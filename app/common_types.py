@@ -1,5 +1,6 @@
 from enum import IntEnum
 from enum import IntFlag
+from enum import StrEnum
 
 
 class UserPrivileges(IntFlag):
@@ -81,3 +82,23 @@ class AkatsukiMode(IntEnum):
             return AkatsukiMode.AUTOPILOT_OSU
         else:
             raise ValueError("Unknown game_mode and relax_mode combo")
+
+
+class RankingMetric(StrEnum):
+    PP = "pp"
+    RANKED_SCORE = "ranked_score"
+    ACCURACY = "accuracy"
+
+
+class UserDeletionJobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"  # will be resumed
+
+
+class ClanStatus(IntEnum):
+    CLOSED = 0
+    OPEN_FOR_ALL = 1
+    INVITE_ONLY = 2
+    REQUEST_TO_JOIN = 3
@@ -0,0 +1,87 @@
+"""\
+Monitoring of the event loop's responsiveness.
+
+A periodic job measures how late the loop runs it (the loop's "lag"),
+which is exported as a metric; any blocking call (e.g. bcrypt, or large
+pydantic models) shows up as lag, as it delays every other task.
+
+Optionally, a watchdog thread logs the loop thread's stack whenever the
+job is late by more than a threshold, to catch the blocking call in the
+act. Code holding the GIL in native extensions delays the watchdog too,
+so the stack may be captured after such a call returns.
+"""
+
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app import metrics
+
+LAG_SAMPLE_INTERVAL = 0.1
+
+# the monotonic time at which the lag job last ran; read by the watchdog
+_last_heartbeat: float | None = None
+
+_watchdog_stop_event: threading.Event | None = None
+
+
+async def record_event_loop_lag() -> None:
+    """Record the loop's lag; to be run every `LAG_SAMPLE_INTERVAL` seconds."""
+    global _last_heartbeat
+
+    now = time.monotonic()
+    if _last_heartbeat is not None:
+        lag = now - _last_heartbeat - LAG_SAMPLE_INTERVAL
+        metrics.EVENT_LOOP_LAG.observe(max(lag, 0))
+    _last_heartbeat = now
+
+
+def start_watchdog(*, threshold: float) -> None:
+    """\
+    Log the stack of the calling thread (the event loop's) whenever it is
+    blocked for more than `threshold` seconds.
+    """
+    global _watchdog_stop_event
+
+    _watchdog_stop_event = threading.Event()
+    threading.Thread(
+        target=_watch,
+        args=(threading.get_ident(), threshold, _watchdog_stop_event),
+        name="event-loop-watchdog",
+        daemon=True,
+    ).start()
+
+
+def stop_watchdog() -> None:
+    if _watchdog_stop_event is not None:
+        _watchdog_stop_event.set()
+
+
+def _watch(thread_id: int, threshold: float, stop_event: threading.Event) -> None:
+    reported_heartbeat: float | None = None
+
+    while not stop_event.wait(threshold / 4):
+        heartbeat = _last_heartbeat
+        # each stall is reported once, while it is ongoing
+        if heartbeat is None or heartbeat == reported_heartbeat:
+            continue
+
+        blocked_for = time.monotonic() - heartbeat - LAG_SAMPLE_INTERVAL
+        if blocked_for < threshold:
+            continue
+
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:  # the loop's thread has exited
+            return None
+
+        logging.warning(
+            "Event loop blocked",
+            extra={
+                "blocked_ms": round(blocked_for * 1000),
+                "stack": "".join(traceback.format_stack(frame)),
+            },
+        )
+        del frame  # avoid keeping the thread's frames alive
+        reported_heartbeat = heartbeat
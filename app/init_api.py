@@ -1,28 +1,57 @@
 import logging
+import os
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 import aiobotocore.session
-from databases import Database
 from fastapi import FastAPI
 from fastapi import Request
 from fastapi import Response
 from fastapi.exception_handlers import request_validation_exception_handler
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from redis.asyncio import Redis
+from opentelemetry import propagate
+from opentelemetry.trace import SpanKind
+from opentelemetry.trace import Status
+from opentelemetry.trace import StatusCode
+from prometheus_client import multiprocess
 from starlette.middleware.base import RequestResponseEndpoint
+from starlette.routing import BaseRoute
 
+from app import event_loop_monitoring
+from app import job_scheduling
 from app import logger
+from app import metrics
 from app import settings
 from app import state
+from app import tracing
+from app.adapters import assets
+from app.adapters import aws_s3
+from app.adapters import discord_webhooks
+from app.adapters import mailgun
 from app.adapters import mysql
+from app.adapters import recaptcha
+from app.adapters.redis import InstrumentedRedis
 from app.api import api_router
+from app.repositories import user_badges
+from app.repositories import user_tournament_badges
+from app.usecases import leaderboards
+from app.usecases import user_deletion_jobs
+from app.usecases import user_relationships
+from app.usecases import users as users_usecases
+
+PUBLIC_API_PATH_PREFIX = "/public/"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.configure_logging()
+    if settings.TRACING_ENABLED:
+        tracing.configure_tracing(
+            tracing.create_span_exporter(),
+            sample_ratio=settings.TRACING_SAMPLE_RATIO,
+        )
     await state.database.connect()
     await state.redis.initialize()  # type: ignore[unused-awaitable]
 
@@ -35,12 +64,85 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         aws_secret_access_key=settings.AWS_S3_SECRET_ACCESS_KEY,
     )
     state.s3_client = await s3_client.__aenter__()
+    aws_s3.register_instrumentation_handlers(state.s3_client)
+
+    state.assets_service_http_client = assets.create_http_client()
+    state.mailgun_http_client = mailgun.create_http_client()
+    state.recaptcha_http_client = recaptcha.create_http_client()
+    state.discord_webhooks_http_client = discord_webhooks.create_http_client()
+
+    job_scheduling.schedule_periodic_job(
+        event_loop_monitoring.record_event_loop_lag,
+        interval=event_loop_monitoring.LAG_SAMPLE_INTERVAL,
+    )
+    if settings.EVENT_LOOP_WATCHDOG_ENABLED:
+        event_loop_monitoring.start_watchdog(
+            threshold=settings.EVENT_LOOP_WATCHDOG_THRESHOLD_MS / 1000,
+        )
+
+    job_scheduling.schedule_job(users_usecases.sync_username_indexes())
+    job_scheduling.schedule_periodic_job(
+        users_usecases.sync_username_indexes,
+        interval=60,
+    )
+    job_scheduling.schedule_periodic_job(
+        users_usecases.refresh_username_indexes,
+        interval=users_usecases.USERNAME_INDEXES_REFRESH_INTERVAL,
+    )
+    job_scheduling.schedule_job(user_badges.load_catalog())
+    job_scheduling.schedule_periodic_job(user_badges.load_catalog, interval=60)
+    job_scheduling.schedule_job(user_tournament_badges.load_catalog())
+    job_scheduling.schedule_periodic_job(
+        user_tournament_badges.load_catalog,
+        interval=60,
+    )
+    job_scheduling.schedule_job(leaderboards.load_stats_snapshots())
+    job_scheduling.schedule_periodic_job(
+        leaderboards.load_stats_snapshots,
+        interval=leaderboards.STATS_SNAPSHOTS_LOAD_INTERVAL,
+    )
+    job_scheduling.schedule_job(leaderboards.sync_user_rankings())
+    job_scheduling.schedule_periodic_job(
+        leaderboards.sync_user_rankings,
+        interval=leaderboards.USER_RANKINGS_SYNC_INTERVAL,
+    )
+    job_scheduling.schedule_job(user_relationships.sync_follower_counts())
+    job_scheduling.schedule_periodic_job(
+        user_relationships.sync_follower_counts,
+        interval=user_relationships.FOLLOWER_COUNTS_SYNC_INTERVAL,
+    )
+    job_scheduling.schedule_job(users_usecases.resume_pending_user_deletions())
+    job_scheduling.schedule_periodic_job(
+        users_usecases.resume_pending_user_deletions,
+        interval=60 * 5,
+    )
+    job_scheduling.schedule_periodic_job(
+        users_usecases.purge_expired_user_deletion_archives,
+        interval=users_usecases.USER_DELETION_ARCHIVE_PURGE_INTERVAL,
+    )
+    job_scheduling.schedule_job(user_deletion_jobs.resume_pending_user_deletion_jobs())
+    job_scheduling.schedule_periodic_job(
+        user_deletion_jobs.resume_pending_user_deletion_jobs,
+        interval=60 * 5,
+    )
 
     yield
+    event_loop_monitoring.stop_watchdog()
+    await job_scheduling.cancel_periodic_jobs()
+    await state.discord_webhooks_http_client.aclose()
+    await state.recaptcha_http_client.aclose()
+    await state.mailgun_http_client.aclose()
+    await state.assets_service_http_client.aclose()
     await state.s3_client.__aexit__(None, None, None)
     await state.redis.aclose()
     await state.database.disconnect()
 
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # drops this worker's live gauges; its counters & histograms remain,
+        # so that totals don't go backwards when workers are replaced
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
+    tracing.shutdown_tracing()
+
 
 def init_routes(app: FastAPI) -> FastAPI:
     app.include_router(api_router)
@@ -59,6 +161,48 @@ def init_middleware(app: FastAPI) -> FastAPI:
             logging.exception("Exception in ASGI application")
             return Response(status_code=500)
 
+    @app.middleware("http")
+    async def metrics_middleware(
+        request: Request,
+        call_next: RequestResponseEndpoint,
+    ) -> Response:
+        start = time.perf_counter()
+
+        # Trace context is only continued from internal callers, as public
+        # clients could otherwise force their requests' traces to be sampled.
+        trace_context = None
+        if not request.url.path.startswith(PUBLIC_API_PATH_PREFIX):
+            trace_context = propagate.extract(request.headers)
+
+        with (
+            tracing.tracer.start_as_current_span(
+                request.method,
+                context=trace_context,
+                kind=SpanKind.SERVER,
+                attributes={"http.request.method": request.method},
+            ) as span,
+            mysql.track_queries() as query_counts,
+        ):
+            response = await call_next(request)
+
+            # Label by route template rather than path, to bound cardinality.
+            route: BaseRoute | None = request.scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+
+            span.update_name(f"{request.method} {route_path}")
+            span.set_attribute("http.route", route_path)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_status(Status(StatusCode.ERROR))
+
+        metrics.HTTP_REQUEST_DURATION.labels(
+            request.method,
+            route_path,
+            str(response.status_code),
+        ).observe(time.perf_counter() - start)
+        mysql.report_repeated_queries(query_counts, route=route_path)
+        return response
+
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(
         request: Request,
@@ -75,14 +219,14 @@ def init_middleware(app: FastAPI) -> FastAPI:
 
 
 def init_db(app: FastAPI) -> FastAPI:
-    state.redis = Redis(
+    state.redis = InstrumentedRedis(
         host=settings.REDIS_HOST,
         port=settings.REDIS_PORT,
         db=settings.REDIS_DB,
         username=settings.REDIS_USER,
         password=settings.REDIS_PASS,
     )
-    state.database = Database(
+    state.database = mysql.InstrumentedDatabase(
         url=mysql.create_dsn(
             driver="aiomysql",
             username=settings.DB_USER,
@@ -91,6 +235,7 @@ def init_db(app: FastAPI) -> FastAPI:
             port=settings.DB_PORT,
             database=settings.DB_NAME,
         ),
+        max_size=max(settings.DB_MAX_CONNECTIONS // settings.APP_WORKERS, 1),
     )
     return app
 
@@ -102,6 +247,8 @@ def init_api() -> FastAPI:
         redoc_url="/redoc" if settings.APP_ENV != "production" else None,
         swagger_ui_oauth2_redirect_url=None,
         lifespan=lifespan,
+        # Request spans and metrics are recorded by our own middleware.
+        telemetry={"tracing": False, "metrics": False},
     )
     app = init_routes(app)
     app = init_middleware(app)
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 import sys
+from collections.abc import Awaitable
+from collections.abc import Callable
 from collections.abc import Coroutine
 from collections.abc import Generator
 from typing import Any
@@ -10,6 +13,7 @@ from typing import TypeVar
 T = TypeVar("T")
 
 ACTIVE_TASKS: set[asyncio.Task[Any]] = set()
+PERIODIC_TASKS: set[asyncio.Task[Any]] = set()
 
 
 def schedule_job(
@@ -73,3 +77,43 @@ async def await_running_jobs(
         return_when=asyncio.ALL_COMPLETED,
     )
     return done, pending
+
+
+def schedule_periodic_job(
+    job: Callable[[], Awaitable[None]],
+    *,
+    interval: float,
+) -> None:
+    """\
+    Run a coroutine function in the background every `interval` seconds.
+
+    Exceptions are logged and do not stop future runs. Periodic jobs run
+    until they are cancelled with `cancel_periodic_jobs`.
+    """
+    task = asyncio.create_task(_run_periodically(job, interval))
+    PERIODIC_TASKS.add(task)
+    task.add_done_callback(PERIODIC_TASKS.discard)
+    return None
+
+
+async def _run_periodically(
+    job: Callable[[], Awaitable[None]],
+    interval: float,
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception:
+            logging.exception(
+                "Failed to run periodic job",
+                extra={"job": job.__qualname__},
+            )
+
+
+async def cancel_periodic_jobs() -> None:
+    """Cancel all periodic jobs, and wait for them to finish."""
+    for task in PERIODIC_TASKS:
+        task.cancel()
+
+    await asyncio.gather(*PERIODIC_TASKS, return_exceptions=True)
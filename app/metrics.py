@@ -0,0 +1,104 @@
+"""\
+Prometheus metrics for the service, and its dependencies.
+
+Metrics are exposed at `/metrics`. Histograms are used for all timings;
+their `_count` series double as request/query counters.
+"""
+
+import sys
+
+from prometheus_client import Counter
+from prometheus_client import Histogram
+
+# Buckets for dependencies which usually respond in a millisecond or less.
+FAST_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time taken to handle HTTP requests, by route template.",
+    ["method", "route", "status_code"],
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time taken to run database queries, by calling repository function.",
+    ["function"],
+    buckets=FAST_BUCKETS,
+)
+
+DB_QUERY_ROWS = Histogram(
+    "db_query_rows",
+    "Number of rows returned by database reads, by calling repository function.",
+    ["function"],
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000),
+)
+
+DB_REPEATED_QUERIES = Counter(
+    "db_repeated_queries_total",
+    "Requests which ran a repository function's query repeatedly (N+1).",
+    ["route", "function"],
+)
+
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Time taken to run redis commands.",
+    ["command"],
+    buckets=FAST_BUCKETS,
+)
+
+S3_REQUEST_DURATION = Histogram(
+    "s3_request_duration_seconds",
+    "Time taken to receive responses to S3 requests.",
+    ["operation"],
+)
+
+HTTP_CLIENT_REQUEST_DURATION = Histogram(
+    "http_client_request_duration_seconds",
+    "Time taken to receive responses to outbound HTTP requests.",
+    ["client", "method", "status_code"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop runs periodic checks, i.e. how long it was blocked.",
+    buckets=FAST_BUCKETS,
+)
+
+REPOSITORIES_MODULE_PREFIX = "app.repositories."
+
+# How far up the stack to look for a repository function; deep enough for
+# the database methods, without walking whole stacks for ad-hoc queries.
+MAX_CALLER_SEARCH_DEPTH = 8
+
+
+def find_repository_caller(depth: int) -> str:
+    """\
+    Name the nearest repository function on the stack, starting `depth`
+    frames above the caller, in the form `<repository>.<function>`.
+    """
+    frame = sys._getframe(depth + 1)
+    for _ in range(MAX_CALLER_SEARCH_DEPTH):
+        module_name: str = frame.f_globals.get("__name__", "")
+        if module_name.startswith(REPOSITORIES_MODULE_PREFIX):
+            repository = module_name.removeprefix(REPOSITORIES_MODULE_PREFIX)
+            return f"{repository}.{frame.f_code.co_name}"
+
+        if frame.f_back is None:
+            break
+        frame = frame.f_back
+
+    return "unknown"
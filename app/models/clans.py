@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+
+from app.common_types import ClanStatus
+
+
+class Clan(BaseModel):
+    id: int
+    name: str
+    tag: str
+    description: str
+    icon: str
+    background: str
+    owner: int
+    status: ClanStatus
+
+
+class ClanMemberStats(BaseModel):
+    pp: int
+    ranked_score: int
+    accuracy: float
+    playcount: int
+
+
+class ClanMember(BaseModel):
+    id: int
+    username: str
+    country: str
+    stats: ClanMemberStats | None
+
+
+class ClanMembers(BaseModel):
+    members: list[ClanMember]
+    # pass as `after_user_id` to fetch the next page; null on the last page
+    next_after_user_id: int | None
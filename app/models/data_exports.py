@@ -0,0 +1,12 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class DataExportRecord(BaseModel):
+    type: str
+    data: dict[str, Any]
+
+
+class DataExport(BaseModel):
+    object_key: str
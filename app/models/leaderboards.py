@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    username: str
+    country: str
+    pp: int
+    ranked_score: int
+    accuracy: float
+
+
+class Leaderboard(BaseModel):
+    total: int
+    entries: list[LeaderboardEntry]
+
+
+class LeaderboardPosition(BaseModel):
+    rank: int
+    country_rank: int
+    total: int
+    percentile: float  # percentage of ranked users placed below this user
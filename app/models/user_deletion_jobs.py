@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app.common_types import UserDeletionJobStatus
+
+
+class UserDeletionCounts(BaseModel):
+    deleted: int
+    skipped: int  # not found, or already being deleted
+    pending_user_ids: list[int]  # failed, and left to be resumed individually
+
+
+class UserDeletionJob(BaseModel):
+    job_id: str
+    status: UserDeletionJobStatus
+    total: int
+    deleted: int
+    skipped: int
+    pending: int  # failed, and being resumed individually
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class RelatedUser(BaseModel):
+    id: int
+    username: str
+    country: str
+
+
+class RelatedUsers(BaseModel):
+    users: list[RelatedUser]
+    # pass as `after_id` to fetch the next page; null on the last page
+    next_after_id: int | None
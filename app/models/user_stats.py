@@ -19,3 +19,5 @@ class UserStats(BaseModel):
     c_count: int
     d_count: int
     max_combo: int
+    global_rank: int | None
+    country_rank: int | None
@@ -24,6 +24,12 @@ class Badge(BaseModel):
     colour: str
 
 
+class UserClan(BaseModel):
+    id: int
+    name: str
+    tag: str
+
+
 class User(BaseModel):
     id: int
     username: str
@@ -33,6 +39,7 @@ class User(BaseModel):
     userpage_content: str | None
     country: str
     clan_id: int
+    clan: UserClan | None  # only included on request
     followers: int
     favourite_mode: GameMode
     play_style: UserPlayStyle
@@ -43,3 +50,8 @@ class User(BaseModel):
     custom_badge: CustomBadge
     silence_end: datetime
     silence_reason: str
+
+
+class UserSearchResult(BaseModel):
+    id: int
+    username: str
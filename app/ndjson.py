@@ -0,0 +1,25 @@
+import zlib
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
+
+from pydantic import BaseModel
+
+
+async def encode_batches(
+    batches: AsyncIterator[Sequence[BaseModel]],
+) -> AsyncIterator[bytes]:
+    """Encode batches of models as newline-delimited json; one chunk per batch."""
+    async for batch in batches:
+        if batch:
+            yield b"".join(model.model_dump_json().encode() + b"\n" for model in batch)
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a stream of chunks into a single gzip stream."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed_chunk = compressor.compress(chunk)
+        if compressed_chunk:
+            yield compressed_chunk
+
+    yield compressor.flush()
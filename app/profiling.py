@@ -0,0 +1,62 @@
+"""\
+An in-process sampling profiler, for looking inside a running worker.
+
+Like py-spy, a background thread periodically captures the stack of the
+profiled thread; unlike cProfile, the profiled code runs at full speed,
+so it is safe to use in production. Results are in the collapsed-stack
+format read by flamegraph.pl, speedscope & others:
+
+    module:function;module:function;... <sample count>
+
+Code running while holding the GIL (e.g. in pydantic-core) delays the
+sampler, so long-running native calls are under-sampled; they are still
+attributed to the python function which called them.
+"""
+
+import collections
+import sys
+import time
+from types import FrameType
+
+DEFAULT_SAMPLE_INTERVAL = 0.005  # 200Hz
+
+
+def _describe_frame(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "<unknown>")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _collapse_stack(frame: FrameType | None) -> str:
+    frames: list[str] = []
+    while frame is not None:
+        frames.append(_describe_frame(frame))
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+def sample_stacks(
+    thread_id: int,
+    *,
+    duration: float,
+    interval: float = DEFAULT_SAMPLE_INTERVAL,
+) -> collections.Counter[str]:
+    """\
+    Sample a thread's stack every `interval` seconds for `duration` seconds,
+    from the calling thread. Returns the number of samples of each stack.
+    """
+    stack_counts: collections.Counter[str] = collections.Counter()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:  # the thread has exited
+            break
+
+        stack_counts[_collapse_stack(frame)] += 1
+        del frame  # avoid keeping the thread's frames alive
+
+        time.sleep(interval)
+    return stack_counts
+
+
+def format_collapsed_stacks(stack_counts: collections.Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stack_counts.most_common())
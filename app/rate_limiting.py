@@ -0,0 +1,92 @@
+import logging
+import math
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+import app.state
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+
+class RateLimit(BaseModel):
+    key: str
+    limit: int  # number of requests permitted ...
+    period: int  # ... over this many seconds
+
+
+# Generic cell rate algorithm (GCRA), applied to every key atomically.
+# Each key stores a "theoretical arrival time" in milliseconds; a request
+# is only recorded if every key permits it, so an exceeded per-account
+# limit does not also drain the per-ip allowance (or vice versa).
+# Returns 0 if the request is permitted, otherwise the time in ms until
+# it would be permitted.
+GCRA_SCRIPT = """\
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local retry_after = 0
+local new_tats = {}
+for i, key in ipairs(KEYS) do
+    local emission_interval = tonumber(ARGV[i * 2 - 1])
+    local burst_tolerance = tonumber(ARGV[i * 2])
+
+    local tat = math.max(tonumber(redis.call("GET", key)) or now, now)
+    local new_tat = tat + emission_interval
+    local allow_at = new_tat - burst_tolerance
+    if allow_at > now then
+        retry_after = math.max(retry_after, allow_at - now)
+    end
+    new_tats[i] = new_tat
+end
+
+if retry_after > 0 then
+    return retry_after
+end
+
+for i, key in ipairs(KEYS) do
+    redis.call("SET", key, new_tats[i], "PX", new_tats[i] - now)
+end
+return 0
+"""
+
+_gcra_script: "AsyncScript | None" = None
+
+
+def _get_gcra_script() -> "AsyncScript":
+    global _gcra_script
+    if _gcra_script is None:
+        _gcra_script = app.state.redis.register_script(GCRA_SCRIPT)
+    return _gcra_script
+
+
+async def acquire(rate_limits: list[RateLimit]) -> int | None:
+    """\
+    Record a request against all of the given rate limits.
+
+    Returns None if the request is permitted, otherwise the number of
+    seconds the client should wait before retrying (for `Retry-After`).
+    """
+    keys: list[str] = []
+    args: list[int] = []
+    for rate_limit in rate_limits:
+        period_ms = rate_limit.period * 1000
+        keys.append(f"users-service:rate-limits:{rate_limit.key}")
+        args.append(period_ms // rate_limit.limit)  # emission interval
+        args.append(period_ms)  # burst tolerance
+
+    try:
+        retry_after_ms = await _get_gcra_script()(keys=keys, args=args)
+    except Exception:
+        # fail open; an unavailable redis should not lock everyone out
+        logging.exception(
+            "Failed to evaluate rate limits",
+            extra={"rate_limit_keys": keys},
+        )
+        return None
+
+    if not retry_after_ms:
+        return None
+
+    return math.ceil(int(retry_after_ms) / 1000)
@@ -71,3 +71,24 @@ async def delete_one(hashed_access_token: str) -> None:
     """
     params = {"hashed_access_token": hashed_access_token}
     await app.state.database.execute(query, params)
+
+
+async def fetch_all_by_user_id(user_id: int, /) -> list[AccessToken]:
+    query = f"""\
+        SELECT {READ_PARAMS}
+        FROM tokens
+        WHERE user = :user_id
+    """
+    params = {"user_id": user_id}
+    recs = await app.state.database.fetch_all(query, params)
+    return [
+        AccessToken(
+            hashed_access_token=rec["token"],
+            user_id=rec["user"],
+            privileges=UserPrivileges(rec["privileges"]),
+            description=rec["description"],
+            private=rec["private"],
+            last_updated=rec["last_updated"],
+        )
+        for rec in recs
+    ]
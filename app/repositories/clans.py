@@ -1,15 +1,11 @@
-from enum import IntEnum
+import logging
+from collections.abc import Collection
 
 from pydantic import BaseModel
+from redis.exceptions import RedisError
 
 import app.state
-
-
-class ClanStatus(IntEnum):
-    CLOSED = 0
-    OPEN_FOR_ALL = 1
-    INVITE_ONLY = 2
-    REQUEST_TO_JOIN = 3
+from app.common_types import ClanStatus
 
 
 class Clan(BaseModel):
@@ -29,7 +25,32 @@ READ_PARAMS = """\
 """
 
 
-async def fetch_one_by_clan_id(clan_id: int, /) -> Clan | None:
+# Clans are read on every profile view, but rarely change, so they're cached.
+# Clans may also be modified by other services, which don't invalidate the
+# cache, so entries are kept only briefly.
+CLAN_CACHE_TTL = 60 * 5
+
+
+def _clan_cache_key(clan_id: int) -> str:
+    return f"users-service:clans:{clan_id}"
+
+
+async def fetch_one_by_clan_id(
+    clan_id: int,
+    /,
+    *,
+    use_cache: bool = True,
+) -> Clan | None:
+    if use_cache:
+        try:
+            cached_clan = await app.state.redis.get(_clan_cache_key(clan_id))
+        except RedisError:
+            # the cache is only an optimization; fall back to mysql
+            logging.warning("Failed to read cached clan", exc_info=True)
+            cached_clan = None
+        if cached_clan is not None:
+            return Clan.model_validate_json(cached_clan)
+
     query = f"""\
         SELECT {READ_PARAMS}
         FROM clans
@@ -37,21 +58,38 @@ async def fetch_one_by_clan_id(clan_id: int, /) -> Clan | None:
     """
     params = {"clan_id": clan_id}
 
-    clan = await app.state.database.fetch_one(query, params)
-    if clan is None:
+    rec = await app.state.database.fetch_one(query, params)
+    if rec is None:
         return None
 
-    return Clan(
-        id=clan["id"],
-        name=clan["name"],
-        tag=clan["tag"],
-        description=clan["description"],
-        icon=clan["icon"],
-        background=clan["background"],
-        owner=clan["owner"],
-        invite=clan["invite"],
-        status=ClanStatus(clan["status"]),
+    clan = Clan(
+        id=rec["id"],
+        name=rec["name"],
+        tag=rec["tag"],
+        description=rec["description"],
+        icon=rec["icon"],
+        background=rec["background"],
+        owner=rec["owner"],
+        invite=rec["invite"],
+        status=ClanStatus(rec["status"]),
     )
+    try:
+        await app.state.redis.set(
+            _clan_cache_key(clan_id),
+            clan.model_dump_json(),
+            ex=CLAN_CACHE_TTL,
+        )
+    except RedisError:
+        logging.warning("Failed to cache clan", exc_info=True)
+    return clan
+
+
+async def invalidate_cache(clan_id: int, /) -> None:
+    """\
+    Invalidate a clan's cached entry. Must be called after writes to the
+    clan are committed, so that concurrent reads can't re-cache stale data.
+    """
+    await app.state.redis.delete(_clan_cache_key(clan_id))
 
 
 async def update_owner(clan_id: int, new_owner: int) -> None:
@@ -65,6 +103,42 @@ async def update_owner(clan_id: int, new_owner: int) -> None:
     await app.state.database.execute(query, params)
 
 
+async def transfer_ownership_to_successor(
+    clan_id: int,
+    /,
+    *,
+    excluded_user_ids: Collection[int],
+) -> bool:
+    """\
+    Transfer a clan's ownership to the first of its members ordered by
+    (privileges, latest_activity, id), excluding the given users, which
+    must include the current owner. The successor is chosen and ownership
+    updated in a single statement.
+
+    Returns whether a successor was found.
+    """
+    params: dict[str, int] = {
+        f"excluded_user_id_{i}": user_id for i, user_id in enumerate(excluded_user_ids)
+    }
+    query = f"""\
+        UPDATE clans
+        INNER JOIN (
+            SELECT id
+            FROM users
+            WHERE clan_id = :clan_id
+            AND id NOT IN ({", ".join(f":{key}" for key in params)})
+            ORDER BY privileges, latest_activity, id
+            LIMIT 1
+        ) AS successor
+        SET clans.owner = successor.id
+        WHERE clans.id = :clan_id
+    """
+    params["clan_id"] = clan_id
+
+    updated_count: int = await app.state.database.execute(query, params)
+    return updated_count > 0
+
+
 async def delete_one_by_clan_id(clan_id: int, /) -> None:
     query = """\
         DELETE FROM clans
@@ -0,0 +1,88 @@
+import secrets
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
+
+import app.state
+from app.repositories.user_relationships import FollowerCount
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+# Users' follower counts are held in a redis hash, rebuilt in full from the
+# users_relationships table periodically. Relationships are written by other
+# services, so counts lag behind them by up to the sync interval. Until the
+# first build completes, there are no counts; users absent from a built hash
+# have no followers.
+FOLLOWER_COUNTS_KEY = "users-service:follower-counts"
+
+# KEYS: [follower counts hash]
+# ARGV: [user id]
+FETCH_ONE_SCRIPT = """\
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return nil
+end
+return tonumber(redis.call("HGET", KEYS[1], ARGV[1]) or "0")
+"""
+
+# KEYS: [build hash]
+# ARGV: [(user id, count)...]
+# Builds expire, in case they are abandoned before being swapped in.
+ADD_TO_BUILD_SCRIPT = """\
+for i = 1, #ARGV, 2 do
+    redis.call("HSET", KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call("EXPIRE", KEYS[1], 3600)
+"""
+
+# KEYS: [build hash, follower counts hash]
+SWAP_IN_BUILD_SCRIPT = """\
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    redis.call("RENAME", KEYS[1], KEYS[2])
+    redis.call("PERSIST", KEYS[2])
+else
+    -- nobody follows anyone; keep an (otherwise unused) marker field,
+    -- as empty hashes do not exist in redis
+    redis.call("DEL", KEYS[2])
+    redis.call("HSET", KEYS[2], "0", 0)
+end
+"""
+
+_scripts: dict[str, "AsyncScript"] = {}
+
+
+def _get_script(script: str) -> "AsyncScript":
+    registered_script = _scripts.get(script)
+    if registered_script is None:
+        registered_script = app.state.redis.register_script(script)
+        _scripts[script] = registered_script
+    return registered_script
+
+
+async def fetch_one(user_id: int, /) -> int | None:
+    """Fetch a user's follower count, or None if counts are not yet built."""
+    follower_count = await _get_script(FETCH_ONE_SCRIPT)(
+        keys=[FOLLOWER_COUNTS_KEY],
+        args=[user_id],
+    )
+    return int(follower_count) if follower_count is not None else None
+
+
+async def replace_all(
+    follower_count_batches: AsyncIterator[list[FollowerCount]],
+) -> None:
+    """\
+    Replace all follower counts with the given counts.
+
+    The new counts are built in a temporary key, and swapped in atomically
+    once complete, so readers never observe partially built counts.
+    """
+    build_key = f"{FOLLOWER_COUNTS_KEY}:build-{secrets.token_hex(8)}"
+
+    async for follower_counts in follower_count_batches:
+        args: list[int] = []
+        for follower_count in follower_counts:
+            args.extend((follower_count.user_id, follower_count.count))
+
+        await _get_script(ADD_TO_BUILD_SCRIPT)(keys=[build_key], args=args)
+
+    await _get_script(SWAP_IN_BUILD_SCRIPT)(keys=[build_key, FOLLOWER_COUNTS_KEY])
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import secrets
+from collections.abc import AsyncIterator
+from collections.abc import Mapping
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+import app.state
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+# Locks are held in redis, so that they are shared by all workers. Each
+# holder takes its lock with a random token, and only releases or renews
+# the lock while it still holds that token, so a holder which outlives
+# its lock's timeout can't release or extend another holder's lock.
+
+# KEYS: [lock]
+# ARGV: [token]
+RELEASE_SCRIPT = """\
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# KEYS: [lock]
+# ARGV: [token, timeout]
+RENEW_SCRIPT = """\
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_scripts: dict[str, "AsyncScript"] = {}
+
+
+def _get_script(script: str) -> "AsyncScript":
+    registered_script = _scripts.get(script)
+    if registered_script is None:
+        registered_script = app.state.redis.register_script(script)
+        _scripts[script] = registered_script
+    return registered_script
+
+
+async def try_acquire(key: str, /, *, timeout: int) -> str | None:
+    """Take a lock for up to `timeout` seconds. Returns its token, if taken."""
+    token = secrets.token_hex(16)
+    acquired = await app.state.redis.set(key, token, nx=True, ex=timeout)
+    return token if acquired else None
+
+
+async def renew(key: str, token: str, /, *, timeout: int) -> bool:
+    """Extend a held lock to `timeout` seconds. Returns False if it was lost."""
+    renewed = await _get_script(RENEW_SCRIPT)(keys=[key], args=[token, timeout])
+    return bool(renewed)
+
+
+async def release(key: str, token: str, /) -> None:
+    await _get_script(RELEASE_SCRIPT)(keys=[key], args=[token])
+
+
+@asynccontextmanager
+async def keep_renewed(
+    tokens_by_key: Mapping[str, str],
+    /,
+    *,
+    timeout: int,
+) -> AsyncIterator[None]:
+    """Renew held locks every third of `timeout` until the block exits."""
+
+    async def renew_periodically() -> None:
+        while True:
+            await asyncio.sleep(timeout / 3)
+            for key, token in tokens_by_key.items():
+                try:
+                    renewed = await renew(key, token, timeout=timeout)
+                except Exception:
+                    logging.warning(
+                        "Failed to renew lock",
+                        exc_info=True,
+                        extra={"lock_key": key},
+                    )
+                    continue
+
+                if not renewed:
+                    logging.warning(
+                        "Lock was lost before its holder finished",
+                        extra={"lock_key": key},
+                    )
+
+    task = asyncio.create_task(renew_periodically())
+    try:
+        yield
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
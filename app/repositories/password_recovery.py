@@ -1,5 +1,7 @@
+from collections.abc import AsyncIterator
 from datetime import datetime
 from enum import IntEnum
+from typing import Any
 
 from pydantic import BaseModel
 
@@ -17,25 +19,31 @@ READ_PARAMS = """\
     id, k, u, t
 """
 
+READ_BATCH_SIZE = 1000
 
-async def delete_many_by_username(username: str, /) -> list[PasswordRecovery]:
+
+async def fetch_many_by_username(
+    username: str,
+    /,
+    *,
+    after_id: int,
+    limit: int,
+) -> list[PasswordRecovery]:
     query = f"""\
         SELECT {READ_PARAMS}
         FROM password_recovery
         WHERE u = :username
+        AND id > :after_id
+        ORDER BY id
+        LIMIT :limit
     """
-    params = {"username": username}
-    recs = await app.state.database.fetch_all(query, params)
-    if not recs:
-        return []
-
-    query = """\
-        DELETE FROM password_recovery
-        WHERE u = :username
-    """
-    params = {"username": username}
-    await app.state.database.execute(query, params)
+    params: dict[str, Any] = {
+        "username": username,
+        "after_id": after_id,
+        "limit": limit,
+    }
 
+    recs = await app.state.database.fetch_all(query, params)
     return [
         PasswordRecovery(
             id=rec["id"],
@@ -45,3 +53,71 @@ async def delete_many_by_username(username: str, /) -> list[PasswordRecovery]:
         )
         for rec in recs
     ]
+
+
+async def iter_all_by_username(
+    username: str, /
+) -> AsyncIterator[list[PasswordRecovery]]:
+    """Iterate over all of a user's password recovery tokens, in batches."""
+    after_id = 0
+    while True:
+        recs = await fetch_many_by_username(
+            username,
+            after_id=after_id,
+            limit=READ_BATCH_SIZE,
+        )
+        if recs:
+            yield recs
+        if len(recs) < READ_BATCH_SIZE:
+            return
+
+        after_id = recs[-1].id
+
+
+DELETE_BATCH_SIZE = 1000
+
+
+async def delete_many_by_username(username: str, /) -> int:
+    """\
+    Delete all of a user's password recovery tokens in batches, to avoid
+    holding long row locks. Returns the number of deleted rows.
+    """
+    query = """\
+        DELETE FROM password_recovery
+        WHERE u = :username
+        LIMIT :limit
+    """
+    params: dict[str, Any] = {"username": username, "limit": DELETE_BATCH_SIZE}
+
+    deleted_count = 0
+    while True:
+        batch_deleted_count: int = await app.state.database.execute(query, params)
+        deleted_count += batch_deleted_count
+        if batch_deleted_count < DELETE_BATCH_SIZE:
+            return deleted_count
+
+
+async def delete_many_by_usernames(usernames: list[str], /) -> int:
+    """\
+    Delete all of many users' password recovery tokens in batches, to avoid
+    holding long row locks. Returns the number of deleted rows.
+    """
+    if not usernames:
+        return 0
+
+    params: dict[str, Any] = {
+        f"username_{i}": username for i, username in enumerate(usernames)
+    }
+    query = f"""\
+        DELETE FROM password_recovery
+        WHERE u IN ({", ".join(f":{key}" for key in params)})
+        LIMIT :limit
+    """
+    params["limit"] = DELETE_BATCH_SIZE
+
+    deleted_count = 0
+    while True:
+        batch_deleted_count: int = await app.state.database.execute(query, params)
+        deleted_count += batch_deleted_count
+        if batch_deleted_count < DELETE_BATCH_SIZE:
+            return deleted_count
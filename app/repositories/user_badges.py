@@ -15,7 +15,59 @@ READ_PARAMS = """\
 """
 
 
+# The badge catalog is small and rarely changes, so it is held in memory
+# and refreshed every minute, and per-user lookups only fetch badge ids.
+_catalog: dict[int, Badge] | None = None
+
+
+async def fetch_catalog() -> list[Badge]:
+    query = """\
+        SELECT id, name, icon, colour
+        FROM badges
+    """
+    recs = await app.state.database.fetch_all(query)
+    return [
+        Badge(
+            id=rec["id"],
+            name=rec["name"],
+            icon=rec["icon"],
+            colour=rec["colour"],
+        )
+        for rec in recs
+    ]
+
+
+async def load_catalog() -> None:
+    global _catalog
+    _catalog = {badge.id: badge for badge in await fetch_catalog()}
+
+
+async def fetch_ids_by_user_id(user_id: int) -> list[int]:
+    query = """\
+        SELECT badge
+        FROM user_badges
+        WHERE user = :user_id
+    """
+    params = {"user_id": user_id}
+
+    recs = await app.state.database.fetch_all(query, params)
+    return [rec["badge"] for rec in recs]
+
+
 async def fetch_all_by_user_id(user_id: int) -> list[Badge]:
+    if _catalog is None:
+        return await _fetch_all_by_user_id_uncached(user_id)
+
+    # as with an inner join, ids missing from the catalog are skipped;
+    # badges created since the last refresh appear on the next one
+    return [
+        _catalog[badge_id]
+        for badge_id in await fetch_ids_by_user_id(user_id)
+        if badge_id in _catalog
+    ]
+
+
+async def _fetch_all_by_user_id_uncached(user_id: int) -> list[Badge]:
     query = f"""\
         SELECT {READ_PARAMS}
         FROM user_badges
@@ -0,0 +1,33 @@
+from typing import cast
+
+import app.state
+
+# The expiry of each user's deletion archive is held in a sorted set, scored
+# by unix timestamp, so that archives can be purged once their retention
+# period has elapsed.
+USER_DELETION_ARCHIVE_EXPIRIES_KEY = "users-service:user-deletion-archives:expiries"
+
+
+async def set_expiry(user_id: int, /, *, expires_at: int) -> None:
+    await app.state.redis.zadd(
+        USER_DELETION_ARCHIVE_EXPIRIES_KEY,
+        {str(user_id): expires_at},
+    )
+
+
+async def fetch_expired_user_ids(*, now: int, limit: int) -> list[int]:
+    user_ids = cast(
+        list[bytes],
+        await app.state.redis.zrangebyscore(
+            USER_DELETION_ARCHIVE_EXPIRIES_KEY,
+            "-inf",
+            now,
+            start=0,
+            num=limit,
+        ),
+    )
+    return [int(user_id) for user_id in user_ids]
+
+
+async def delete_expiry(user_id: int, /) -> None:
+    await app.state.redis.zrem(USER_DELETION_ARCHIVE_EXPIRIES_KEY, str(user_id))
@@ -0,0 +1,259 @@
+import uuid
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+import app.state
+from app.common_types import UserDeletionJobStatus
+from app.repositories import locks
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+# Jobs are kept for a week after their last update, for status reporting.
+USER_DELETION_JOB_TTL = 60 * 60 * 24 * 7
+
+# The user ids which a job has yet to process are persisted in redis, so that
+# a job which fails (or is interrupted) part-way through can be resumed. Users
+# whose deletion failed within a batch are resumed individually, and are held
+# as the job's pending users until then.
+PENDING_USER_DELETION_JOBS_KEY = "users-service:user-deletion-jobs:pending"
+
+USER_DELETION_JOB_LOCK_TIMEOUT = 60 * 10
+
+
+class UserDeletionJob(BaseModel):
+    job_id: str
+    status: UserDeletionJobStatus
+    total: int
+    deleted: int
+    skipped: int  # not found, or already being deleted
+    pending: int  # failed, and being resumed individually
+    created_at: datetime
+    updated_at: datetime
+
+
+def _job_key(job_id: str) -> str:
+    return f"users-service:user-deletion-jobs:{job_id}"
+
+
+def _remaining_user_ids_key(job_id: str) -> str:
+    return f"{_job_key(job_id)}:remaining-user-ids"
+
+
+def _pending_user_ids_key(job_id: str) -> str:
+    return f"{_job_key(job_id)}:pending-user-ids"
+
+
+def _lock_key(job_id: str) -> str:
+    return f"{_job_key(job_id)}:lock"
+
+
+# KEYS: [job, remaining user ids, pending user ids]
+# ARGV: [batch size, deleted, skipped, updated at, job ttl, pending user ids...]
+# Records a processed batch's counts & pending users, and removes its user
+# ids from the job's remaining user ids, atomically.
+COMPLETE_BATCH_SCRIPT = """\
+redis.call("HINCRBY", KEYS[1], "deleted", ARGV[2])
+redis.call("HINCRBY", KEYS[1], "skipped", ARGV[3])
+redis.call("HINCRBY", KEYS[1], "pending", #ARGV - 5)
+redis.call("HSET", KEYS[1], "updated_at", ARGV[4])
+redis.call("EXPIRE", KEYS[1], ARGV[5])
+redis.call("LTRIM", KEYS[2], ARGV[1], -1)
+redis.call("EXPIRE", KEYS[2], ARGV[5])
+if #ARGV > 5 then
+    redis.call("SADD", KEYS[3], unpack(ARGV, 6))
+    redis.call("EXPIRE", KEYS[3], ARGV[5])
+end
+"""
+
+# KEYS: [job, pending user ids]
+# ARGV: [updated at, job ttl, deleted user ids...]
+# Counts pending users as deleted, once their individual deletions finish.
+RESOLVE_PENDING_USERS_SCRIPT = """\
+local resolved_count = redis.call("SREM", KEYS[2], unpack(ARGV, 3))
+redis.call("HINCRBY", KEYS[1], "pending", -resolved_count)
+redis.call("HINCRBY", KEYS[1], "deleted", resolved_count)
+redis.call("HSET", KEYS[1], "updated_at", ARGV[1])
+redis.call("EXPIRE", KEYS[1], ARGV[2])
+"""
+
+_scripts: dict[str, "AsyncScript"] = {}
+
+
+def _get_script(script: str) -> "AsyncScript":
+    registered_script = _scripts.get(script)
+    if registered_script is None:
+        registered_script = app.state.redis.register_script(script)
+        _scripts[script] = registered_script
+    return registered_script
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+async def create(user_ids: list[int]) -> UserDeletionJob:
+    now = datetime.now()
+    job = UserDeletionJob(
+        job_id=str(uuid.uuid4()),
+        status=UserDeletionJobStatus.QUEUED,
+        total=len(user_ids),
+        deleted=0,
+        skipped=0,
+        pending=0,
+        created_at=now,
+        updated_at=now,
+    )
+    await app.state.redis.hset(
+        _job_key(job.job_id),
+        mapping={
+            "status": job.status.value,
+            "total": job.total,
+            "deleted": job.deleted,
+            "skipped": job.skipped,
+            "pending": job.pending,
+            "created_at": job.created_at.isoformat(),
+            "updated_at": job.updated_at.isoformat(),
+        },
+    )
+    await app.state.redis.expire(_job_key(job.job_id), USER_DELETION_JOB_TTL)
+    await app.state.redis.rpush(_remaining_user_ids_key(job.job_id), *user_ids)
+    await app.state.redis.expire(
+        _remaining_user_ids_key(job.job_id),
+        USER_DELETION_JOB_TTL,
+    )
+    await app.state.redis.sadd(PENDING_USER_DELETION_JOBS_KEY, job.job_id)
+    return job
+
+
+async def fetch_one(job_id: str, /) -> UserDeletionJob | None:
+    job = {
+        _decode(key): _decode(value)
+        for key, value in (await app.state.redis.hgetall(_job_key(job_id))).items()
+    }
+    if not job:
+        return None
+
+    return UserDeletionJob(
+        job_id=job_id,
+        status=UserDeletionJobStatus(job["status"]),
+        total=int(job["total"]),
+        deleted=int(job["deleted"]),
+        skipped=int(job["skipped"]),
+        pending=int(job["pending"]),
+        created_at=datetime.fromisoformat(job["created_at"]),
+        updated_at=datetime.fromisoformat(job["updated_at"]),
+    )
+
+
+async def update_status(job_id: str, status: UserDeletionJobStatus) -> None:
+    await app.state.redis.hset(
+        _job_key(job_id),
+        mapping={
+            "status": status.value,
+            "updated_at": datetime.now().isoformat(),
+        },
+    )
+    await app.state.redis.expire(_job_key(job_id), USER_DELETION_JOB_TTL)
+
+
+async def try_start(job_id: str, /) -> str | None:
+    """\
+    Take exclusive ownership of processing a job. Returns the ownership's
+    lock token, or None if it is already being processed.
+    """
+    return await locks.try_acquire(
+        _lock_key(job_id),
+        timeout=USER_DELETION_JOB_LOCK_TIMEOUT,
+    )
+
+
+def keep_started(job_id: str, lock_token: str, /) -> AbstractAsyncContextManager[None]:
+    """Keep ownership of a job while it is being processed."""
+    return locks.keep_renewed(
+        {_lock_key(job_id): lock_token},
+        timeout=USER_DELETION_JOB_LOCK_TIMEOUT,
+    )
+
+
+async def release(job_id: str, lock_token: str, /) -> None:
+    """Release ownership of a job, leaving its remaining user ids as-is."""
+    await locks.release(_lock_key(job_id), lock_token)
+
+
+async def finish(job_id: str, lock_token: str, /) -> None:
+    """Mark a job as no longer pending, and release ownership of it."""
+    await app.state.redis.srem(PENDING_USER_DELETION_JOBS_KEY, job_id)
+    await app.state.redis.delete(
+        _remaining_user_ids_key(job_id),
+        _pending_user_ids_key(job_id),
+    )
+    await release(job_id, lock_token)
+
+
+async def discard(job_id: str, /) -> None:
+    """Mark an expired job as no longer pending."""
+    await app.state.redis.srem(PENDING_USER_DELETION_JOBS_KEY, job_id)
+    await app.state.redis.delete(
+        _remaining_user_ids_key(job_id),
+        _pending_user_ids_key(job_id),
+    )
+
+
+async def fetch_remaining_user_ids(job_id: str, /, *, limit: int) -> list[int]:
+    user_ids = await app.state.redis.lrange(
+        _remaining_user_ids_key(job_id),
+        0,
+        limit - 1,
+    )
+    return [int(user_id) for user_id in user_ids]
+
+
+async def complete_batch(
+    job_id: str,
+    *,
+    batch_size: int,
+    deleted: int,
+    skipped: int,
+    pending_user_ids: list[int],
+) -> None:
+    """\
+    Record the counts & pending users of a batch of the job's remaining
+    user ids, and remove them from the job's remaining user ids.
+    """
+    await _get_script(COMPLETE_BATCH_SCRIPT)(
+        keys=[
+            _job_key(job_id),
+            _remaining_user_ids_key(job_id),
+            _pending_user_ids_key(job_id),
+        ],
+        args=[
+            batch_size,
+            deleted,
+            skipped,
+            datetime.now().isoformat(),
+            USER_DELETION_JOB_TTL,
+            *pending_user_ids,
+        ],
+    )
+
+
+async def fetch_pending_user_ids(job_id: str, /) -> list[int]:
+    user_ids = await app.state.redis.smembers(_pending_user_ids_key(job_id))
+    return [int(user_id) for user_id in user_ids]
+
+
+async def resolve_pending_users(job_id: str, deleted_user_ids: list[int]) -> None:
+    """Count the job's pending users as deleted."""
+    await _get_script(RESOLVE_PENDING_USERS_SCRIPT)(
+        keys=[_job_key(job_id), _pending_user_ids_key(job_id)],
+        args=[datetime.now().isoformat(), USER_DELETION_JOB_TTL, *deleted_user_ids],
+    )
+
+
+async def fetch_pending_job_ids() -> list[str]:
+    job_ids = await app.state.redis.smembers(PENDING_USER_DELETION_JOBS_KEY)
+    return [_decode(job_id) for job_id in job_ids]
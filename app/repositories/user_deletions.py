@@ -0,0 +1,100 @@
+from contextlib import AbstractAsyncContextManager
+from enum import StrEnum
+
+import app.state
+from app.repositories import locks
+
+# The progress of user deletions is persisted in redis, so that a deletion
+# which fails (or is interrupted) part-way through can be resumed, without
+# repeating any side effects which were already completed.
+PENDING_USER_DELETIONS_KEY = "users-service:user-deletions:pending"
+
+USER_DELETION_LOCK_TIMEOUT = 60 * 10
+
+
+class UserDeletionStage(StrEnum):
+    WIPE_ASSOCIATED_DATA = "wipe_associated_data"
+    ANONYMIZE_USER = "anonymize_user"
+    DELETE_AVATAR = "delete_avatar"
+    DELETE_USER_CONTENT = "delete_user_content"
+    DELETE_RANKINGS = "delete_rankings"
+    PUBLISH_BAN = "publish_ban"
+
+
+def _progress_key(user_id: int) -> str:
+    return f"users-service:user-deletions:{user_id}:progress"
+
+
+def _lock_key(user_id: int) -> str:
+    return f"users-service:user-deletions:{user_id}:lock"
+
+
+async def try_start(user_id: int, /) -> str | None:
+    """\
+    Mark a user's deletion as pending, and take exclusive ownership of
+    processing it. Returns the ownership's lock token, or None if it is
+    already being processed.
+    """
+    lock_token = await locks.try_acquire(
+        _lock_key(user_id),
+        timeout=USER_DELETION_LOCK_TIMEOUT,
+    )
+    if lock_token is None:
+        return None
+
+    await app.state.redis.sadd(PENDING_USER_DELETIONS_KEY, str(user_id))
+    return lock_token
+
+
+def keep_started(
+    lock_tokens_by_user_id: dict[int, str],
+    /,
+) -> AbstractAsyncContextManager[None]:
+    """Keep ownership of users' deletions while they are being processed."""
+    return locks.keep_renewed(
+        {
+            _lock_key(user_id): lock_token
+            for user_id, lock_token in lock_tokens_by_user_id.items()
+        },
+        timeout=USER_DELETION_LOCK_TIMEOUT,
+    )
+
+
+async def release(user_id: int, lock_token: str, /) -> None:
+    """Release ownership of a user's deletion, leaving its progress as-is."""
+    await locks.release(_lock_key(user_id), lock_token)
+
+
+async def discard(user_id: int, /) -> None:
+    """Mark a user's deletion as no longer pending, and forget its progress."""
+    await app.state.redis.srem(PENDING_USER_DELETIONS_KEY, str(user_id))
+    await app.state.redis.delete(_progress_key(user_id))
+
+
+async def finish(user_id: int, lock_token: str, /) -> None:
+    """Mark a user's deletion as complete, and release ownership of it."""
+    await discard(user_id)
+    await release(user_id, lock_token)
+
+
+async def is_pending(user_id: int, /) -> bool:
+    return bool(
+        await app.state.redis.sismember(PENDING_USER_DELETIONS_KEY, str(user_id)),
+    )
+
+
+async def fetch_completed_stages(user_id: int, /) -> set[UserDeletionStage]:
+    stages = await app.state.redis.smembers(_progress_key(user_id))
+    return {
+        UserDeletionStage(stage.decode() if isinstance(stage, bytes) else stage)
+        for stage in stages
+    }
+
+
+async def mark_stage_completed(user_id: int, stage: UserDeletionStage) -> None:
+    await app.state.redis.sadd(_progress_key(user_id), stage.value)
+
+
+async def fetch_pending_user_ids() -> list[int]:
+    user_ids = await app.state.redis.smembers(PENDING_USER_DELETIONS_KEY)
+    return [int(user_id) for user_id in user_ids]
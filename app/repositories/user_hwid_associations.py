@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from typing import Any
 
 from pydantic import BaseModel
@@ -19,25 +20,27 @@ READ_PARAMS = """\
     id, userid, mac, unique_id, disk_id, occurencies, activated
 """
 
+READ_BATCH_SIZE = 1000
 
-async def delete_many_by_user_id(user_id: int, /) -> list[UserHwidAssociation]:
+
+async def fetch_many_by_user_id(
+    user_id: int,
+    /,
+    *,
+    after_id: int,
+    limit: int,
+) -> list[UserHwidAssociation]:
     query = f"""\
         SELECT {READ_PARAMS}
         FROM hw_user
         WHERE userid = :user_id
+        AND id > :after_id
+        ORDER BY id
+        LIMIT :limit
     """
-    params: dict[str, Any] = {"user_id": user_id}
-    recs = await app.state.database.fetch_all(query, params)
-    if not recs:
-        return []
-
-    query = """\
-        DELETE FROM hw_user
-        WHERE userid = :user_id
-    """
-    params = {"user_id": user_id}
-    await app.state.database.execute(query, params)
+    params: dict[str, Any] = {"user_id": user_id, "after_id": after_id, "limit": limit}
 
+    recs = await app.state.database.fetch_all(query, params)
     return [
         UserHwidAssociation(
             id=rec["id"],
@@ -50,3 +53,71 @@ async def delete_many_by_user_id(user_id: int, /) -> list[UserHwidAssociation]:
         )
         for rec in recs
     ]
+
+
+async def iter_all_by_user_id(
+    user_id: int, /
+) -> AsyncIterator[list[UserHwidAssociation]]:
+    """Iterate over all of a user's hwid associations, in batches."""
+    after_id = 0
+    while True:
+        recs = await fetch_many_by_user_id(
+            user_id,
+            after_id=after_id,
+            limit=READ_BATCH_SIZE,
+        )
+        if recs:
+            yield recs
+        if len(recs) < READ_BATCH_SIZE:
+            return
+
+        after_id = recs[-1].id
+
+
+DELETE_BATCH_SIZE = 1000
+
+
+async def delete_many_by_user_id(user_id: int, /) -> int:
+    """\
+    Delete all of a user's hwid associations in batches, to avoid
+    holding long row locks. Returns the number of deleted rows.
+    """
+    query = """\
+        DELETE FROM hw_user
+        WHERE userid = :user_id
+        LIMIT :limit
+    """
+    params: dict[str, Any] = {"user_id": user_id, "limit": DELETE_BATCH_SIZE}
+
+    deleted_count = 0
+    while True:
+        batch_deleted_count: int = await app.state.database.execute(query, params)
+        deleted_count += batch_deleted_count
+        if batch_deleted_count < DELETE_BATCH_SIZE:
+            return deleted_count
+
+
+async def delete_many_by_user_ids(user_ids: list[int], /) -> int:
+    """\
+    Delete all of many users' hwid associations in batches, to avoid
+    holding long row locks. Returns the number of deleted rows.
+    """
+    if not user_ids:
+        return 0
+
+    params: dict[str, Any] = {
+        f"user_id_{i}": user_id for i, user_id in enumerate(user_ids)
+    }
+    query = f"""\
+        DELETE FROM hw_user
+        WHERE userid IN ({", ".join(f":{key}" for key in params)})
+        LIMIT :limit
+    """
+    params["limit"] = DELETE_BATCH_SIZE
+
+    deleted_count = 0
+    while True:
+        batch_deleted_count: int = await app.state.database.execute(query, params)
+        deleted_count += batch_deleted_count
+        if batch_deleted_count < DELETE_BATCH_SIZE:
+            return deleted_count
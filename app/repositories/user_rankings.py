@@ -0,0 +1,262 @@
+import logging
+import secrets
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
+from typing import cast
+
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+import app.state
+from app.common_types import AkatsukiMode
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+# Users' pp rankings are held in redis sorted sets; one per mode, and one per
+# mode & country. Each mode's ranked countries are held in a set, and its
+# ranked users' countries in a hash, so that a user's country ranking can be
+# found without reading the users table.
+#
+# Scores encode the user id below the pp, so that users with equal pp are
+# ranked by ascending user id, as in the stats snapshots. Scores are exact
+# (as doubles) for pp below 2**21.
+USER_ID_SCORE_BITS = 32
+
+# Builds expire, in case they are abandoned before being swapped in.
+BUILD_TTL = 60 * 60 * 2
+
+
+def _rankings_key(akatsuki_mode: AkatsukiMode) -> str:
+    return f"users-service:rankings:{akatsuki_mode.value}"
+
+
+def _user_countries_key(akatsuki_mode: AkatsukiMode) -> str:
+    return f"{_rankings_key(akatsuki_mode)}:user-countries"
+
+
+def _countries_key(akatsuki_mode: AkatsukiMode) -> str:
+    return f"{_rankings_key(akatsuki_mode)}:countries"
+
+
+def _country_rankings_key(akatsuki_mode: AkatsukiMode, country: str) -> str:
+    return f"{_rankings_key(akatsuki_mode)}:country:{country.lower()}"
+
+
+def _score(user_id: int, pp: int) -> int:
+    return (pp << USER_ID_SCORE_BITS) + ((1 << USER_ID_SCORE_BITS) - 1 - user_id)
+
+
+class UserRanking(BaseModel):
+    user_id: int
+    country: str
+    pp: int
+
+
+class UserRanks(BaseModel):
+    global_rank: int | None
+    country_rank: int | None
+
+
+# KEYS: [rankings build, user countries build, country rankings builds...]
+# ARGV: [ttl, (user id, score, country, country rankings build index)...]
+# All of the build's keys are passed, so that they expire together.
+ADD_TO_BUILD_SCRIPT = """\
+for i = 2, #ARGV, 4 do
+    local user_id, score, country = ARGV[i], ARGV[i + 1], ARGV[i + 2]
+    redis.call("ZADD", KEYS[1], score, user_id)
+    redis.call("HSET", KEYS[2], user_id, country)
+    redis.call("ZADD", KEYS[tonumber(ARGV[i + 3])], score, user_id)
+end
+for i = 1, #KEYS do
+    redis.call("EXPIRE", KEYS[i], ARGV[1])
+end
+"""
+
+# KEYS: [rankings build, rankings, user countries build, user countries,
+#        countries, (country rankings build, country rankings)...,
+#        unranked countries' rankings...]
+# ARGV: [ranked country count, ranked countries...]
+# Replaces the live rankings with the build, unless any of the build has
+# expired, in which case 0 is returned and the live rankings are kept.
+# Replaced keys are unlinked, so they are freed outside of the script.
+SWAP_IN_BUILD_SCRIPT = """\
+local country_count = tonumber(ARGV[1])
+
+if country_count > 0 then
+    if redis.call("EXISTS", KEYS[1]) == 0 or redis.call("EXISTS", KEYS[3]) == 0 then
+        return 0
+    end
+    for i = 6, 5 + country_count * 2, 2 do
+        if redis.call("EXISTS", KEYS[i]) == 0 then
+            return 0
+        end
+    end
+end
+
+redis.call("UNLINK", KEYS[2], KEYS[4], KEYS[5])
+for i = 6 + country_count * 2, #KEYS do
+    redis.call("UNLINK", KEYS[i])
+end
+
+if country_count > 0 then
+    redis.call("RENAME", KEYS[1], KEYS[2])
+    redis.call("PERSIST", KEYS[2])
+    redis.call("RENAME", KEYS[3], KEYS[4])
+    redis.call("PERSIST", KEYS[4])
+    for i = 6, 5 + country_count * 2, 2 do
+        redis.call("UNLINK", KEYS[i + 1])
+        redis.call("RENAME", KEYS[i], KEYS[i + 1])
+        redis.call("PERSIST", KEYS[i + 1])
+    end
+    redis.call("SADD", KEYS[5], unpack(ARGV, 2))
+end
+return 1
+"""
+
+# KEYS: [rankings..., user countries...]
+# ARGV: [user id, rankings count]
+DELETE_USER_SCRIPT = """\
+local rankings_count = tonumber(ARGV[2])
+for i = 1, rankings_count do
+    redis.call("ZREM", KEYS[i], ARGV[1])
+end
+for i = rankings_count + 1, #KEYS do
+    redis.call("HDEL", KEYS[i], ARGV[1])
+end
+"""
+
+_scripts: dict[str, "AsyncScript"] = {}
+
+
+def _get_script(script: str) -> "AsyncScript":
+    registered_script = _scripts.get(script)
+    if registered_script is None:
+        registered_script = app.state.redis.register_script(script)
+        _scripts[script] = registered_script
+    return registered_script
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+async def _fetch_country(user_id: int, akatsuki_mode: AkatsukiMode) -> str | None:
+    country = await app.state.redis.hget(_user_countries_key(akatsuki_mode), user_id)
+    return _decode(country) if country is not None else None
+
+
+async def _fetch_rank(rankings_key: str, user_id: int) -> int | None:
+    """Fetch a user's 1-indexed rank, if ranked."""
+    rank = cast(int | None, await app.state.redis.zrevrank(rankings_key, user_id))
+    return rank + 1 if rank is not None else None
+
+
+async def fetch_ranks(user_id: int, akatsuki_mode: AkatsukiMode) -> UserRanks:
+    """Fetch a user's ranks; they are unranked if ranks can't be fetched."""
+    try:
+        global_rank = await _fetch_rank(_rankings_key(akatsuki_mode), user_id)
+        if global_rank is None:
+            return UserRanks(global_rank=None, country_rank=None)
+
+        country_rank = None
+        country = await _fetch_country(user_id, akatsuki_mode)
+        if country is not None:
+            country_rank = await _fetch_rank(
+                _country_rankings_key(akatsuki_mode, country),
+                user_id,
+            )
+    except RedisError:
+        logging.warning(
+            "Failed to fetch user's ranks",
+            exc_info=True,
+            extra={"user_id": user_id, "akatsuki_mode": akatsuki_mode.value},
+        )
+        return UserRanks(global_rank=None, country_rank=None)
+
+    return UserRanks(global_rank=global_rank, country_rank=country_rank)
+
+
+async def replace_all(
+    akatsuki_mode: AkatsukiMode,
+    user_ranking_batches: AsyncIterator[list[UserRanking]],
+) -> None:
+    """\
+    Replace a mode's rankings with the given users' rankings.
+
+    The new rankings are built in temporary keys, and swapped in atomically
+    once complete, so readers never observe partially built rankings.
+    """
+    build_suffix = f"build-{secrets.token_hex(8)}"
+    rankings_build_key = f"{_rankings_key(akatsuki_mode)}:{build_suffix}"
+    user_countries_build_key = f"{_user_countries_key(akatsuki_mode)}:{build_suffix}"
+
+    build_keys = [rankings_build_key, user_countries_build_key]
+    build_key_indexes_by_country: dict[str, int] = {}
+
+    async for user_rankings in user_ranking_batches:
+        args: list[str | int] = [BUILD_TTL]
+        for user_ranking in user_rankings:
+            country = user_ranking.country.lower()
+            if country not in build_key_indexes_by_country:
+                build_keys.append(
+                    f"{_country_rankings_key(akatsuki_mode, country)}:{build_suffix}",
+                )
+                # lua tables are 1-indexed
+                build_key_indexes_by_country[country] = len(build_keys)
+
+            args.extend(
+                (
+                    user_ranking.user_id,
+                    _score(user_ranking.user_id, user_ranking.pp),
+                    country,
+                    build_key_indexes_by_country[country],
+                ),
+            )
+
+        await _get_script(ADD_TO_BUILD_SCRIPT)(keys=build_keys, args=args)
+
+    ranked_countries = list(build_key_indexes_by_country)
+    unranked_countries = {
+        _decode(country)
+        for country in await app.state.redis.smembers(_countries_key(akatsuki_mode))
+    } - set(ranked_countries)
+
+    keys = [
+        rankings_build_key,
+        _rankings_key(akatsuki_mode),
+        user_countries_build_key,
+        _user_countries_key(akatsuki_mode),
+        _countries_key(akatsuki_mode),
+    ]
+    for country in ranked_countries:
+        country_rankings_key = _country_rankings_key(akatsuki_mode, country)
+        keys.extend((f"{country_rankings_key}:{build_suffix}", country_rankings_key))
+    keys.extend(
+        _country_rankings_key(akatsuki_mode, country) for country in unranked_countries
+    )
+
+    swapped_in = await _get_script(SWAP_IN_BUILD_SCRIPT)(
+        keys=keys,
+        args=[len(ranked_countries), *ranked_countries],
+    )
+    if not swapped_in:
+        raise RuntimeError("User rankings build expired before completion")
+
+
+async def delete_all_by_user_id(user_id: int, /) -> None:
+    rankings_keys: list[str] = []
+    for akatsuki_mode in AkatsukiMode:
+        rankings_keys.append(_rankings_key(akatsuki_mode))
+
+        country = await _fetch_country(user_id, akatsuki_mode)
+        if country is not None:
+            rankings_keys.append(_country_rankings_key(akatsuki_mode, country))
+
+    await _get_script(DELETE_USER_SCRIPT)(
+        keys=[
+            *rankings_keys,
+            *(_user_countries_key(akatsuki_mode) for akatsuki_mode in AkatsukiMode),
+        ],
+        args=[user_id, len(rankings_keys)],
+    )
@@ -1,5 +1,8 @@
+from collections.abc import AsyncIterator
 from typing import cast
 
+from pydantic import BaseModel
+
 import app.state
 
 
@@ -13,3 +16,115 @@ async def fetch_follower_count_by_user_id(user_id: int) -> int:
 
     follower_count = await app.state.database.fetch_val(query, params)
     return cast(int, follower_count)
+
+
+class UserRelationship(BaseModel):
+    id: int
+    user_id: int  # the follower
+    target_user_id: int  # the followed user
+
+
+READ_PARAMS = """\
+    id, user1, user2
+"""
+
+
+async def fetch_many_by_target_user_id(
+    target_user_id: int,
+    /,
+    *,
+    after_id: int,
+    limit: int,
+) -> list[UserRelationship]:
+    """Fetch a page of a user's followers, in the order they followed."""
+    query = f"""\
+        SELECT {READ_PARAMS}
+        FROM users_relationships
+        WHERE user2 = :target_user_id
+        AND id > :after_id
+        ORDER BY id
+        LIMIT :limit
+    """
+    params = {"target_user_id": target_user_id, "after_id": after_id, "limit": limit}
+
+    recs = await app.state.database.fetch_all(query, params)
+    return [
+        UserRelationship(
+            id=rec["id"],
+            user_id=rec["user1"],
+            target_user_id=rec["user2"],
+        )
+        for rec in recs
+    ]
+
+
+async def fetch_many_by_user_id(
+    user_id: int,
+    /,
+    *,
+    after_id: int,
+    limit: int,
+) -> list[UserRelationship]:
+    """Fetch a page of the users a user follows, in the order they followed."""
+    query = f"""\
+        SELECT {READ_PARAMS}
+        FROM users_relationships
+        WHERE user1 = :user_id
+        AND id > :after_id
+        ORDER BY id
+        LIMIT :limit
+    """
+    params = {"user_id": user_id, "after_id": after_id, "limit": limit}
+
+    recs = await app.state.database.fetch_all(query, params)
+    return [
+        UserRelationship(
+            id=rec["id"],
+            user_id=rec["user1"],
+            target_user_id=rec["user2"],
+        )
+        for rec in recs
+    ]
+
+
+class FollowerCount(BaseModel):
+    user_id: int
+    count: int
+
+
+FOLLOWER_COUNTS_BATCH_SIZE = 10_000
+
+
+async def fetch_many_follower_counts(
+    *,
+    after_user_id: int,
+    limit: int,
+) -> list[FollowerCount]:
+    query = """\
+        SELECT user2, COUNT(*) AS count
+        FROM users_relationships
+        WHERE user2 > :after_user_id
+        GROUP BY user2
+        ORDER BY user2
+        LIMIT :limit
+    """
+    params = {"after_user_id": after_user_id, "limit": limit}
+
+    recs = await app.state.database.fetch_all(query, params)
+    return [FollowerCount(user_id=rec["user2"], count=rec["count"]) for rec in recs]
+
+
+async def iter_all_follower_counts() -> AsyncIterator[list[FollowerCount]]:
+    """Iterate over the follower counts of all followed users, in batches."""
+    after_user_id = 0
+    while True:
+        follower_counts = await fetch_many_follower_counts(
+            after_user_id=after_user_id,
+            limit=FOLLOWER_COUNTS_BATCH_SIZE,
+        )
+        if follower_counts:
+            yield follower_counts
+        if len(follower_counts) < FOLLOWER_COUNTS_BATCH_SIZE:
+            return
+
+        after_user_id = follower_counts[-1].user_id
@@ -1,7 +1,16 @@
+import asyncio
+import multiprocessing
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+
 from pydantic import BaseModel
 
 import app.state
 from app.common_types import AkatsukiMode
+from app.common_types import UserPrivileges
+from app.stats_snapshot import StatsSnapshot
+from app.stats_snapshot import build_orders
 
 
 class UserStats(BaseModel):
@@ -67,6 +76,45 @@ async def fetch_one_by_user_id_and_akatsuki_mode(
     )
 
 
+class UserStatsSummary(BaseModel):
+    user_id: int
+    pp: int
+    ranked_score: int
+    avg_accuracy: float
+    playcount: int
+
+
+async def fetch_many_summaries_by_user_ids_and_akatsuki_mode(
+    user_ids: list[int],
+    akatsuki_mode: AkatsukiMode,
+) -> list[UserStatsSummary]:
+    if not user_ids:
+        return []
+
+    params: dict[str, int] = {
+        f"user_id_{i}": user_id for i, user_id in enumerate(user_ids)
+    }
+    query = f"""\
+        SELECT user_id, pp, ranked_score, avg_accuracy, playcount
+        FROM user_stats
+        WHERE user_id IN ({", ".join(f":{key}" for key in params)})
+        AND mode = :akatsuki_mode
+    """
+    params["akatsuki_mode"] = akatsuki_mode.value
+
+    recs = await app.state.database.fetch_all(query, params)
+    return [
+        UserStatsSummary(
+            user_id=rec["user_id"],
+            pp=rec["pp"],
+            ranked_score=rec["ranked_score"],
+            avg_accuracy=rec["avg_accuracy"],
+            playcount=rec["playcount"],
+        )
+        for rec in recs
+    ]
+
+
 async def fetch_global_total_pp_earned() -> int:
     # NOTE: this query is not representative of the actual
     # "total pp earned over all time" because it only regards
@@ -82,3 +130,126 @@ async def fetch_global_total_pp_earned() -> int:
     if val is None:
         return 0
     return int(val)
+
+
+class LeaderboardRecord(BaseModel):
+    user_id: int
+    pp: int
+    ranked_score: int
+    avg_accuracy: float
+    country: str
+
+
+async def fetch_many_leaderboard_records(
+    akatsuki_mode: AkatsukiMode,
+    *,
+    after_user_id: int,
+    limit: int,
+) -> list[LeaderboardRecord]:
+    """Fetch the ranking-relevant stats of public users who have played the mode."""
+    query = """\
+        SELECT user_stats.user_id, user_stats.pp, user_stats.ranked_score,
+               user_stats.avg_accuracy, users.country
+        FROM user_stats
+        INNER JOIN users
+        ON user_stats.user_id = users.id
+        WHERE user_stats.mode = :akatsuki_mode
+        AND user_stats.user_id > :after_user_id
+        AND user_stats.playcount > 0
+        AND users.privileges & :user_public_privileges
+        ORDER BY user_stats.user_id
+        LIMIT :limit
+    """
+    params = {
+        "akatsuki_mode": akatsuki_mode.value,
+        "after_user_id": after_user_id,
+        "user_public_privileges": UserPrivileges.USER_PUBLIC.value,
+        "limit": limit,
+    }
+
+    recs = await app.state.database.fetch_all(query, params)
+    return [
+        LeaderboardRecord(
+            user_id=rec["user_id"],
+            pp=rec["pp"],
+            ranked_score=rec["ranked_score"],
+            avg_accuracy=rec["avg_accuracy"],
+            country=rec["country"],
+        )
+        for rec in recs
+    ]
+
+
+LEADERBOARD_RECORDS_BATCH_SIZE = 10_000
+
+
+async def iter_all_leaderboard_records(
+    akatsuki_mode: AkatsukiMode,
+) -> AsyncIterator[list[LeaderboardRecord]]:
+    """Iterate over all of a mode's leaderboard records, in batches."""
+    after_user_id = 0
+    while True:
+        records = await fetch_many_leaderboard_records(
+            akatsuki_mode,
+            after_user_id=after_user_id,
+            limit=LEADERBOARD_RECORDS_BATCH_SIZE,
+        )
+        if records:
+            yield records
+        if len(records) < LEADERBOARD_RECORDS_BATCH_SIZE:
+            return
+
+        after_user_id = records[-1].user_id
+
+
+# Periodically rebuilt, in-memory columnar snapshots of each mode's stats,
+# used to serve rank lookups and leaderboards without `ORDER BY` scans.
+_stats_snapshots: dict[AkatsukiMode, StatsSnapshot] = {}
+
+
+async def _load_stats_snapshot(
+    akatsuki_mode: AkatsukiMode,
+    *,
+    executor: Executor,
+) -> StatsSnapshot:
+    snapshot = StatsSnapshot()
+    async for records in iter_all_leaderboard_records(akatsuki_mode):
+        for record in records:
+            snapshot.append(
+                user_id=record.user_id,
+                pp=record.pp,
+                ranked_score=record.ranked_score,
+                accuracy=record.avg_accuracy,
+                country=record.country,
+            )
+
+    # sorting millions of rows holds the GIL for seconds, which would stall
+    # the event loop even from a thread, so it is done in another process
+    orders = await asyncio.get_running_loop().run_in_executor(
+        executor,
+        build_orders,
+        snapshot.columns(),
+        snapshot.country_ids,
+        len(snapshot.countries),
+    )
+    snapshot.set_orders(orders)
+    return snapshot
+
+
+async def load_stats_snapshots() -> None:
+    """(Re)build the stats snapshots for all modes."""
+    # spawned rather than forked, as this process has running threads
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        for akatsuki_mode in AkatsukiMode:
+            _stats_snapshots[akatsuki_mode] = await _load_stats_snapshot(
+                akatsuki_mode,
+                executor=executor,
+            )
+
+
+def fetch_stats_snapshot(akatsuki_mode: AkatsukiMode) -> StatsSnapshot | None:
+    """Fetch the latest stats snapshot for a mode, if it has been loaded."""
+    return _stats_snapshots.get(akatsuki_mode)
@@ -14,7 +14,61 @@ READ_PARAMS = """\
 """
 
 
+# The tournament badge catalog is small and rarely changes, so it is held in memory
+# and refreshed every minute, and per-user lookups only fetch tournament badge ids.
+_catalog: dict[int, TournamentBadge] | None = None
+
+
+async def fetch_catalog() -> list[TournamentBadge]:
+    query = """\
+        SELECT id, name, icon
+        FROM tourmnt_badges
+    """
+    recs = await app.state.database.fetch_all(query)
+    return [
+        TournamentBadge(
+            id=rec["id"],
+            name=rec["name"],
+            icon=rec["icon"],
+        )
+        for rec in recs
+    ]
+
+
+async def load_catalog() -> None:
+    global _catalog
+    _catalog = {
+        tournament_badge.id: tournament_badge
+        for tournament_badge in await fetch_catalog()
+    }
+
+
+async def fetch_ids_by_user_id(user_id: int) -> list[int]:
+    query = """\
+        SELECT badge
+        FROM user_tourmnt_badges
+        WHERE user = :user_id
+    """
+    params = {"user_id": user_id}
+
+    recs = await app.state.database.fetch_all(query, params)
+    return [rec["badge"] for rec in recs]
+
+
 async def fetch_all_by_user_id(user_id: int) -> list[TournamentBadge]:
+    if _catalog is None:
+        return await _fetch_all_by_user_id_uncached(user_id)
+
+    # as with an inner join, ids missing from the catalog are skipped;
+    # tournament badges created since the last refresh appear on the next one
+    return [
+        _catalog[tournament_badge_id]
+        for tournament_badge_id in await fetch_ids_by_user_id(user_id)
+        if tournament_badge_id in _catalog
+    ]
+
+
+async def _fetch_all_by_user_id_uncached(user_id: int) -> list[TournamentBadge]:
     query = f"""\
         SELECT {READ_PARAMS}
         FROM user_tourmnt_badges
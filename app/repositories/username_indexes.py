@@ -0,0 +1,364 @@
+import logging
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
+
+from redis.exceptions import RedisError
+
+import app.state
+from app import bloom_filter
+from app.bloom_filter import BloomFilter
+from app.common_types import UserPrivileges
+from app.repositories.users import UsernameRecord
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+# Indexes over users' `username_safe`, held in redis so that they are shared
+# by all workers.
+#
+# The filter is a bloom filter, held as a bitset. Many username lookups are
+# for names which do not exist (typos, bots, enumeration); names absent from
+# the filter are known not to exist, so can be answered without mysql.
+#
+# The prefix index is a sorted set of public users' `<username_safe>\0<id>`,
+# which serves username searches by lexicographic range, rather than with
+# `LIKE 'foo%'` scans. A hash of user ids to indexed names is kept with it,
+# so that users' entries can be found when they are renamed or deleted.
+#
+# The indexes are rebuilt from a full scan of the users table, and updated
+# in between as users register, are renamed or are deleted. Users are
+# registered (and may be renamed) by other services, so new users are found
+# by polling for new ids, and names changed elsewhere are only picked up by
+# the next rebuild. Until the first build completes (or if redis fails),
+# all names may exist, and the prefix index cannot be searched.
+USERNAME_FILTER_CAPACITY = 5_000_000
+USERNAME_FILTER_ERROR_RATE = 0.01
+
+USERNAME_FILTER_SIZE = bloom_filter.optimal_size(
+    capacity=USERNAME_FILTER_CAPACITY,
+    error_rate=USERNAME_FILTER_ERROR_RATE,
+)
+USERNAME_FILTER_HASH_COUNT = bloom_filter.optimal_hash_count(
+    capacity=USERNAME_FILTER_CAPACITY,
+    size=USERNAME_FILTER_SIZE,
+)
+
+# the key is versioned by the filter's parameters, as they determine
+# which bits each name maps to
+USERNAME_FILTER_KEY = (
+    f"users-service:username-filter:{USERNAME_FILTER_SIZE}:{USERNAME_FILTER_HASH_COUNT}"
+)
+USERNAME_FILTER_BUILD_KEY = f"{USERNAME_FILTER_KEY}:build"
+USERNAME_FILTER_UPLOAD_KEY = f"{USERNAME_FILTER_KEY}:upload"
+
+USERNAME_PREFIX_INDEX_KEY = "users-service:username-prefix-index"
+USERNAME_PREFIX_INDEX_NAMES_KEY = f"{USERNAME_PREFIX_INDEX_KEY}:names"
+USERNAME_PREFIX_INDEX_BUILD_KEY = f"{USERNAME_PREFIX_INDEX_KEY}:build"
+USERNAME_PREFIX_INDEX_NAMES_BUILD_KEY = f"{USERNAME_PREFIX_INDEX_NAMES_KEY}:build"
+
+# the highest user id held in the indexes, which new users are polled after.
+# it is set once the first build completes.
+MAX_USER_ID_KEY = "users-service:username-indexes:max-user-id"
+
+# Builds expire, in case they are abandoned before being swapped in.
+BUILD_TTL = 60 * 60 * 2
+
+# KEYS: [username filter]
+# ARGV: [bit positions...]
+MAY_EXIST_SCRIPT = """\
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 1
+end
+for i = 1, #ARGV do
+    if redis.call("GETBIT", KEYS[1], ARGV[i]) == 0 then
+        return 0
+    end
+end
+return 1
+"""
+
+# KEYS: [username filter, filter build, max user id,
+#        prefix index, prefix index names,
+#        prefix index build, prefix index names build]
+# ARGV: [max user id, hash count, (user id, username safe, is public, bit positions...)...]
+# Users are also updated in any build in progress, which may have already
+# scanned past them.
+SET_USERNAMES_SCRIPT = """\
+local function set_indexed_username(index_key, names_key, user_id, username, is_public)
+    local indexed_username = redis.call("HGET", names_key, user_id)
+    if indexed_username then
+        redis.call("ZREM", index_key, indexed_username .. "\\0" .. user_id)
+    end
+    if is_public then
+        redis.call("ZADD", index_key, 0, username .. "\\0" .. user_id)
+        redis.call("HSET", names_key, user_id, username)
+    else
+        redis.call("HDEL", names_key, user_id)
+    end
+end
+
+local filter_exists = redis.call("EXISTS", KEYS[1]) == 1
+local building = redis.call("EXISTS", KEYS[2]) == 1
+local hash_count = tonumber(ARGV[2])
+
+for i = 3, #ARGV, 3 + hash_count do
+    local user_id, username, is_public = ARGV[i], ARGV[i + 1], ARGV[i + 2] == "1"
+    for j = i + 3, i + 2 + hash_count do
+        if filter_exists then
+            redis.call("SETBIT", KEYS[1], ARGV[j], 1)
+        end
+        if building then
+            redis.call("SETBIT", KEYS[2], ARGV[j], 1)
+        end
+    end
+
+    set_indexed_username(KEYS[4], KEYS[5], user_id, username, is_public)
+    if building then
+        set_indexed_username(KEYS[6], KEYS[7], user_id, username, is_public)
+    end
+end
+
+if tonumber(redis.call("GET", KEYS[3]) or "0") < tonumber(ARGV[1]) then
+    redis.call("SET", KEYS[3], ARGV[1])
+end
+"""
+
+# KEYS: [max user id, prefix index]
+# ARGV: [min, max, offset, count]
+# Returns nil if the index has not been built yet.
+SEARCH_SCRIPT = """\
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return false
+end
+return redis.call("ZRANGEBYLEX", KEYS[2], ARGV[1], ARGV[2], "LIMIT", ARGV[3], ARGV[4])
+"""
+
+# KEYS: [filter build, prefix index build, prefix index names build]
+# ARGV: [ttl]
+START_BUILD_SCRIPT = """\
+redis.call("UNLINK", KEYS[1], KEYS[2], KEYS[3])
+redis.call("SETBIT", KEYS[1], 0, 0)
+redis.call("EXPIRE", KEYS[1], ARGV[1])
+"""
+
+# KEYS: [prefix index build, prefix index names build]
+# ARGV: [ttl, (user id, username safe)...]
+# Users renamed or deleted since being scanned are already in the build.
+ADD_TO_BUILD_SCRIPT = """\
+for i = 2, #ARGV, 2 do
+    if redis.call("HSETNX", KEYS[2], ARGV[i], ARGV[i + 1]) == 1 then
+        redis.call("ZADD", KEYS[1], 0, ARGV[i + 1] .. "\\0" .. ARGV[i])
+    end
+end
+redis.call("EXPIRE", KEYS[1], ARGV[1])
+redis.call("EXPIRE", KEYS[2], ARGV[1])
+"""
+
+# KEYS: [uploaded filter, filter build, username filter, max user id,
+#        prefix index build, prefix index, prefix index names build,
+#        prefix index names]
+# ARGV: [max user id]
+# Returns 0 if the build has expired, as names added during it were lost.
+SWAP_IN_BUILD_SCRIPT = """\
+if redis.call("EXISTS", KEYS[1]) == 0 or redis.call("EXISTS", KEYS[2]) == 0 then
+    return 0
+end
+redis.call("BITOP", "OR", KEYS[3], KEYS[1], KEYS[2])
+redis.call("UNLINK", KEYS[1], KEYS[2])
+
+if redis.call("EXISTS", KEYS[5]) == 1 then
+    redis.call("RENAME", KEYS[5], KEYS[6])
+    redis.call("PERSIST", KEYS[6])
+    redis.call("RENAME", KEYS[7], KEYS[8])
+    redis.call("PERSIST", KEYS[8])
+else
+    -- there are no public users
+    redis.call("UNLINK", KEYS[6], KEYS[8])
+end
+
+if tonumber(redis.call("GET", KEYS[4]) or "0") < tonumber(ARGV[1]) then
+    redis.call("SET", KEYS[4], ARGV[1])
+end
+return 1
+"""
+
+_scripts: dict[str, "AsyncScript"] = {}
+
+
+def _get_script(script: str) -> "AsyncScript":
+    registered_script = _scripts.get(script)
+    if registered_script is None:
+        registered_script = app.state.redis.register_script(script)
+        _scripts[script] = registered_script
+    return registered_script
+
+
+def _make_safe_username(username: str) -> str:
+    return username.lower().replace(" ", "_")
+
+
+def _bit_positions(username_safe: str) -> list[int]:
+    return bloom_filter.bit_positions(
+        username_safe,
+        size=USERNAME_FILTER_SIZE,
+        hash_count=USERNAME_FILTER_HASH_COUNT,
+    )
+
+
+async def username_may_exist(username: str) -> bool:
+    """Returns False only if no user has the username."""
+    try:
+        may_exist = await _get_script(MAY_EXIST_SCRIPT)(
+            keys=[USERNAME_FILTER_KEY],
+            args=_bit_positions(_make_safe_username(username)),
+        )
+    except RedisError:
+        # the filter is only an optimization; fall back to mysql
+        logging.warning("Failed to check the username filter", exc_info=True)
+        return True
+    return bool(may_exist)
+
+
+async def search_user_ids_by_username_prefix(
+    prefix: str,
+    *,
+    offset: int,
+    limit: int,
+) -> list[int] | None:
+    """\
+    Find the ids of public users whose `username_safe` starts with the
+    given prefix, in name order.
+
+    Returns None if the index has not been built yet.
+    """
+    prefix_safe = _make_safe_username(prefix).encode()
+    members = await _get_script(SEARCH_SCRIPT)(
+        keys=[MAX_USER_ID_KEY, USERNAME_PREFIX_INDEX_KEY],
+        # utf-8 never contains 0xff, so this sorts after every continuation
+        args=[b"[" + prefix_safe, b"[" + prefix_safe + b"\xff", offset, limit],
+    )
+    if members is None:
+        return None
+
+    return [int(member.rsplit(b"\0", 1)[1]) for member in members]
+
+
+async def _set_usernames(
+    usernames: list[tuple[int, str, bool]],
+    *,
+    max_user_id: int,
+) -> None:
+    args: list[int | str] = [max_user_id, USERNAME_FILTER_HASH_COUNT]
+    for user_id, username_safe, is_public in usernames:
+        args.extend((user_id, username_safe, int(is_public)))
+        args.extend(_bit_positions(username_safe))
+
+    await _get_script(SET_USERNAMES_SCRIPT)(
+        keys=[
+            USERNAME_FILTER_KEY,
+            USERNAME_FILTER_BUILD_KEY,
+            MAX_USER_ID_KEY,
+            USERNAME_PREFIX_INDEX_KEY,
+            USERNAME_PREFIX_INDEX_NAMES_KEY,
+            USERNAME_PREFIX_INDEX_BUILD_KEY,
+            USERNAME_PREFIX_INDEX_NAMES_BUILD_KEY,
+        ],
+        args=args,
+    )
+
+
+async def set_username(user_id: int, username: str, *, is_public: bool) -> None:
+    """Index a user's new username, such as after a rename or deletion."""
+    await _set_usernames(
+        [(user_id, _make_safe_username(username), is_public)],
+        max_user_id=0,
+    )
+
+
+async def add_many(username_records: list[UsernameRecord]) -> None:
+    """Index newly registered users."""
+    if not username_records:
+        return None
+
+    await _set_usernames(
+        [
+            (
+                record.id,
+                record.username_safe,
+                bool(record.privileges & UserPrivileges.USER_PUBLIC),
+            )
+            for record in username_records
+        ],
+        max_user_id=max(record.id for record in username_records),
+    )
+    return None
+
+
+async def fetch_max_user_id() -> int | None:
+    """Fetch the highest user id indexed, or None if not yet built."""
+    max_user_id = await app.state.redis.get(MAX_USER_ID_KEY)
+    return int(max_user_id) if max_user_id is not None else None
+
+
+async def replace_all(
+    username_record_batches: AsyncIterator[list[UsernameRecord]],
+) -> None:
+    """\
+    Replace the indexes with the given users' usernames.
+
+    The indexes are built in temporary keys (the filter in memory, then
+    uploaded), and swapped in atomically once complete, so readers never
+    observe partially built indexes. Users updated while building are also
+    updated in the build, so no changes are lost.
+    """
+    await _get_script(START_BUILD_SCRIPT)(
+        keys=[
+            USERNAME_FILTER_BUILD_KEY,
+            USERNAME_PREFIX_INDEX_BUILD_KEY,
+            USERNAME_PREFIX_INDEX_NAMES_BUILD_KEY,
+        ],
+        args=[BUILD_TTL],
+    )
+
+    username_filter = BloomFilter(
+        capacity=USERNAME_FILTER_CAPACITY,
+        error_rate=USERNAME_FILTER_ERROR_RATE,
+    )
+    max_user_id = 0
+    async for username_records in username_record_batches:
+        args: list[int | str] = [BUILD_TTL]
+        for record in username_records:
+            username_filter.add(record.username_safe)
+            if record.privileges & UserPrivileges.USER_PUBLIC:
+                args.extend((record.id, record.username_safe))
+        max_user_id = username_records[-1].id
+
+        if len(args) > 1:
+            await _get_script(ADD_TO_BUILD_SCRIPT)(
+                keys=[
+                    USERNAME_PREFIX_INDEX_BUILD_KEY,
+                    USERNAME_PREFIX_INDEX_NAMES_BUILD_KEY,
+                ],
+                args=args,
+            )
+
+    await app.state.redis.set(
+        USERNAME_FILTER_UPLOAD_KEY,
+        username_filter.to_bytes(),
+        ex=BUILD_TTL,
+    )
+    swapped_in = await _get_script(SWAP_IN_BUILD_SCRIPT)(
+        keys=[
+            USERNAME_FILTER_UPLOAD_KEY,
+            USERNAME_FILTER_BUILD_KEY,
+            USERNAME_FILTER_KEY,
+            MAX_USER_ID_KEY,
+            USERNAME_PREFIX_INDEX_BUILD_KEY,
+            USERNAME_PREFIX_INDEX_KEY,
+            USERNAME_PREFIX_INDEX_NAMES_BUILD_KEY,
+            USERNAME_PREFIX_INDEX_NAMES_KEY,
+        ],
+        args=[max_user_id],
+    )
+    if not swapped_in:
+        raise RuntimeError("Username indexes build expired before completion")
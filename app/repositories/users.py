@@ -1,5 +1,7 @@
 import secrets
+from collections.abc import AsyncIterator
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel
 
@@ -39,6 +41,128 @@ READ_PARAMS = """\
 """
 
 
+class UserSummary(BaseModel):
+    id: int
+    username: str
+    country: str
+    privileges: UserPrivileges
+
+
+SUMMARY_READ_PARAMS = """\
+    id, username, country, privileges
+"""
+
+
+USERNAME_INDEXES_LOAD_BATCH_SIZE = 10_000
+
+
+class UsernameRecord(BaseModel):
+    id: int
+    username_safe: str
+    privileges: UserPrivileges
+
+
+async def fetch_many_username_records(
+    *,
+    after_user_id: int,
+    limit: int,
+) -> list[UsernameRecord]:
+    query = """\
+        SELECT id, username_safe, privileges
+        FROM users
+        WHERE id > :after_user_id
+        ORDER BY id
+        LIMIT :limit
+    """
+    params = {"after_user_id": after_user_id, "limit": limit}
+
+    recs = await app.state.database.fetch_all(query, params)
+    return [
+        UsernameRecord(
+            id=rec["id"],
+            username_safe=rec["username_safe"],
+            privileges=UserPrivileges(rec["privileges"]),
+        )
+        for rec in recs
+    ]
+
+
+async def iter_username_records_after_user_id(
+    after_user_id: int,
+) -> AsyncIterator[list[UsernameRecord]]:
+    """Iterate over the username records of users after the given id, in batches."""
+    while True:
+        batch = await fetch_many_username_records(
+            after_user_id=after_user_id,
+            limit=USERNAME_INDEXES_LOAD_BATCH_SIZE,
+        )
+        if batch:
+            yield batch
+        if len(batch) < USERNAME_INDEXES_LOAD_BATCH_SIZE:
+            return
+
+        after_user_id = batch[-1].id
+
+
+async def fetch_many_summaries_by_user_ids(user_ids: list[int]) -> list[UserSummary]:
+    if not user_ids:
+        return []
+
+    params = {f"user_id_{i}": user_id for i, user_id in enumerate(user_ids)}
+    query = f"""\
+        SELECT {SUMMARY_READ_PARAMS}
+        FROM users
+        WHERE id IN ({", ".join(f":{key}" for key in params)})
+    """
+
+    users = await app.state.database.fetch_all(query, params)
+    return [
+        UserSummary(
+            id=user["id"],
+            username=user["username"],
+            country=user["country"],
+            privileges=UserPrivileges(user["privileges"]),
+        )
+        for user in users
+    ]
+
+
+async def fetch_many_public_summaries_by_clan_id(
+    clan_id: int,
+    /,
+    *,
+    after_user_id: int,
+    limit: int,
+) -> list[UserSummary]:
+    """Fetch a page of a clan's public members, in ascending user id order."""
+    query = f"""\
+        SELECT {SUMMARY_READ_PARAMS}
+        FROM users
+        WHERE clan_id = :clan_id
+        AND id > :after_user_id
+        AND privileges & :user_public_privileges
+        ORDER BY id
+        LIMIT :limit
+    """
+    params = {
+        "clan_id": clan_id,
+        "after_user_id": after_user_id,
+        "user_public_privileges": UserPrivileges.USER_PUBLIC.value,
+        "limit": limit,
+    }
+
+    users = await app.state.database.fetch_all(query, params)
+    return [
+        UserSummary(
+            id=user["id"],
+            username=user["username"],
+            country=user["country"],
+            privileges=UserPrivileges(user["privileges"]),
+        )
+        for user in users
+    ]
+
+
 async def fetch_one_by_username(username: str) -> User | None:
     query = f"""\
         SELECT {READ_PARAMS}
@@ -233,13 +357,80 @@ async def anonymize_one_by_user_id(user_id: int, /) -> None:
     )
 
 
-async def fetch_many_by_clan_id(clan_id: int, /) -> list[User]:
+async def anonymize_many_by_user_ids(user_ids: list[int], /) -> None:
+    """\
+    Anonymize many users in a single statement; see `anonymize_one_by_user_id`.
+    """
+    if not user_ids:
+        return None
+
+    dt = datetime.now().isoformat()
+    # the password is random & unknown either way, so a single hash is
+    # shared across the batch rather than paying for one per user
+    new_hashed_password = security.hash_osu_password(secrets.token_hex(16))
+
+    params: dict[str, Any] = {
+        f"user_id_{i}": user_id for i, user_id in enumerate(user_ids)
+    }
+    query = f"""\
+        UPDATE users
+           SET username = CONCAT('deleted_user_', id),
+               username_safe = CONCAT('deleted_user_', id),
+               username_aka = CONCAT('deleted_user_', id),
+               password_md5 = :password_md5,
+               email = CONCAT('delete_user_', id, '@example.com'),
+               userpage_content = :userpage_content,
+               silence_end = :silence_end,
+               donor_expire = :donor_expire,
+               latest_activity = :latest_activity,
+               register_datetime = :register_datetime,
+               ban_datetime = :ban_datetime,
+               silence_reason = :silence_reason,
+               freeze_reason = :freeze_reason,
+               can_custom_badge = :can_custom_badge,
+               show_custom_badge = :show_custom_badge,
+               custom_badge_icon = :custom_badge_icon,
+               custom_badge_name = :custom_badge_name,
+               notes = :notes,
+               country = :country,
+               privileges = :privileges,
+               clan_id = :clan_id
+           WHERE id IN ({", ".join(f":{key}" for key in params)})
+    """
+    params |= {
+        "password_md5": new_hashed_password,
+        "userpage_content": f"[{dt}] This user has been deleted.",
+        "silence_end": 0,
+        "donor_expire": 0,
+        "latest_activity": 0,
+        "register_datetime": 0,
+        "ban_datetime": 0,
+        "silence_reason": "",
+        "freeze_reason": "",
+        "can_custom_badge": False,
+        "show_custom_badge": False,
+        "custom_badge_icon": "",
+        "custom_badge_name": "",
+        "notes": f"[{dt}] This user has been deleted.",
+        "country": "XX",
+        "privileges": UserPrivileges(0),
+        "clan_id": 0,
+    }
+
+    await app.state.database.execute(query, params)
+    return None
+
+
+async def fetch_many_by_user_ids(user_ids: list[int], /) -> list[User]:
+    if not user_ids:
+        return []
+
+    params = {f"user_id_{i}": user_id for i, user_id in enumerate(user_ids)}
     query = f"""\
         SELECT {READ_PARAMS}
         FROM users
-        WHERE clan_id = :clan_id
+        WHERE id IN ({", ".join(f":{key}" for key in params)})
     """
-    params = {"clan_id": clan_id}
 
     users = await app.state.database.fetch_all(query, params)
     return [
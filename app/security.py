@@ -3,17 +3,20 @@ import secrets
 
 import bcrypt
 
+from app import tracing
+
 
 def hash_osu_password(password: str) -> str:
-    return bcrypt.hashpw(
-        password=hashlib.md5(
-            password.encode(),
-            usedforsecurity=False,
-        )
-        .hexdigest()
-        .encode(),
-        salt=bcrypt.gensalt(),
-    ).decode()
+    with tracing.tracer.start_as_current_span("bcrypt.hashpw"):
+        return bcrypt.hashpw(
+            password=hashlib.md5(
+                password.encode(),
+                usedforsecurity=False,
+            )
+            .hexdigest()
+            .encode(),
+            salt=bcrypt.gensalt(),
+        ).decode()
 
 
 def check_osu_password(
@@ -21,15 +24,16 @@ def check_osu_password(
     untrusted_password: str,
     hashed_password: str,
 ) -> bool:
-    return bcrypt.checkpw(
-        password=hashlib.md5(
-            untrusted_password.encode(),
-            usedforsecurity=False,
+    with tracing.tracer.start_as_current_span("bcrypt.checkpw"):
+        return bcrypt.checkpw(
+            password=hashlib.md5(
+                untrusted_password.encode(),
+                usedforsecurity=False,
+            )
+            .hexdigest()
+            .encode(),
+            hashed_password=hashed_password.encode(),
         )
-        .hexdigest()
-        .encode(),
-        hashed_password=hashed_password.encode(),
-    )
 
 
 def generate_unhashed_secure_token() -> str:
@@ -15,11 +15,23 @@ APP_PORT = int(os.environ["APP_PORT"])
 
 CODE_HOTRELOAD = read_bool(os.environ["CODE_HOTRELOAD"])
 
+# Each worker holds its own stats snapshots for all modes (roughly 100 bytes
+# per ranked user per mode), and reloads them from the user_stats table every
+# 10 minutes, so memory and DB load grow with the worker count. Defaults to
+# one worker per CPU, up to 4; hot-reloading always runs a single worker.
+DEFAULT_APP_WORKERS = min(os.cpu_count() or 1, 4)
+APP_WORKERS = (
+    1 if CODE_HOTRELOAD else int(os.environ["APP_WORKERS"] or DEFAULT_APP_WORKERS)
+)
+
 DB_USER = os.environ["DB_USER"]
 DB_PASS = os.environ["DB_PASS"]
 DB_HOST = os.environ["DB_HOST"]
 DB_PORT = int(os.environ["DB_PORT"])
 DB_NAME = os.environ["DB_NAME"]
+# Shared between all workers; each worker's pool gets an equal share
+DB_MAX_CONNECTIONS = int(os.environ["DB_MAX_CONNECTIONS"])
+DB_SLOW_QUERY_THRESHOLD_MS = int(os.environ["DB_SLOW_QUERY_THRESHOLD_MS"])
 
 REDIS_HOST = os.environ["REDIS_HOST"]
 REDIS_PORT = int(os.environ["REDIS_PORT"])
@@ -41,3 +53,19 @@ MAILGUN_DOMAIN_NAME = os.environ["MAILGUN_DOMAIN_NAME"]
 MAILGUN_API_KEY = os.environ["MAILGUN_API_KEY"]
 
 RECAPTCHA_SECRET_KEY = os.environ["RECAPTCHA_SECRET_KEY"]
+
+USER_DELETION_ARCHIVE_ENABLED = read_bool(os.environ["USER_DELETION_ARCHIVE_ENABLED"])
+# Archives are purged once their retention period has elapsed
+USER_DELETION_ARCHIVE_RETENTION_DAYS = int(
+    os.environ["USER_DELETION_ARCHIVE_RETENTION_DAYS"],
+)
+
+TRACING_ENABLED = read_bool(os.environ["TRACING_ENABLED"])
+TRACING_SAMPLE_RATIO = float(os.environ["TRACING_SAMPLE_RATIO"])
+TRACING_OTLP_ENDPOINT = os.environ["TRACING_OTLP_ENDPOINT"]
+
+# Profiling is disabled when no key is set
+PROFILING_API_KEY = os.environ["PROFILING_API_KEY"]
+
+EVENT_LOOP_WATCHDOG_ENABLED = read_bool(os.environ["EVENT_LOOP_WATCHDOG_ENABLED"])
+EVENT_LOOP_WATCHDOG_THRESHOLD_MS = int(os.environ["EVENT_LOOP_WATCHDOG_THRESHOLD_MS"])
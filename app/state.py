@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import httpx
     from databases import Database
     from redis.asyncio import Redis
     from types_aiobotocore_s3.client import S3Client
@@ -8,3 +9,7 @@ if TYPE_CHECKING:
 database: "Database"
 redis: "Redis"
 s3_client: "S3Client"
+assets_service_http_client: "httpx.AsyncClient"
+mailgun_http_client: "httpx.AsyncClient"
+recaptcha_http_client: "httpx.AsyncClient"
+discord_webhooks_http_client: "httpx.AsyncClient"
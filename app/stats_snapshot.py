@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import bisect
+from array import array
+from typing import NamedTuple
+from typing import assert_never
+
+from pydantic import BaseModel
+
+from app.common_types import RankingMetric
+
+
+class StatsSnapshotEntry(BaseModel):
+    rank: int
+    user_id: int
+    country: str
+    pp: int
+    ranked_score: int
+    accuracy: float
+
+
+class StatsSnapshotOrders(NamedTuple):
+    orders: dict[RankingMetric, array[int]]
+    country_orders: dict[RankingMetric, dict[int, array[int]]]
+
+
+def build_orders(
+    columns: dict[RankingMetric, array[int] | array[float]],
+    country_ids: array[int],
+    country_count: int,
+) -> StatsSnapshotOrders:
+    """\
+    Build the per-metric orderings of a snapshot's rows, globally and per
+    country. This is cpu-bound, and holds the GIL throughout (a sort per
+    metric), so should be run in another process for large snapshots.
+    """
+    orders: dict[RankingMetric, array[int]] = {}
+    country_orders: dict[RankingMetric, dict[int, array[int]]] = {}
+    for metric, column in columns.items():
+        # rows are in user id order and sorting is stable,
+        # so ties are left in ascending user id order
+        order = array(
+            "I",
+            sorted(range(len(column)), key=column.__getitem__, reverse=True),
+        )
+
+        metric_country_orders: dict[int, array[int]] = {
+            country_id: array("I") for country_id in range(country_count)
+        }
+        for row in order:
+            metric_country_orders[country_ids[row]].append(row)
+
+        orders[metric] = order
+        country_orders[metric] = metric_country_orders
+
+    return StatsSnapshotOrders(orders=orders, country_orders=country_orders)
+
+
+class StatsSnapshot:
+    """\
+    A read-only, columnar snapshot of a single mode's user stats.
+
+    Each column is a compact `array` buffer indexed by row; rows are held
+    in ascending user id order so a user's row can be found by bisection.
+    For each ranking metric, the rows are additionally ordered globally
+    and per country, which answers rank lookups in O(log n) and leaderboard
+    pages in O(page size), without any `ORDER BY` scans.
+
+    Rows are appended in ascending user id order, after which the orders
+    must be built once with `build_orders` (from `columns()`), and set with
+    `set_orders`. Ties are ranked by user id.
+    """
+
+    def __init__(self) -> None:
+        self.user_ids = array("q")
+        self.pp = array("q")
+        self.ranked_score = array("q")
+        self.accuracy = array("d")
+        self.country_ids = array("H")
+        self.countries: list[str] = []
+
+        self._country_ids_by_code: dict[str, int] = {}
+        self._orders: dict[RankingMetric, array[int]] = {}
+        self._country_orders: dict[RankingMetric, dict[int, array[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def append(
+        self,
+        *,
+        user_id: int,
+        pp: int,
+        ranked_score: int,
+        accuracy: float,
+        country: str,
+    ) -> None:
+        country_id = self._country_ids_by_code.get(country)
+        if country_id is None:
+            country_id = len(self.countries)
+            self.countries.append(country)
+            self._country_ids_by_code[country] = country_id
+
+        self.user_ids.append(user_id)
+        self.pp.append(pp)
+        self.ranked_score.append(ranked_score)
+        self.accuracy.append(accuracy)
+        self.country_ids.append(country_id)
+
+    def columns(self) -> dict[RankingMetric, array[int] | array[float]]:
+        """The columns which rows are ordered by, for each ranking metric."""
+        return {metric: self._column(metric) for metric in RankingMetric}
+
+    def set_orders(self, orders: StatsSnapshotOrders) -> None:
+        self._orders = orders.orders
+        self._country_orders = orders.country_orders
+
+    def _column(self, metric: RankingMetric) -> array[int] | array[float]:
+        if metric is RankingMetric.PP:
+            return self.pp
+        elif metric is RankingMetric.RANKED_SCORE:
+            return self.ranked_score
+        elif metric is RankingMetric.ACCURACY:
+            return self.accuracy
+        else:
+            assert_never(metric)
+
+    def _order(self, metric: RankingMetric, country: str | None) -> array[int]:
+        if country is None:
+            return self._orders[metric]
+
+        country_id = self._country_ids_by_code.get(country)
+        if country_id is None:
+            return array("I")
+
+        return self._country_orders[metric][country_id]
+
+    def _find_row(self, user_id: int) -> int | None:
+        row = bisect.bisect_left(self.user_ids, user_id)
+        if row == len(self.user_ids) or self.user_ids[row] != user_id:
+            return None
+        return row
+
+    def count(self, *, country: str | None = None) -> int:
+        if country is None:
+            return len(self)
+
+        country_id = self._country_ids_by_code.get(country)
+        if country_id is None:
+            return 0
+
+        return len(self._country_orders[RankingMetric.PP][country_id])
+
+    def rank(
+        self,
+        user_id: int,
+        metric: RankingMetric,
+        *,
+        by_country: bool = False,
+    ) -> int | None:
+        """Find a user's 1-indexed rank, globally or within their country."""
+        row = self._find_row(user_id)
+        if row is None:
+            return None
+
+        column = self._column(metric)
+        order = self._order(
+            metric,
+            self.countries[self.country_ids[row]] if by_country else None,
+        )
+        position = bisect.bisect_left(
+            order,
+            (-column[row], user_id),
+            key=lambda r: (-column[r], self.user_ids[r]),
+        )
+        return position + 1
+
+    def top(
+        self,
+        metric: RankingMetric,
+        *,
+        offset: int,
+        limit: int,
+        country: str | None = None,
+    ) -> list[StatsSnapshotEntry]:
+        order = self._order(metric, country)
+        return [
+            StatsSnapshotEntry(
+                rank=offset + i + 1,
+                user_id=self.user_ids[row],
+                country=self.countries[self.country_ids[row]],
+                pp=self.pp[row],
+                ranked_score=self.ranked_score[row],
+                accuracy=self.accuracy[row],
+            )
+            for i, row in enumerate(order[offset : offset + limit])
+        ]
@@ -0,0 +1,56 @@
+"""\
+Distributed tracing, using OpenTelemetry.
+
+Spans are created for each request, and for the service's calls to MySQL,
+redis, S3 and other HTTP services. W3C trace context is extracted from
+incoming requests to internal routes, and propagated to the assets service.
+
+Until `configure_tracing` is called, spans are not recorded.
+"""
+
+from opentelemetry import propagate
+from opentelemetry import trace
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased
+from opentelemetry.sdk.trace.sampling import TraceIdRatioBased
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+from app import settings
+
+SERVICE_NAME = "users-service"
+
+tracer = trace.get_tracer(SERVICE_NAME)
+
+_tracer_provider: TracerProvider | None = None
+
+
+def create_span_exporter() -> SpanExporter:
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+
+def configure_tracing(exporter: SpanExporter, *, sample_ratio: float) -> None:
+    """\
+    Record spans, exporting them in batches to `exporter`.
+
+    Traces started by this service are sampled at `sample_ratio`; traces
+    continued from an internal caller's request follow the caller's decision.
+    """
+    global _tracer_provider
+
+    _tracer_provider = TracerProvider(
+        resource=Resource.create({"service.name": SERVICE_NAME}),
+        sampler=ParentBased(root=TraceIdRatioBased(sample_ratio)),
+    )
+    _tracer_provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_tracer_provider)
+    propagate.set_global_textmap(TraceContextTextMapPropagator())
+
+
+def shutdown_tracing() -> None:
+    """Export any remaining spans."""
+    if _tracer_provider is not None:
+        _tracer_provider.shutdown()
@@ -0,0 +1,78 @@
+from app.common_types import AkatsukiMode
+from app.errors import Error
+from app.errors import ErrorCode
+from app.models.clans import Clan
+from app.models.clans import ClanMember
+from app.models.clans import ClanMembers
+from app.models.clans import ClanMemberStats
+from app.repositories import clans
+from app.repositories import user_stats
+from app.repositories import users
+
+
+async def fetch_one_by_clan_id(clan_id: int) -> Clan | Error:
+    clan = await clans.fetch_one_by_clan_id(clan_id)
+    if clan is None:
+        return Error(error_code=ErrorCode.NOT_FOUND, user_feedback="Clan not found.")
+
+    # NOTE: intentionally excluding the clan's invite code
+    return Clan(
+        id=clan.id,
+        name=clan.name,
+        tag=clan.tag,
+        description=clan.description,
+        icon=clan.icon,
+        background=clan.background,
+        owner=clan.owner,
+        status=clan.status,
+    )
+
+
+async def fetch_members(
+    clan_id: int,
+    *,
+    after_user_id: int,
+    limit: int,
+    stats_akatsuki_mode: AkatsukiMode | None,
+) -> ClanMembers | Error:
+    clan = await clans.fetch_one_by_clan_id(clan_id)
+    if clan is None:
+        return Error(error_code=ErrorCode.NOT_FOUND, user_feedback="Clan not found.")
+
+    members = await users.fetch_many_public_summaries_by_clan_id(
+        clan_id,
+        after_user_id=after_user_id,
+        limit=limit,
+    )
+
+    stats_by_user_id: dict[int, ClanMemberStats] = {}
+    if stats_akatsuki_mode is not None:
+        # fetched in bulk for the whole page
+        member_stats = (
+            await user_stats.fetch_many_summaries_by_user_ids_and_akatsuki_mode(
+                [member.id for member in members],
+                stats_akatsuki_mode,
+            )
+        )
+        stats_by_user_id = {
+            stats.user_id: ClanMemberStats(
+                pp=stats.pp,
+                ranked_score=stats.ranked_score,
+                accuracy=stats.avg_accuracy,
+                playcount=stats.playcount,
+            )
+            for stats in member_stats
+        }
+
+    return ClanMembers(
+        members=[
+            ClanMember(
+                id=member.id,
+                username=member.username,
+                country=member.country,
+                stats=stats_by_user_id.get(member.id),
+            )
+            for member in members
+        ],
+        next_after_user_id=members[-1].id if len(members) == limit else None,
+    )
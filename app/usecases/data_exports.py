@@ -0,0 +1,126 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app import ndjson
+from app.adapters import aws_s3
+from app.common_types import AkatsukiMode
+from app.errors import Error
+from app.errors import ErrorCode
+from app.models.data_exports import DataExport
+from app.models.data_exports import DataExportRecord
+from app.repositories import access_tokens
+from app.repositories import lastfm_flags
+from app.repositories import password_recovery
+from app.repositories import user_badges
+from app.repositories import user_hwid_associations
+from app.repositories import user_ip_associations
+from app.repositories import user_stats
+from app.repositories import user_tournament_badges
+from app.repositories import users
+
+
+def _make_record(
+    type: str,
+    model: BaseModel,
+    *,
+    exclude: set[str] | None = None,
+    **extra: object,
+) -> DataExportRecord:
+    return DataExportRecord(
+        type=type,
+        data=model.model_dump(mode="json", exclude=exclude) | extra,
+    )
+
+
+async def _iter_records(user: users.User) -> AsyncIterator[list[DataExportRecord]]:
+    # secrets (password & token hashes) are never exported
+    yield [_make_record("user", user, exclude={"hashed_password"})]
+
+    for akatsuki_mode in AkatsukiMode:
+        stats = await user_stats.fetch_one_by_user_id_and_akatsuki_mode(
+            user.id,
+            akatsuki_mode,
+        )
+        if stats is not None:
+            yield [_make_record("user_stats", stats, mode=akatsuki_mode.value)]
+
+    yield [
+        _make_record("badge", badge)
+        for badge in await user_badges.fetch_all_by_user_id(user.id)
+    ]
+    yield [
+        _make_record("tournament_badge", badge)
+        for badge in await user_tournament_badges.fetch_all_by_user_id(user.id)
+    ]
+    yield [
+        _make_record("access_token", token, exclude={"hashed_access_token"})
+        for token in await access_tokens.fetch_all_by_user_id(user.id)
+    ]
+
+    # these may be large, so are read in batches
+    async for password_recoveries in password_recovery.iter_all_by_username(
+        user.username,
+    ):
+        yield [
+            _make_record("password_recovery", recovery, exclude={"k"})
+            for recovery in password_recoveries
+        ]
+    async for ip_associations in user_ip_associations.iter_all_by_user_id(user.id):
+        yield [
+            _make_record("ip_association", association)
+            for association in ip_associations
+        ]
+    async for hwid_associations in user_hwid_associations.iter_all_by_user_id(
+        user.id,
+    ):
+        yield [
+            _make_record("hwid_association", association)
+            for association in hwid_associations
+        ]
+    async for flags in lastfm_flags.iter_all_by_user_id(user.id):
+        yield [_make_record("lastfm_flag", flag) for flag in flags]
+
+
+async def stream_one_by_user_id(user_id: int, /) -> AsyncIterator[bytes] | Error:
+    """\
+    Stream all of the data we hold on a user, as newline-delimited json,
+    to fulfil a data subject access request under GDPR, CCPA and similar.
+    """
+    user = await users.fetch_one_by_user_id(user_id)
+    if user is None:
+        return Error(
+            error_code=ErrorCode.NOT_FOUND,
+            user_feedback="User not found.",
+        )
+
+    return ndjson.encode_batches(_iter_records(user))
+
+
+async def save_one_by_user_id(user_id: int, /) -> DataExport | Error:
+    """\
+    Save all of the data we hold on a user to S3, as gzipped
+    newline-delimited json; see `stream_one_by_user_id`.
+    """
+    user = await users.fetch_one_by_user_id(user_id)
+    if user is None:
+        return Error(
+            error_code=ErrorCode.NOT_FOUND,
+            user_feedback="User not found.",
+        )
+
+    # exports are deleted along with the user; see `USER_CONTENT_KEY_PREFIXES`
+    object_key = f"user-data-exports/{user_id}/{datetime.now():%Y%m%d%H%M%S}.ndjson.gz"
+    saved = await aws_s3.save_object_data_from_stream(
+        object_key,
+        ndjson.gzip_chunks(ndjson.encode_batches(_iter_records(user))),
+        content_type="application/gzip",
+    )
+    if not saved:
+        return Error(
+            error_code=ErrorCode.INTERNAL_SERVER_ERROR,
+            user_feedback="Failed to save user data export.",
+        )
+
+    return DataExport(object_key=object_key)
@@ -0,0 +1,174 @@
+import asyncio
+import random
+from collections.abc import AsyncIterator
+
+import app.state
+from app.common_types import AkatsukiMode
+from app.common_types import RankingMetric
+from app.errors import Error
+from app.errors import ErrorCode
+from app.models.leaderboards import Leaderboard
+from app.models.leaderboards import LeaderboardEntry
+from app.models.leaderboards import LeaderboardPosition
+from app.repositories import locks
+from app.repositories import user_rankings
+from app.repositories import user_stats
+from app.repositories import users
+
+
+async def fetch_leaderboard(
+    akatsuki_mode: AkatsukiMode,
+    metric: RankingMetric,
+    *,
+    country: str | None,
+    page: int,
+    page_size: int,
+) -> Leaderboard | Error:
+    snapshot = user_stats.fetch_stats_snapshot(akatsuki_mode)
+    if snapshot is None:
+        return Error(
+            error_code=ErrorCode.SERVICE_UNAVAILABLE,
+            user_feedback="Leaderboards are temporarily unavailable.",
+        )
+
+    snapshot_entries = snapshot.top(
+        metric,
+        offset=(page - 1) * page_size,
+        limit=page_size,
+        country=country,
+    )
+    usernames = {
+        user_summary.id: user_summary.username
+        for user_summary in await users.fetch_many_summaries_by_user_ids(
+            [snapshot_entry.user_id for snapshot_entry in snapshot_entries],
+        )
+    }
+
+    return Leaderboard(
+        total=snapshot.count(country=country),
+        entries=[
+            LeaderboardEntry(
+                rank=snapshot_entry.rank,
+                user_id=snapshot_entry.user_id,
+                username=usernames[snapshot_entry.user_id],
+                country=snapshot_entry.country,
+                pp=snapshot_entry.pp,
+                ranked_score=snapshot_entry.ranked_score,
+                accuracy=snapshot_entry.accuracy,
+            )
+            for snapshot_entry in snapshot_entries
+            # the user may have been deleted since the snapshot was taken
+            if snapshot_entry.user_id in usernames
+        ],
+    )
+
+
+async def fetch_leaderboard_position(
+    user_id: int,
+    akatsuki_mode: AkatsukiMode,
+    metric: RankingMetric,
+) -> LeaderboardPosition | Error:
+    snapshot = user_stats.fetch_stats_snapshot(akatsuki_mode)
+    if snapshot is None:
+        return Error(
+            error_code=ErrorCode.SERVICE_UNAVAILABLE,
+            user_feedback="Leaderboards are temporarily unavailable.",
+        )
+
+    rank = snapshot.rank(user_id, metric)
+    country_rank = snapshot.rank(user_id, metric, by_country=True)
+    if rank is None or country_rank is None:
+        return Error(
+            error_code=ErrorCode.NOT_FOUND,
+            user_feedback="User is not ranked.",
+        )
+
+    total = len(snapshot)
+    return LeaderboardPosition(
+        rank=rank,
+        country_rank=country_rank,
+        total=total,
+        percentile=(total - rank) / total * 100,
+    )
+
+
+USER_RANKINGS_SYNC_INTERVAL = 60 * 10
+
+
+async def _iter_all_user_rankings(
+    akatsuki_mode: AkatsukiMode,
+) -> AsyncIterator[list[user_rankings.UserRanking]]:
+    # the same users as the stats snapshots, so both agree on users' ranks
+    async for records in user_stats.iter_all_leaderboard_records(akatsuki_mode):
+        yield [
+            user_rankings.UserRanking(
+                user_id=record.user_id,
+                country=record.country,
+                pp=record.pp,
+            )
+            for record in records
+        ]
+
+
+async def sync_user_rankings() -> None:
+    """\
+    Rebuild all modes' user rankings from the user_stats table.
+
+    Runs on at most one worker per sync interval.
+    """
+    if not await app.state.redis.set(
+        "users-service:locks:sync-user-rankings",
+        "1",
+        nx=True,
+        ex=USER_RANKINGS_SYNC_INTERVAL,
+    ):
+        return None
+
+    for akatsuki_mode in AkatsukiMode:
+        await user_rankings.replace_all(
+            akatsuki_mode,
+            _iter_all_user_rankings(akatsuki_mode),
+        )
+    return None
+
+
+STATS_SNAPSHOTS_LOAD_INTERVAL = 60 * 10
+STATS_SNAPSHOTS_LOAD_LOCK_TIMEOUT = 60
+
+# the number of workers (across all nodes) which may scan the user_stats
+# table at once; each scan holds a single database connection
+STATS_SNAPSHOTS_MAX_CONCURRENT_LOADS = 4
+
+
+async def _acquire_stats_snapshots_load_slot() -> tuple[str, str]:
+    """Wait for, and take, one of the load slots. Returns its key & token."""
+    while True:
+        for slot in range(STATS_SNAPSHOTS_MAX_CONCURRENT_LOADS):
+            key = f"users-service:locks:load-stats-snapshots:{slot}"
+            lock_token = await locks.try_acquire(
+                key,
+                timeout=STATS_SNAPSHOTS_LOAD_LOCK_TIMEOUT,
+            )
+            if lock_token is not None:
+                return key, lock_token
+
+        await asyncio.sleep(1 + random.random())
+
+
+async def load_stats_snapshots() -> None:
+    """\
+    (Re)load this worker's stats snapshots from the user_stats table.
+
+    Each worker holds its own snapshots, so loads are bounded by a counting
+    semaphore, such that at most `STATS_SNAPSHOTS_MAX_CONCURRENT_LOADS`
+    workers scan the user_stats table at a time.
+    """
+    key, lock_token = await _acquire_stats_snapshots_load_slot()
+    try:
+        async with locks.keep_renewed(
+            {key: lock_token},
+            timeout=STATS_SNAPSHOTS_LOAD_LOCK_TIMEOUT,
+        ):
+            await user_stats.load_stats_snapshots()
+    finally:
+        await locks.release(key, lock_token)
@@ -0,0 +1,48 @@
+import asyncio
+import secrets
+import threading
+
+from app import profiling
+from app import settings
+from app.errors import Error
+from app.errors import ErrorCode
+
+_profile_lock = asyncio.Lock()
+
+
+async def profile_event_loop(*, api_key: str, duration: float) -> str | Error:
+    """\
+    Sample the stacks of the event loop's thread (where requests are handled)
+    for `duration` seconds, returning them in collapsed-stack format.
+    """
+    if not settings.PROFILING_API_KEY:
+        return Error(
+            error_code=ErrorCode.NOT_FOUND,
+            user_feedback="Profiling is not enabled",
+        )
+
+    # compared as bytes, as str comparison raises on non-ascii input
+    if not secrets.compare_digest(
+        api_key.encode(),
+        settings.PROFILING_API_KEY.encode(),
+    ):
+        return Error(
+            error_code=ErrorCode.INCORRECT_CREDENTIALS,
+            user_feedback="Unauthorized request",
+        )
+
+    # only one profile at a time; concurrent samplers would skew each other
+    if _profile_lock.locked():
+        return Error(
+            error_code=ErrorCode.CONFLICT,
+            user_feedback="A profile is already in progress",
+        )
+
+    async with _profile_lock:
+        stack_counts = await asyncio.to_thread(
+            profiling.sample_stacks,
+            threading.get_ident(),
+            duration=duration,
+        )
+
+    return profiling.format_collapsed_stacks(stack_counts)
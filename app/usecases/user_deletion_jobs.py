@@ -0,0 +1,142 @@
+import logging
+
+from app import job_scheduling
+from app.common_types import UserDeletionJobStatus
+from app.errors import Error
+from app.errors import ErrorCode
+from app.models.user_deletion_jobs import UserDeletionJob
+from app.repositories import user_deletion_jobs
+from app.repositories import user_deletions
+from app.usecases import users
+
+USER_DELETION_JOB_MAX_USERS = 10_000
+USER_DELETION_JOB_BATCH_SIZE = 500
+
+
+async def create(user_ids: list[int]) -> UserDeletionJob | Error:
+    user_ids = list(dict.fromkeys(user_ids))  # deduplicate, preserving order
+    if not user_ids:
+        return Error(
+            error_code=ErrorCode.BAD_REQUEST,
+            user_feedback="At least one user id is required.",
+        )
+    if len(user_ids) > USER_DELETION_JOB_MAX_USERS:
+        return Error(
+            error_code=ErrorCode.BAD_REQUEST,
+            user_feedback=(
+                f"At most {USER_DELETION_JOB_MAX_USERS} users "
+                "may be deleted per job."
+            ),
+        )
+
+    job = await user_deletion_jobs.create(user_ids)
+    job_scheduling.schedule_job(_run(job.job_id))
+
+    return UserDeletionJob(
+        job_id=job.job_id,
+        status=job.status,
+        total=job.total,
+        deleted=job.deleted,
+        skipped=job.skipped,
+        pending=job.pending,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+async def fetch_one(job_id: str) -> UserDeletionJob | Error:
+    job = await user_deletion_jobs.fetch_one(job_id)
+    if job is None:
+        return Error(
+            error_code=ErrorCode.NOT_FOUND,
+            user_feedback="User deletion job not found.",
+        )
+
+    return UserDeletionJob(
+        job_id=job.job_id,
+        status=job.status,
+        total=job.total,
+        deleted=job.deleted,
+        skipped=job.skipped,
+        pending=job.pending,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+async def _run(job_id: str) -> None:
+    lock_token = await user_deletion_jobs.try_start(job_id)
+    if lock_token is None:
+        # the job is already being processed
+        return
+
+    try:
+        async with user_deletion_jobs.keep_started(job_id, lock_token):
+            await user_deletion_jobs.update_status(
+                job_id,
+                UserDeletionJobStatus.RUNNING,
+            )
+            await _resolve_pending_users(job_id)
+
+            while True:
+                user_ids = await user_deletion_jobs.fetch_remaining_user_ids(
+                    job_id,
+                    limit=USER_DELETION_JOB_BATCH_SIZE,
+                )
+                if not user_ids:
+                    break
+
+                counts = await users.delete_many_by_user_ids(user_ids)
+                await user_deletion_jobs.complete_batch(
+                    job_id,
+                    batch_size=len(user_ids),
+                    deleted=counts.deleted,
+                    skipped=counts.skipped,
+                    pending_user_ids=counts.pending_user_ids,
+                )
+    except Exception:
+        logging.exception(
+            "Failed to process bulk GDPR/CCPA user deletion job; it will be resumed",
+            extra={"job_id": job_id},
+        )
+        await user_deletion_jobs.update_status(job_id, UserDeletionJobStatus.FAILED)
+        await user_deletion_jobs.release(job_id, lock_token)
+        return
+
+    if await user_deletion_jobs.fetch_pending_user_ids(job_id):
+        # left running until the pending users' deletions are resumed
+        await user_deletion_jobs.release(job_id, lock_token)
+        return
+
+    await user_deletion_jobs.update_status(job_id, UserDeletionJobStatus.COMPLETED)
+    await user_deletion_jobs.finish(job_id, lock_token)
+
+    logging.info(
+        "Finished processing bulk GDPR/CCPA user deletion job",
+        extra={"job_id": job_id},
+    )
+
+
+async def _resolve_pending_users(job_id: str) -> None:
+    """Count the job's pending users whose deletions have since finished."""
+    deleted_user_ids = [
+        user_id
+        for user_id in await user_deletion_jobs.fetch_pending_user_ids(job_id)
+        if not await user_deletions.is_pending(user_id)
+    ]
+    if deleted_user_ids:
+        await user_deletion_jobs.resolve_pending_users(job_id, deleted_user_ids)
+
+
+async def resume_pending_user_deletion_jobs() -> None:
+    """\
+    Resume any bulk user deletion jobs which failed or were interrupted,
+    or which have pending users.
+    """
+    for job_id in await user_deletion_jobs.fetch_pending_job_ids():
+        if await user_deletion_jobs.fetch_one(job_id) is None:
+            # the job has expired; nothing left to do
+            await user_deletion_jobs.discard(job_id)
+            continue
+
+        await _run(job_id)
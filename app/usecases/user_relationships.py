@@ -0,0 +1,106 @@
+import app.state
+from app.common_types import UserPrivileges
+from app.errors import Error
+from app.errors import ErrorCode
+from app.models.user_relationships import RelatedUser
+from app.models.user_relationships import RelatedUsers
+from app.repositories import follower_counts
+from app.repositories import user_relationships
+from app.repositories import users
+
+FOLLOWER_COUNTS_SYNC_INTERVAL = 60 * 10
+
+
+async def _hydrate_related_users(
+    relationships: list[user_relationships.UserRelationship],
+    related_user_ids: list[int],
+    *,
+    limit: int,
+) -> RelatedUsers:
+    # fetched in a single query for the whole page
+    summaries_by_user_id = {
+        summary.id: summary
+        for summary in await users.fetch_many_summaries_by_user_ids(related_user_ids)
+    }
+
+    related_users: list[RelatedUser] = []
+    for related_user_id in related_user_ids:
+        summary = summaries_by_user_id.get(related_user_id)
+        if summary is None or not summary.privileges & UserPrivileges.USER_PUBLIC:
+            continue
+
+        related_users.append(
+            RelatedUser(
+                id=summary.id,
+                username=summary.username,
+                country=summary.country,
+            ),
+        )
+
+    return RelatedUsers(
+        users=related_users,
+        next_after_id=relationships[-1].id if len(relationships) == limit else None,
+    )
+
+
+async def fetch_followers(
+    user_id: int,
+    *,
+    after_id: int,
+    limit: int,
+) -> RelatedUsers | Error:
+    user = await users.fetch_one_by_user_id(user_id)
+    if user is None:
+        return Error(error_code=ErrorCode.NOT_FOUND, user_feedback="User not found.")
+
+    relationships = await user_relationships.fetch_many_by_target_user_id(
+        user_id,
+        after_id=after_id,
+        limit=limit,
+    )
+    return await _hydrate_related_users(
+        relationships,
+        [relationship.user_id for relationship in relationships],
+        limit=limit,
+    )
+
+
+async def fetch_following(
+    user_id: int,
+    *,
+    after_id: int,
+    limit: int,
+) -> RelatedUsers | Error:
+    user = await users.fetch_one_by_user_id(user_id)
+    if user is None:
+        return Error(error_code=ErrorCode.NOT_FOUND, user_feedback="User not found.")
+
+    relationships = await user_relationships.fetch_many_by_user_id(
+        user_id,
+        after_id=after_id,
+        limit=limit,
+    )
+    return await _hydrate_related_users(
+        relationships,
+        [relationship.target_user_id for relationship in relationships],
+        limit=limit,
+    )
+
+
+async def sync_follower_counts() -> None:
+    """\
+    Rebuild all follower counts from the users_relationships table,
+    picking up relationships changed by other services.
+
+    Runs on at most one worker per sync interval.
+    """
+    if not await app.state.redis.set(
+        "users-service:locks:sync-follower-counts",
+        "1",
+        nx=True,
+        ex=FOLLOWER_COUNTS_SYNC_INTERVAL,
+    ):
+        return None
+
+    await follower_counts.replace_all(user_relationships.iter_all_follower_counts())
+    return None
@@ -2,6 +2,7 @@ from app.common_types import AkatsukiMode
 from app.errors import Error
 from app.errors import ErrorCode
 from app.models.user_stats import UserStats
+from app.repositories import user_rankings
 from app.repositories import user_stats
 
 
@@ -16,6 +17,8 @@ async def fetch_one_by_user_id_and_akatsuki_mode(
             user_feedback="User statistics not found.",
         )
 
+    ranks = await user_rankings.fetch_ranks(user_id, mode)
+
     return UserStats(
         ranked_score=stats.ranked_score,
         total_score=stats.total_score,
@@ -34,6 +37,8 @@ async def fetch_one_by_user_id_and_akatsuki_mode(
         c_count=stats.c_count,
         d_count=stats.d_count,
         max_combo=stats.max_combo,
+        global_rank=ranks.global_rank,
+        country_rank=ranks.country_rank,
     )
 
 
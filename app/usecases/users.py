@@ -1,32 +1,75 @@
+import asyncio
 import logging
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Sequence
+
+from pydantic import BaseModel
 
 import app.state
+from app import ndjson
 from app import security
+from app import settings
 from app.adapters import assets
+from app.adapters import aws_s3
 from app.common_types import UserPrivileges
 from app.errors import Error
 from app.errors import ErrorCode
+from app.models.user_deletion_jobs import UserDeletionCounts
 from app.models.users import Badge
 from app.models.users import CustomBadge
 from app.models.users import TournamentBadge
 from app.models.users import User
+from app.models.users import UserClan
+from app.models.users import UserSearchResult
 from app.repositories import clans
+from app.repositories import follower_counts
 from app.repositories import lastfm_flags
+from app.repositories import locks
 from app.repositories import password_recovery
 from app.repositories import user_badges
+from app.repositories import user_deletion_archives
+from app.repositories import user_deletions
 from app.repositories import user_hwid_associations
 from app.repositories import user_ip_associations
+from app.repositories import user_rankings
 from app.repositories import user_relationships
 from app.repositories import user_tournament_badges
+from app.repositories import username_indexes
 from app.repositories import users
 
+# names changed by other services are missing from the username filter
+# until the next sync, so it is kept short
+USERNAME_INDEXES_SYNC_INTERVAL = 60 * 10
+USERNAME_INDEXES_SYNC_LOCK_TIMEOUT = 60 * 15
+USERNAME_INDEXES_REFRESH_INTERVAL = 2
+
+
+async def _fetch_follower_count(user_id: int) -> int:
+    follower_count = await follower_counts.fetch_one(user_id)
+    if follower_count is None:
+        # counts have not yet been built
+        follower_count = await user_relationships.fetch_follower_count_by_user_id(
+            user_id,
+        )
+    return follower_count
+
 
 async def fetch_one_by_username(username: str) -> User | Error:
+    # most lookups of names which don't exist are answered by the filter.
+    # it may miss names changed by other services until its next sync (for
+    # up to `USERNAME_INDEXES_SYNC_INTERVAL`), so it is not used for
+    # authentication or username availability.
+    if not await username_indexes.username_may_exist(username):
+        return Error(error_code=ErrorCode.NOT_FOUND, user_feedback="User not found.")
+
     user = await users.fetch_one_by_username(username)
     if user is None:
         return Error(error_code=ErrorCode.NOT_FOUND, user_feedback="User not found.")
 
-    followers = await user_relationships.fetch_follower_count_by_user_id(user.id)
+    followers = await _fetch_follower_count(user.id)
     badges = await user_badges.fetch_all_by_user_id(user.id)
     tournament_badges = await user_tournament_badges.fetch_all_by_user_id(user.id)
 
@@ -39,6 +82,7 @@ async def fetch_one_by_username(username: str) -> User | Error:
         userpage_content=user.userpage_content,
         country=user.country,
         clan_id=user.clan_id,
+        clan=None,
         followers=followers,
         favourite_mode=user.favourite_mode,
         play_style=user.play_style,
@@ -70,15 +114,23 @@ async def fetch_one_by_username(username: str) -> User | Error:
     )
 
 
-async def fetch_one_by_user_id(user_id: int) -> User | Error:
+async def fetch_one_by_user_id(
+    user_id: int,
+    *,
+    include_clan: bool = False,
+) -> User | Error:
     user = await users.fetch_one_by_user_id(user_id)
     if user is None:
         return Error(error_code=ErrorCode.NOT_FOUND, user_feedback="User not found.")
 
-    followers = await user_relationships.fetch_follower_count_by_user_id(user.id)
+    followers = await _fetch_follower_count(user.id)
     badges = await user_badges.fetch_all_by_user_id(user.id)
     tournament_badges = await user_tournament_badges.fetch_all_by_user_id(user.id)
 
+    clan = None
+    if include_clan and user.clan_id:
+        clan = await clans.fetch_one_by_clan_id(user.clan_id)
+
     return User(
         id=user.id,
         username=user.username,
@@ -88,6 +140,11 @@ async def fetch_one_by_user_id(user_id: int) -> User | Error:
         userpage_content=user.userpage_content,
         country=user.country,
         clan_id=user.clan_id,
+        clan=(
+            UserClan(id=clan.id, name=clan.name, tag=clan.tag)
+            if clan is not None
+            else None
+        ),
         followers=followers,
         favourite_mode=user.favourite_mode,
         play_style=user.play_style,
@@ -119,6 +176,62 @@ async def fetch_one_by_user_id(user_id: int) -> User | Error:
     )
 
 
+# the most pages of the prefix index read per search, while looking for
+# users who are still public
+USER_SEARCH_MAX_PAGES = 5
+
+
+async def search_by_username_prefix(
+    query: str,
+    *,
+    limit: int,
+) -> list[UserSearchResult] | Error:
+    search_results: list[UserSearchResult] = []
+
+    # the index only holds names of users who were public when indexed;
+    # read the rest fresh, as users may have been restricted since, and
+    # read further pages to make up for any who have been
+    for page in range(USER_SEARCH_MAX_PAGES):
+        user_ids = await username_indexes.search_user_ids_by_username_prefix(
+            query,
+            offset=page * limit,
+            limit=limit,
+        )
+        if user_ids is None:
+            return Error(
+                error_code=ErrorCode.SERVICE_UNAVAILABLE,
+                user_feedback="User search is temporarily unavailable.",
+            )
+
+        user_summaries = {
+            user_summary.id: user_summary
+            for user_summary in await users.fetch_many_summaries_by_user_ids(
+                user_ids,
+            )
+        }
+        for user_id in user_ids:
+            user_summary = user_summaries.get(user_id)
+            if user_summary is None:
+                continue
+            if not user_summary.privileges & UserPrivileges.USER_PUBLIC:
+                continue
+
+            search_results.append(
+                UserSearchResult(
+                    id=user_summary.id,
+                    username=user_summary.username,
+                ),
+            )
+            if len(search_results) == limit:
+                return search_results
+
+        if len(user_ids) < limit:
+            # no more matches
+            break
+
+    return search_results
+
+
 async def update_username(user_id: int, *, new_username: str) -> None | Error:
     user = await users.fetch_one_by_user_id(user_id)
     if user is None:
@@ -143,6 +256,11 @@ async def update_username(user_id: int, *, new_username: str) -> None | Error:
         )
 
     await users.update_username(user_id, new_username)
+    await username_indexes.set_username(
+        user_id,
+        new_username,
+        is_public=bool(user.privileges & UserPrivileges.USER_PUBLIC),
+    )
     return None
 
 
@@ -205,6 +323,62 @@ async def update_email_address(
     return None
 
 
+async def sync_username_indexes() -> None:
+    """\
+    Rebuild the username indexes from a full scan of the users table,
+    if they have not been synced within the sync interval.
+
+    Runs on at most one worker at a time, at most once per sync interval.
+    """
+    if await app.state.redis.exists("users-service:username-indexes:synced"):
+        return None
+
+    lock_token = await locks.try_acquire(
+        "users-service:locks:sync-username-indexes",
+        timeout=USERNAME_INDEXES_SYNC_LOCK_TIMEOUT,
+    )
+    if lock_token is None:
+        return None
+
+    try:
+        await username_indexes.replace_all(
+            users.iter_username_records_after_user_id(0),
+        )
+        await app.state.redis.set(
+            "users-service:username-indexes:synced",
+            "1",
+            ex=USERNAME_INDEXES_SYNC_INTERVAL,
+        )
+    finally:
+        await locks.release("users-service:locks:sync-username-indexes", lock_token)
+    return None
+
+
+async def refresh_username_indexes() -> None:
+    """\
+    Add users registered (by other services) since the last sync or
+    refresh to the username indexes.
+
+    Runs on at most one worker per refresh interval.
+    """
+    if not await app.state.redis.set(
+        "users-service:locks:refresh-username-indexes",
+        "1",
+        nx=True,
+        ex=USERNAME_INDEXES_REFRESH_INTERVAL,
+    ):
+        return None
+
+    max_user_id = await username_indexes.fetch_max_user_id()
+    if max_user_id is None:
+        # not yet built
+        return None
+
+    async for records in users.iter_username_records_after_user_id(max_user_id):
+        await username_indexes.add_many(records)
+    return None
+
+
 async def fetch_total_registered_user_count() -> int:
     return await users.fetch_total_registered_user_count()
 
@@ -272,79 +446,374 @@ async def delete_one_by_user_id(user_id: int, /) -> None | Error:
     # - (potetnailly) user notes
     # - (potentially) userpage content
 
-    transaction = await app.state.database.transaction()
-    try:
-        user = await users.fetch_one_by_user_id(user_id)
-        if user is None:
-            return Error(
-                error_code=ErrorCode.NOT_FOUND,
-                user_feedback="User not found.",
-            )
-
-        if user.clan_id:
-            clan = await clans.fetch_one_by_clan_id(user.clan_id)
-            if clan is not None:
-                if user.id == clan.owner:
-                    # transfer clan ownership to another member, if available
-                    other_clan_members = sorted(
-                        [
-                            u
-                            for u in await users.fetch_many_by_clan_id(user.clan_id)
-                            if u.id != user.id
-                        ],
-                        # XXX: heuristic; clan join date would be better
-                        #      but it is not something we currently store
-                        key=lambda u: (u.privileges, u.latest_activity),
-                    )
-                    if other_clan_members:
-                        new_owner = other_clan_members[0]
-                        await clans.update_owner(user.clan_id, new_owner.id)
-                    else:
-                        # no other members in the clan; just delete it
-                        await clans.delete_one_by_clan_id(user.clan_id)
-
-        await password_recovery.delete_many_by_username(user.username)
-
-        # TODO: consider what ac data should be anonymized instead of wiped
-        await user_ip_associations.delete_many_by_user_id(user_id)
-        await user_hwid_associations.delete_many_by_user_id(user_id)
-        await lastfm_flags.delete_many_by_user_id(user_id)
-        # TODO: patcher_detections & patcher_token_logs
-
-        # TODO: wipe or anonymize all replay data.
-        #       probably a good idea to call scores-service
-
-        # TODO: wipe all static content (screenshots, profile bgs, etc.)
-        # TODO: potentially wipe youtube uploads
-
-        # last step of the process; remove all associated pii
-        # TODO: split this to make it more clear what's being done
-        #       at the usecase layer
-        await users.anonymize_one_by_user_id(user_id)
-        await assets.delete_avatar_by_user_id(user_id)
-
-        # TODO: (technically required) anonymize data in data backups
+    user = await users.fetch_one_by_user_id(user_id)
+    if user is None:
+        return Error(
+            error_code=ErrorCode.NOT_FOUND,
+            user_feedback="User not found.",
+        )
 
-        # inform other systems of the user's deletion (or "ban")
-        await app.state.redis.publish("peppy:ban", str(user_id))
+    lock_token = await user_deletions.try_start(user_id)
+    if lock_token is None:
+        return Error(
+            error_code=ErrorCode.CONFLICT,
+            user_feedback="User deletion is already in progress.",
+        )
 
-        # TODO: make sure they're removed from leaderboards
+    # each stage is idempotent, and its completion is persisted, so a
+    # failed or interrupted deletion can be safely resumed by retrying
+    try:
+        async with user_deletions.keep_started({user_id: lock_token}):
+            completed_stages = await user_deletions.fetch_completed_stages(user_id)
+            for stage, run_stage in USER_DELETION_STAGES:
+                if stage in completed_stages:
+                    continue
+
+                await run_stage(user)
+                await user_deletions.mark_stage_completed(user_id, stage)
     except Exception:
         logging.exception(
             "Failed to process GDPR/CCPA user deletion request",
             extra={"user_id": user_id},
         )
-        await transaction.rollback()
+        await user_deletions.release(user_id, lock_token)
         return Error(
             error_code=ErrorCode.INTERNAL_SERVER_ERROR,
             user_feedback="Failed to process user deletion request.",
         )
-    else:
-        logging.info(
-            "Successfully processed GDPR/CCPA user deletion request",
-            # NOTE: intentionally not logging any pii
-            extra={"user_id": user_id},
+
+    await user_deletions.finish(user_id, lock_token)
+
+    logging.info(
+        "Successfully processed GDPR/CCPA user deletion request",
+        # NOTE: intentionally not logging any pii
+        extra={"user_id": user_id},
+    )
+    return None
+
+
+USER_DELETION_ARCHIVE_PURGE_INTERVAL = 60 * 60
+USER_DELETION_ARCHIVE_PURGE_BATCH_SIZE = 1000
+
+
+async def _archive_associated_data(user: users.User) -> None:
+    """\
+    Archive a user's associated data to S3 as gzipped ndjson, one object
+    per table, prior to its deletion. Rows are streamed in batches.
+
+    Archives are kept for `USER_DELETION_ARCHIVE_RETENTION_DAYS`, and then
+    purged by `purge_expired_user_deletion_archives`.
+    """
+    record_batches_by_table: dict[str, AsyncIterator[Sequence[BaseModel]]] = {
+        "password_recovery": password_recovery.iter_all_by_username(user.username),
+        "ip_user": user_ip_associations.iter_all_by_user_id(user.id),
+        "hw_user": user_hwid_associations.iter_all_by_user_id(user.id),
+        "lastfm_flags": lastfm_flags.iter_all_by_user_id(user.id),
+    }
+    saved = await asyncio.gather(
+        *(
+            aws_s3.save_object_data_from_stream(
+                f"user-deletion-archives/{user.id}/{table}.ndjson.gz",
+                ndjson.gzip_chunks(ndjson.encode_batches(record_batches)),
+                content_type="application/gzip",
+            )
+            for table, record_batches in record_batches_by_table.items()
+        ),
+    )
+    if not all(saved):
+        raise RuntimeError("Failed to archive user's associated data")
+
+    await user_deletion_archives.set_expiry(
+        user.id,
+        expires_at=(
+            int(time.time())
+            + settings.USER_DELETION_ARCHIVE_RETENTION_DAYS * 60 * 60 * 24
+        ),
+    )
+
+
+async def purge_expired_user_deletion_archives() -> None:
+    """\
+    Delete users' deletion archives once their retention period has elapsed.
+    Runs on at most one worker per purge interval.
+    """
+    if not await app.state.redis.set(
+        "users-service:locks:purge-expired-user-deletion-archives",
+        "1",
+        nx=True,
+        ex=USER_DELETION_ARCHIVE_PURGE_INTERVAL,
+    ):
+        return None
+
+    while True:
+        expired_user_ids = await user_deletion_archives.fetch_expired_user_ids(
+            now=int(time.time()),
+            limit=USER_DELETION_ARCHIVE_PURGE_BATCH_SIZE,
         )
-        await transaction.commit()
+        for user_id in expired_user_ids:
+            deleted = await aws_s3.delete_objects_by_prefix(
+                f"user-deletion-archives/{user_id}/",
+            )
+            if not deleted:
+                # retried on the next run
+                return None
+
+            await user_deletion_archives.delete_expiry(user_id)
+
+        if len(expired_user_ids) < USER_DELETION_ARCHIVE_PURGE_BATCH_SIZE:
+            return None
+
+
+async def _wipe_associated_data(user: users.User) -> None:
+    if settings.USER_DELETION_ARCHIVE_ENABLED:
+        await _archive_associated_data(user)
+
+    # these tables are independent of each other, so they're wiped
+    # concurrently (each on its own connection), in batches
+    # TODO: consider what ac data should be anonymized instead of wiped
+    await asyncio.gather(
+        password_recovery.delete_many_by_username(user.username),
+        user_ip_associations.delete_many_by_user_id(user.id),
+        user_hwid_associations.delete_many_by_user_id(user.id),
+        lastfm_flags.delete_many_by_user_id(user.id),
+    )
+    # TODO: patcher_detections & patcher_token_logs
+
+    # TODO: wipe or anonymize all replay data.
+    #       probably a good idea to call scores-service
+
+    # TODO: potentially wipe youtube uploads
+
+
+async def _release_clan_ownership(
+    user: users.User,
+    *,
+    leaving_user_ids: set[int],
+) -> None:
+    """\
+    If the user owns a clan, transfer it to another member who is not
+    also leaving the clan, or delete it if there are no such members.
+
+    The clan's cache entry must be invalidated once this is committed.
+    """
+    if not user.clan_id:
+        return None
+
+    # ownership must be read fresh, as clans may be modified elsewhere
+    clan = await clans.fetch_one_by_clan_id(user.clan_id, use_cache=False)
+    if clan is None or clan.owner != user.id:
+        return None
+
+    # transfer clan ownership to another member, if available
+    # XXX: heuristic; clan join date would be better
+    #      but it is not something we currently store
+    transferred = await clans.transfer_ownership_to_successor(
+        user.clan_id,
+        excluded_user_ids=leaving_user_ids,
+    )
+    if not transferred:
+        # no other members in the clan; just delete it
+        await clans.delete_one_by_clan_id(user.clan_id)
 
     return None
+
+
+async def _anonymize_user(user: users.User) -> None:
+    async with app.state.database.transaction():
+        await _release_clan_ownership(user, leaving_user_ids={user.id})
+
+        # remove all associated pii
+        # TODO: split this to make it more clear what's being done
+        #       at the usecase layer
+        await users.anonymize_one_by_user_id(user.id)
+
+    if user.clan_id:
+        await clans.invalidate_cache(user.clan_id)
+
+    await username_indexes.set_username(
+        user.id,
+        f"deleted_user_{user.id}",
+        is_public=False,
+    )
+
+    # TODO: (technically required) anonymize data in data backups
+
+
+async def _delete_avatar(user: users.User) -> None:
+    await assets.delete_avatar_by_user_id(user.id)
+
+
+# s3 key prefixes under which all objects belong to a single user.
+# only this service's own content is keyed by user so far; screenshots
+# and profile backgrounds are not yet wiped.
+USER_CONTENT_KEY_PREFIXES = [
+    "user-data-exports/{user_id}/",
+]
+
+
+async def _delete_user_content(user: users.User) -> None:
+    # TODO: wipe static content stored by other services
+    #       (screenshots, profile bgs, etc.). their keys are not known to
+    #       this service; they must either be keyed by user (and added to
+    #       `USER_CONTENT_KEY_PREFIXES`), or deleted by their owners.
+    for key_prefix in USER_CONTENT_KEY_PREFIXES:
+        deleted = await aws_s3.delete_objects_by_prefix(
+            key_prefix.format(user_id=user.id),
+        )
+        if not deleted:
+            raise RuntimeError("Failed to delete user's content")
+
+
+async def _delete_rankings(user: users.User) -> None:
+    # only removes them from this service's rankings
+    # TODO: make sure they're removed from leaderboards
+    await user_rankings.delete_all_by_user_id(user.id)
+
+
+async def _publish_ban(user: users.User) -> None:
+    # inform other systems of the user's deletion (or "ban")
+    await app.state.redis.publish("peppy:ban", str(user.id))
+
+
+USER_DELETION_SIDE_EFFECT_STAGES: list[
+    tuple[
+        user_deletions.UserDeletionStage,
+        Callable[[users.User], Awaitable[None]],
+    ]
+] = [
+    (user_deletions.UserDeletionStage.DELETE_AVATAR, _delete_avatar),
+    (user_deletions.UserDeletionStage.DELETE_USER_CONTENT, _delete_user_content),
+    (user_deletions.UserDeletionStage.DELETE_RANKINGS, _delete_rankings),
+    (user_deletions.UserDeletionStage.PUBLISH_BAN, _publish_ban),
+]
+
+USER_DELETION_STAGES: list[
+    tuple[
+        user_deletions.UserDeletionStage,
+        Callable[[users.User], Awaitable[None]],
+    ]
+] = [
+    (user_deletions.UserDeletionStage.WIPE_ASSOCIATED_DATA, _wipe_associated_data),
+    (user_deletions.UserDeletionStage.ANONYMIZE_USER, _anonymize_user),
+    # side effects outside of mysql are only performed once
+    # the user's data has been committed as deleted
+    *USER_DELETION_SIDE_EFFECT_STAGES,
+]
+
+# the number of users whose side effects (assets-service calls,
+# redis writes) may be in flight at once during bulk deletions
+BULK_USER_DELETION_CONCURRENCY = 16
+
+
+async def delete_many_by_user_ids(user_ids: list[int], /) -> UserDeletionCounts:
+    """\
+    Delete many users at once, using set-based queries where possible.
+
+    This performs the same stages as `delete_one_by_user_id`. If the batch
+    fails, the users are left pending, to be resumed individually.
+    """
+    found_users = await users.fetch_many_by_user_ids(user_ids)
+
+    lock_tokens_by_user_id: dict[int, str] = {}
+    for user in found_users:
+        lock_token = await user_deletions.try_start(user.id)
+        if lock_token is not None:
+            lock_tokens_by_user_id[user.id] = lock_token
+
+    deleting_users = [user for user in found_users if user.id in lock_tokens_by_user_id]
+    skipped_count = len(user_ids) - len(deleting_users)
+    if not deleting_users:
+        return UserDeletionCounts(
+            deleted=0,
+            skipped=skipped_count,
+            pending_user_ids=[],
+        )
+
+    try:
+        async with user_deletions.keep_started(lock_tokens_by_user_id):
+            await _delete_many(deleting_users)
+    except Exception:
+        logging.exception(
+            "Failed to process bulk GDPR/CCPA user deletion request",
+            extra={"user_ids": [user.id for user in deleting_users]},
+        )
+        for user_id, lock_token in lock_tokens_by_user_id.items():
+            await user_deletions.release(user_id, lock_token)
+        return UserDeletionCounts(
+            deleted=0,
+            skipped=skipped_count,
+            pending_user_ids=list(lock_tokens_by_user_id),
+        )
+
+    for user_id, lock_token in lock_tokens_by_user_id.items():
+        await user_deletions.finish(user_id, lock_token)
+
+    return UserDeletionCounts(
+        deleted=len(deleting_users),
+        skipped=skipped_count,
+        pending_user_ids=[],
+    )
+
+
+async def _delete_many(deleting_users: list[users.User]) -> None:
+    user_ids = [user.id for user in deleting_users]
+
+    if settings.USER_DELETION_ARCHIVE_ENABLED:
+        for user in deleting_users:
+            await _archive_associated_data(user)
+
+    await asyncio.gather(
+        password_recovery.delete_many_by_usernames(
+            [user.username for user in deleting_users],
+        ),
+        user_ip_associations.delete_many_by_user_ids(user_ids),
+        user_hwid_associations.delete_many_by_user_ids(user_ids),
+        lastfm_flags.delete_many_by_user_ids(user_ids),
+    )
+    for user in deleting_users:
+        await user_deletions.mark_stage_completed(
+            user.id,
+            user_deletions.UserDeletionStage.WIPE_ASSOCIATED_DATA,
+        )
+
+    async with app.state.database.transaction():
+        leaving_user_ids = set(user_ids)
+        for user in deleting_users:
+            await _release_clan_ownership(user, leaving_user_ids=leaving_user_ids)
+
+        await users.anonymize_many_by_user_ids(user_ids)
+
+    for clan_id in {user.clan_id for user in deleting_users if user.clan_id}:
+        await clans.invalidate_cache(clan_id)
+
+    for user_id in user_ids:
+        await username_indexes.set_username(
+            user_id,
+            f"deleted_user_{user_id}",
+            is_public=False,
+        )
+
+    for user in deleting_users:
+        await user_deletions.mark_stage_completed(
+            user.id,
+            user_deletions.UserDeletionStage.ANONYMIZE_USER,
+        )
+
+    semaphore = asyncio.Semaphore(BULK_USER_DELETION_CONCURRENCY)
+
+    async def run_side_effect_stages(user: users.User) -> None:
+        async with semaphore:
+            for stage, run_stage in USER_DELETION_SIDE_EFFECT_STAGES:
+                await run_stage(user)
+                await user_deletions.mark_stage_completed(user.id, stage)
+
+    await asyncio.gather(*(run_side_effect_stages(user) for user in deleting_users))
+
+
+async def resume_pending_user_deletions() -> None:
+    """Resume any user deletions which previously failed or were interrupted."""
+    for user_id in await user_deletions.fetch_pending_user_ids():
+        response = await delete_one_by_user_id(user_id)
+        if isinstance(response, Error) and response.error_code is ErrorCode.NOT_FOUND:
+            # the user no longer exists; nothing left to do
+            await user_deletions.discard(user_id)
@@ -0,0 +1,16 @@
+"""The shape of the seeded benchmark dataset, shared by the data generator & runner."""
+
+from app.common_types import AkatsukiMode
+
+FIRST_USER_ID = 1000
+
+# All seeded users share a password, so logins can be replayed for any user;
+# its hash is fixed (rather than salted per run), so datasets are reproducible
+PASSWORD = "Benchmark-Password-1"
+HASHED_PASSWORD = "$2b$12$tSgRfJEPDTCl82NdFOFCgu8/EfApqEMSA4BZyPzu9aSJJWtEoseIi"
+
+AKATSUKI_MODES = list(AkatsukiMode)
+
+
+def make_username(user_id: int) -> str:
+    return f"bench_user_{user_id}"
@@ -0,0 +1,376 @@
+"""\
+Replay a realistic mix of public API traffic against a running service,
+and report throughput, latency percentiles and per-request query counts.
+
+Each scenario is first run alone, so that the queries and redis commands
+it causes can be attributed to it from the service's `/metrics`; then all
+scenarios are run together, weighted by the traffic mix.
+
+Results can be saved as a baseline, and compared against on later runs;
+a regression beyond the tolerance causes a non-zero exit code.
+
+Usage: python -m benchmarks.run --users 10000 --compare benchmarks/baselines/main.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Any
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.common_types import GameMode
+from app.common_types import RelaxMode
+from benchmarks import dataset
+
+# game & relax mode combinations which have stats
+STATS_MODES = [
+    *((game_mode, RelaxMode.VANILLA) for game_mode in GameMode),
+    *(
+        (game_mode, RelaxMode.RELAX)
+        for game_mode in GameMode
+        if game_mode is not GameMode.MANIA
+    ),
+    (GameMode.OSU, RelaxMode.AUTOPILOT),
+]
+
+
+@dataclass
+class BenchmarkRequest:
+    method: str
+    url: str
+    headers: dict[str, str] = field(default_factory=dict)
+    json: Any = None
+
+
+class RequestFactory:
+    def __init__(self, rng: random.Random, user_count: int) -> None:
+        self.rng = rng
+        self.user_count = user_count
+        # logins are rate limited per ip & username, so each login is made
+        # from a new ip, cycling through users
+        self.login_ids = itertools.count()
+
+    def random_user_id(self) -> int:
+        # lookups are skewed towards popular (low id) users; log-uniform
+        rank = int(self.user_count ** self.rng.random()) - 1
+        return dataset.FIRST_USER_ID + rank
+
+    def profile(self) -> BenchmarkRequest:
+        return BenchmarkRequest(
+            "GET",
+            f"/public/api/v1/users/{self.random_user_id()}",
+        )
+
+    def stats(self) -> BenchmarkRequest:
+        game_mode, relax_mode = self.rng.choice(STATS_MODES)
+        return BenchmarkRequest(
+            "GET",
+            f"/public/api/v1/users/{self.random_user_id()}/stats"
+            f"?game_mode={game_mode.value}&relax_mode={relax_mode.value}",
+        )
+
+    def overall_stats(self) -> BenchmarkRequest:
+        return BenchmarkRequest(
+            "GET",
+            self.rng.choice(
+                [
+                    "/public/api/v1/overall-stats/total-registered-users",
+                    "/public/api/v1/overall-stats/total-pp-earned",
+                ],
+            ),
+        )
+
+    def login(self) -> BenchmarkRequest:
+        login_id = next(self.login_ids)
+        user_id = dataset.FIRST_USER_ID + login_id % self.user_count
+        return BenchmarkRequest(
+            "POST",
+            "/public/api/v1/authenticate",
+            headers={
+                "X-Real-IP": f"10.{login_id >> 16 & 255}.{login_id >> 8 & 255}.{login_id & 255}",
+                "User-Agent": "users-service-benchmark",
+            },
+            json={
+                "username": dataset.make_username(user_id),
+                "password": dataset.PASSWORD,
+            },
+        )
+
+
+# scenario name -> share of traffic
+TRAFFIC_MIX = {
+    "profile": 50,
+    "stats": 30,
+    "overall_stats": 15,
+    "login": 5,
+}
+
+
+def get_scenario(factory: RequestFactory, name: str) -> Callable[[], BenchmarkRequest]:
+    scenario: Callable[[], BenchmarkRequest] = getattr(factory, name)
+    return scenario
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries_per_request: float | None = None
+    redis_commands_per_request: float | None = None
+
+
+async def fetch_dependency_call_counts(client: httpx.AsyncClient) -> dict[str, float]:
+    response = await client.get("/metrics")
+    response.raise_for_status()
+
+    counts = {"db": 0.0, "redis": 0.0}
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if sample.name == "db_query_duration_seconds_count":
+                counts["db"] += sample.value
+            elif sample.name == "redis_command_duration_seconds_count":
+                counts["redis"] += sample.value
+    return counts
+
+
+async def run_phase(
+    client: httpx.AsyncClient,
+    scenarios: dict[str, tuple[Callable[[], BenchmarkRequest], int]],
+    *,
+    rng: random.Random,
+    concurrency: int,
+    duration: float,
+) -> tuple[dict[str, list[float]], dict[str, int], float]:
+    """\
+    Send requests from `concurrency` workers for `duration` seconds.
+    Returns each scenario's latencies (in ms) & error counts, and the
+    elapsed time.
+    """
+    names = list(scenarios)
+    weights = [weight for _, weight in scenarios.values()]
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    errors = dict.fromkeys(names, 0)
+
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights=weights)[0]
+            request = scenarios[name][0]()
+
+            request_start = time.perf_counter()
+            try:
+                response = await client.request(
+                    request.method,
+                    request.url,
+                    headers=request.headers,
+                    json=request.json,
+                )
+                failed = response.status_code >= 500 or response.status_code == 429
+            except httpx.HTTPError:
+                failed = True
+
+            latencies[name].append((time.perf_counter() - request_start) * 1000)
+            if failed:
+                errors[name] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> ScenarioResult:
+    if len(latencies) < 2:
+        raise RuntimeError("Too few requests were made; increase --duration")
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return ScenarioResult(
+        requests=len(latencies),
+        errors=errors,
+        throughput=len(latencies) / elapsed,
+        p50_ms=percentiles[49],
+        p95_ms=percentiles[94],
+        p99_ms=percentiles[98],
+    )
+
+
+def print_results(title: str, results: dict[str, ScenarioResult]) -> None:
+    print(f"\n{title}")
+    print(
+        f"{'scenario':<16}{'requests':>10}{'errors':>8}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'redis':>8}",
+    )
+    for name, result in results.items():
+        queries = (
+            f"{result.queries_per_request:.2f}"
+            if result.queries_per_request is not None
+            else "-"
+        )
+        redis_commands = (
+            f"{result.redis_commands_per_request:.2f}"
+            if result.redis_commands_per_request is not None
+            else "-"
+        )
+        print(
+            f"{name:<16}{result.requests:>10}{result.errors:>8}"
+            f"{result.throughput:>10.1f}{result.p50_ms:>10.2f}"
+            f"{result.p95_ms:>10.2f}{result.p99_ms:>10.2f}"
+            f"{queries:>10}{redis_commands:>8}",
+        )
+
+
+# metric -> whether higher values are better
+COMPARED_METRICS = {
+    "throughput": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "queries_per_request": False,
+}
+
+
+def compare(
+    results: dict[str, dict[str, ScenarioResult]],
+    baseline: dict[str, dict[str, dict[str, Any]]],
+    *,
+    tolerance: float,
+) -> bool:
+    """Print changes from the baseline; returns False on any regression."""
+    print(f"\nchanges from baseline (tolerance {tolerance:.0%})")
+    ok = True
+    for phase, phase_results in results.items():
+        for name, result in phase_results.items():
+            baseline_result = baseline.get(phase, {}).get(name)
+            if baseline_result is None:
+                continue
+
+            for metric, higher_is_better in COMPARED_METRICS.items():
+                value = getattr(result, metric)
+                baseline_value = baseline_result.get(metric)
+                if value is None or not baseline_value:
+                    continue
+
+                change = (value - baseline_value) / baseline_value
+                regressed = (-change if higher_is_better else change) > tolerance
+                ok = ok and not regressed
+                print(
+                    f"{phase + '/' + name:<28}{metric:<22}"
+                    f"{baseline_value:>10.2f} -> {value:>10.2f} "
+                    f"({change:+.1%}){'  REGRESSION' if regressed else ''}",
+                )
+    return ok
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:18080")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    factory = RequestFactory(rng, args.users)
+    all_scenarios = {
+        name: (get_scenario(factory, name), weight)
+        for name, weight in TRAFFIC_MIX.items()
+    }
+    results: dict[str, dict[str, ScenarioResult]] = {"isolated": {}, "mixed": {}}
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=30,
+        limits=httpx.Limits(max_connections=args.concurrency),
+    ) as client:
+        await run_phase(
+            client,
+            all_scenarios,
+            rng=rng,
+            concurrency=args.concurrency,
+            duration=args.warmup,
+        )
+
+        for name, scenario in all_scenarios.items():
+            calls_before = await fetch_dependency_call_counts(client)
+            latencies, errors, elapsed = await run_phase(
+                client,
+                {name: scenario},
+                rng=rng,
+                concurrency=args.concurrency,
+                duration=args.duration,
+            )
+            calls_after = await fetch_dependency_call_counts(client)
+
+            result = summarize(latencies[name], errors[name], elapsed)
+            result.queries_per_request = (
+                calls_after["db"] - calls_before["db"]
+            ) / result.requests
+            result.redis_commands_per_request = (
+                calls_after["redis"] - calls_before["redis"]
+            ) / result.requests
+            results["isolated"][name] = result
+
+        latencies, errors, elapsed = await run_phase(
+            client,
+            all_scenarios,
+            rng=rng,
+            concurrency=args.concurrency,
+            duration=args.duration,
+        )
+        for name in all_scenarios:
+            results["mixed"][name] = summarize(latencies[name], errors[name], elapsed)
+        results["mixed"]["total"] = summarize(
+            list(itertools.chain.from_iterable(latencies.values())),
+            sum(errors.values()),
+            elapsed,
+        )
+
+    print_results(
+        "isolated (queries & redis commands per request)", results["isolated"]
+    )
+    print_results("mixed", results["mixed"])
+
+    if args.save_baseline is not None:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(
+            json.dumps(
+                {
+                    phase: {
+                        name: result.__dict__ for name, result in phase_results.items()
+                    }
+                    for phase, phase_results in results.items()
+                },
+                indent=2,
+            ),
+        )
+        print(f"\nsaved baseline to {args.save_baseline}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+        if not compare(results, baseline, tolerance=args.tolerance):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(asyncio.run(main()))
@@ -0,0 +1,25 @@
+#!/usr/bin/env bash
+# Boot mysql & redis stand-ins, seed them, start the service, and benchmark
+# it. Arguments are passed on to `benchmarks.run`; USERS sets the dataset size.
+set -euo pipefail
+
+cd "$(dirname "$0")/.."
+
+USERS=${USERS:-10000}
+
+# recreated, so each run starts from an empty database & redis
+docker compose -f benchmarks/docker-compose.yml up -d --wait --force-recreate
+
+set -a
+source benchmarks/benchmark.env
+set +a
+
+PYTHONPATH=. ./scripts/generate-synthetic-data.py --users "$USERS"
+
+./main.py &
+SERVICE_PID=$!
+trap 'kill $SERVICE_PID' EXIT
+
+./scripts/await-service.sh "$APP_HOST" "$APP_PORT" 60
+
+python -m benchmarks.run --base-url "http://$APP_HOST:$APP_PORT" --users "$USERS" "$@"
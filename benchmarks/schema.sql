@@ -0,0 +1,163 @@
+-- The subset of the Akatsuki database schema read & written by this service,
+-- for local benchmarking. Column types & indexes mirror production.
+
+CREATE TABLE users (
+    id INT NOT NULL AUTO_INCREMENT,
+    username VARCHAR(32) NOT NULL,
+    username_safe VARCHAR(32) NOT NULL,
+    username_aka VARCHAR(32) NOT NULL DEFAULT '',
+    password_md5 VARCHAR(127) NOT NULL,
+    email VARCHAR(254) NOT NULL,
+    register_datetime INT NOT NULL,
+    latest_activity INT NOT NULL DEFAULT 0,
+    silence_end INT NOT NULL DEFAULT 0,
+    silence_reason VARCHAR(127) NOT NULL DEFAULT '',
+    donor_expire INT NOT NULL DEFAULT 0,
+    ban_datetime INT NOT NULL DEFAULT 0,
+    freeze_reason VARCHAR(255) NOT NULL DEFAULT '',
+    userpage_content MEDIUMTEXT NULL,
+    notes MEDIUMTEXT NULL,
+    country CHAR(2) NOT NULL DEFAULT 'XX',
+    privileges BIGINT NOT NULL DEFAULT 0,
+    clan_id INT NOT NULL DEFAULT 0,
+    play_style INT NOT NULL DEFAULT 0,
+    favourite_mode TINYINT NOT NULL DEFAULT 0,
+    custom_badge_icon VARCHAR(32) NOT NULL DEFAULT '',
+    custom_badge_name VARCHAR(24) NOT NULL DEFAULT '',
+    can_custom_badge TINYINT(1) NOT NULL DEFAULT 0,
+    show_custom_badge TINYINT(1) NOT NULL DEFAULT 0,
+    PRIMARY KEY (id),
+    UNIQUE KEY username_safe (username_safe),
+    KEY clan_id (clan_id)
+);
+
+CREATE TABLE user_stats (
+    user_id INT NOT NULL,
+    mode TINYINT NOT NULL,
+    ranked_score BIGINT NOT NULL DEFAULT 0,
+    total_score BIGINT NOT NULL DEFAULT 0,
+    playcount INT NOT NULL DEFAULT 0,
+    replays_watched INT NOT NULL DEFAULT 0,
+    total_hits INT NOT NULL DEFAULT 0,
+    avg_accuracy FLOAT NOT NULL DEFAULT 0,
+    pp INT NOT NULL DEFAULT 0,
+    playtime INT NOT NULL DEFAULT 0,
+    xh_count INT NOT NULL DEFAULT 0,
+    x_count INT NOT NULL DEFAULT 0,
+    sh_count INT NOT NULL DEFAULT 0,
+    s_count INT NOT NULL DEFAULT 0,
+    a_count INT NOT NULL DEFAULT 0,
+    b_count INT NOT NULL DEFAULT 0,
+    c_count INT NOT NULL DEFAULT 0,
+    d_count INT NOT NULL DEFAULT 0,
+    max_combo INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, mode),
+    KEY mode_user_id (mode, user_id)
+);
+
+CREATE TABLE tokens (
+    id INT NOT NULL AUTO_INCREMENT,
+    user INT NOT NULL,
+    privileges INT NOT NULL,
+    description VARCHAR(255) NOT NULL,
+    token VARCHAR(127) NOT NULL,
+    private TINYINT(1) NOT NULL,
+    last_updated INT NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE KEY token (token),
+    KEY user (user)
+);
+
+CREATE TABLE badges (
+    id INT NOT NULL AUTO_INCREMENT,
+    name VARCHAR(127) NOT NULL,
+    icon VARCHAR(127) NOT NULL,
+    colour VARCHAR(32) NOT NULL DEFAULT '',
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE user_badges (
+    id INT NOT NULL AUTO_INCREMENT,
+    user INT NOT NULL,
+    badge INT NOT NULL,
+    PRIMARY KEY (id),
+    KEY user (user)
+);
+
+CREATE TABLE tourmnt_badges (
+    id INT NOT NULL AUTO_INCREMENT,
+    name VARCHAR(127) NOT NULL,
+    icon VARCHAR(127) NOT NULL,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE user_tourmnt_badges (
+    id INT NOT NULL AUTO_INCREMENT,
+    user INT NOT NULL,
+    badge INT NOT NULL,
+    PRIMARY KEY (id),
+    KEY user (user)
+);
+
+CREATE TABLE clans (
+    id INT NOT NULL AUTO_INCREMENT,
+    name VARCHAR(32) NOT NULL,
+    tag VARCHAR(6) NOT NULL,
+    description VARCHAR(256) NOT NULL DEFAULT '',
+    icon VARCHAR(256) NOT NULL DEFAULT '',
+    background VARCHAR(256) NOT NULL DEFAULT '',
+    owner INT NOT NULL,
+    invite VARCHAR(8) NOT NULL DEFAULT '',
+    status TINYINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE users_relationships (
+    id INT NOT NULL AUTO_INCREMENT,
+    user1 INT NOT NULL,
+    user2 INT NOT NULL,
+    PRIMARY KEY (id),
+    KEY user1 (user1),
+    KEY user2 (user2)
+);
+
+CREATE TABLE lastfm_flags (
+    id INT NOT NULL AUTO_INCREMENT,
+    user_id INT NOT NULL,
+    timestamp INT NOT NULL,
+    flag_enum INT NOT NULL,
+    flag_text VARCHAR(512) NOT NULL,
+    PRIMARY KEY (id),
+    KEY user_id (user_id)
+);
+
+CREATE TABLE ip_user (
+    id INT NOT NULL AUTO_INCREMENT,
+    userid INT NOT NULL,
+    ip VARCHAR(45) NOT NULL,
+    occurencies INT NOT NULL DEFAULT 1,
+    PRIMARY KEY (id),
+    KEY userid (userid)
+);
+
+CREATE TABLE hw_user (
+    id INT NOT NULL AUTO_INCREMENT,
+    userid INT NOT NULL,
+    mac VARCHAR(32) NOT NULL,
+    unique_id VARCHAR(32) NOT NULL,
+    disk_id VARCHAR(32) NOT NULL,
+    occurencies INT NOT NULL DEFAULT 1,
+    activated TINYINT(1) NOT NULL DEFAULT 0,
+    PRIMARY KEY (id),
+    KEY userid (userid)
+);
+
+CREATE TABLE password_recovery (
+    id INT NOT NULL AUTO_INCREMENT,
+    k VARCHAR(80) NOT NULL,
+    u VARCHAR(32) NOT NULL,
+    t TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id),
+    KEY k (k),
+    KEY u (u)
+);
@@ -1,19 +1,40 @@
 #!/usr/bin/env python3
+import os
+import shutil
+import tempfile
+
 import uvicorn
 
 from app import settings
 
+# How long in-flight requests have to finish when a worker is stopped,
+# including when workers are replaced one by one on SIGHUP.
+GRACEFUL_SHUTDOWN_TIMEOUT = 30
+
 
 def main() -> int:
-    uvicorn.run(
-        "app.init_api:asgi_app",
-        reload=settings.CODE_HOTRELOAD,
-        server_header=False,
-        date_header=False,
-        host=settings.APP_HOST,
-        port=settings.APP_PORT,
-        access_log=False,
-    )
+    metrics_dir = None
+    if settings.APP_WORKERS > 1:
+        # Workers are separate processes, so their metrics are aggregated
+        # through files; this must be set before any of them start.
+        metrics_dir = tempfile.mkdtemp(prefix="users-service-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    try:
+        uvicorn.run(
+            "app.init_api:asgi_app",
+            reload=settings.CODE_HOTRELOAD,
+            workers=settings.APP_WORKERS,
+            timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+            server_header=False,
+            date_header=False,
+            host=settings.APP_HOST,
+            port=settings.APP_PORT,
+            access_log=False,
+        )
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
     return 0
 
 
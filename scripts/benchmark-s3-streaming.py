@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""\
+Benchmark whole-object vs. streaming S3 uploads and downloads.
+
+Measures throughput and peak (python-allocated) memory for a large object,
+using the service's S3 adapter. Run with the service's environment, with the
+AWS_S3_* variables pointing at a local S3 stand-in such as MinIO or moto
+(e.g. `moto_server -p 5000`); the bucket is created if it does not exist.
+
+Usage: PYTHONPATH=. ./scripts/benchmark-s3-streaming.py --size-mib 512
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+
+import aiobotocore.session
+
+from app import settings
+from app import state
+from app.adapters import aws_s3
+
+MIB = 1024 * 1024
+
+
+async def generate_chunks(size: int, chunk: bytes) -> AsyncIterator[bytes]:
+    for _ in range(size // len(chunk)):
+        yield chunk
+
+
+async def measure(name: str, size: int, func: Callable[[], Awaitable[object]]) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    await func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<28} "
+        f"{size / MIB / elapsed:>8.1f} MiB/s "
+        f"peak memory={peak / MIB:>8.1f} MiB",
+    )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mib", type=int, default=512)
+    parser.add_argument("--key", default="benchmarks/s3-streaming.bin")
+    args = parser.parse_args()
+
+    size = args.size_mib * MIB
+    chunk = os.urandom(MIB)
+
+    aws_session = aiobotocore.session.get_session()
+    async with aws_session.create_client(
+        service_name="s3",
+        region_name=settings.AWS_S3_REGION_NAME,
+        endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+        aws_access_key_id=settings.AWS_S3_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_S3_SECRET_ACCESS_KEY,
+    ) as s3_client:
+        state.s3_client = s3_client
+        try:
+            await s3_client.create_bucket(Bucket=settings.AWS_S3_BUCKET_NAME)
+        except s3_client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+        async def save_whole() -> None:
+            await aws_s3.save_object_data(args.key, chunk * (size // MIB))
+
+        async def save_streaming() -> None:
+            saved = await aws_s3.save_object_data_from_stream(
+                args.key,
+                generate_chunks(size, chunk),
+            )
+            assert saved
+
+        async def get_whole() -> None:
+            data = await aws_s3.get_object_data(args.key)
+            assert data is not None and len(data) == size
+
+        async def get_streaming() -> None:
+            chunks = await aws_s3.iter_object_data(args.key)
+            assert chunks is not None
+            read_size = 0
+            async for data in chunks:
+                read_size += len(data)
+            assert read_size == size
+
+        async def get_ranges() -> None:
+            for start in range(0, size, size // 16):
+                data = await aws_s3.get_object_data(
+                    args.key,
+                    byte_range=(start, start + MIB - 1),
+                )
+                assert data is not None and len(data) == MIB
+
+        await measure("upload (whole object)", size, save_whole)
+        await measure("upload (multipart stream)", size, save_streaming)
+        await measure("download (whole object)", size, get_whole)
+        await measure("download (stream)", size, get_streaming)
+        await measure("download (16 x 1MiB ranges)", 16 * MIB, get_ranges)
+
+        await aws_s3.delete_object(args.key)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(asyncio.run(main()))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""\
+Benchmark the in-memory user stats snapshot used for leaderboards.
+
+Builds a snapshot of synthetic (but realistically skewed) stats, then
+measures rank lookups and leaderboard pages against it.
+
+Usage: PYTHONPATH=. ./scripts/benchmark-stats-snapshot.py --rows 3000000
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+from app.common_types import RankingMetric
+from app.stats_snapshot import StatsSnapshot
+
+
+def build_snapshot(rows: int, seed: int) -> StatsSnapshot:
+    rng = random.Random(seed)
+    countries = [f"{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(200)]
+    country_weights = [1 / (i + 1) for i in range(len(countries))]
+
+    snapshot = StatsSnapshot()
+    for user_id, country in enumerate(
+        rng.choices(countries, weights=country_weights, k=rows),
+        start=1000,
+    ):
+        pp = int(rng.lognormvariate(7, 1.2))
+        snapshot.append(
+            user_id=user_id,
+            pp=pp,
+            ranked_score=pp * rng.randint(10_000, 200_000),
+            accuracy=rng.uniform(60, 100),
+            country=country,
+        )
+    return snapshot
+
+
+def measure(name: str, func: Callable[[], object], *, iterations: int) -> None:
+    samples: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+
+    samples.sort()
+    print(
+        f"{name:<32} "
+        f"p50={statistics.median(samples):>9.1f}us "
+        f"p99={samples[int(len(samples) * 0.99)]:>9.1f}us",
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=10_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    snapshot = build_snapshot(args.rows, args.seed)
+    print(f"generated {args.rows} rows in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    snapshot.build_orders()
+    print(f"built orders in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(args.seed)
+    user_ids = [
+        snapshot.user_ids[rng.randrange(len(snapshot))] for _ in range(args.iterations)
+    ]
+    user_id_iter = itertools.cycle(user_ids)
+
+    for metric in RankingMetric:
+        measure(
+            f"rank ({metric})",
+            lambda: snapshot.rank(next(user_id_iter), metric),
+            iterations=args.iterations // 2,
+        )
+        measure(
+            f"country rank ({metric})",
+            lambda: snapshot.rank(next(user_id_iter), metric, by_country=True),
+            iterations=args.iterations // 2,
+        )
+
+    iterations = args.iterations // 10
+    measure(
+        "top 50 (pp)",
+        lambda: snapshot.top(RankingMetric.PP, offset=0, limit=50),
+        iterations=iterations,
+    )
+    measure(
+        "top 50 at offset 1M (pp)",
+        lambda: snapshot.top(RankingMetric.PP, offset=1_000_000, limit=50),
+        iterations=iterations,
+    )
+    measure(
+        "country top 50 (pp)",
+        lambda: snapshot.top(RankingMetric.PP, offset=0, limit=50, country="AA"),
+        iterations=iterations,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""\
+Generate a large, realistic synthetic dataset, and bulk-load it into mysql.
+
+Each table is generated by its own process, from its own seeded random
+number generator, so the same arguments always produce the same data.
+Rows are written to tab-separated files and loaded with `LOAD DATA LOCAL
+INFILE` (which the server must allow, via `local_infile=ON`), or, with
+`--loader insert`, with multi-row INSERT statements.
+
+Users have ids counting up from 1000, usernames `bench_user_<id>` and
+share a password; see `benchmarks/dataset.py`.
+
+Usage: PYTHONPATH=. ./scripts/generate-synthetic-data.py --users 3000000 --truncate
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import os
+import random
+import tempfile
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import aiomysql
+
+from app import settings
+from app.common_types import UserPrivileges
+from benchmarks import dataset
+
+COUNTRIES = ["US", "JP", "DE", "PL", "BR", "KR", "CA", "GB", "FR", "RU", "AU", "PH"]
+COUNTRY_WEIGHTS = [1 / (rank + 1) for rank in range(len(COUNTRIES))]
+
+# Timestamps are generated relative to a fixed time, for reproducibility
+REFERENCE_TIMESTAMP = 1_767_225_600  # 2026-01-01T00:00:00Z
+
+BADGE_COUNT = 100
+TOURNAMENT_BADGE_COUNT = 30
+
+# Rows are inserted this many at a time with `--loader insert`
+INSERT_BATCH_SIZE = 5000
+
+Row = tuple[Any, ...]
+
+
+@dataclass
+class Table:
+    name: str
+    columns: list[str]
+    generate: Callable[[random.Random, int], Iterator[Row]]
+
+
+def user_ids(user_count: int) -> range:
+    return range(dataset.FIRST_USER_ID, dataset.FIRST_USER_ID + user_count)
+
+
+def clan_count(user_count: int) -> int:
+    return max(user_count // 100, 1)
+
+
+def generate_users(rng: random.Random, user_count: int) -> Iterator[Row]:
+    public = int(UserPrivileges.USER_PUBLIC | UserPrivileges.USER_NORMAL)
+    restricted = int(UserPrivileges.USER_NORMAL)
+
+    for user_id in user_ids(user_count):
+        username = dataset.make_username(user_id)
+        registered_at = REFERENCE_TIMESTAMP - rng.randrange(60 * 60 * 24 * 365 * 12)
+        yield (
+            user_id,
+            username,
+            username,
+            dataset.HASHED_PASSWORD,
+            f"{username}@example.com",
+            registered_at,
+            # most accounts are long inactive
+            max(
+                registered_at,
+                REFERENCE_TIMESTAMP - int(rng.expovariate(1 / 90) * 60 * 60 * 24),
+            ),
+            rng.choices(COUNTRIES, weights=COUNTRY_WEIGHTS)[0],
+            public if rng.random() > 0.02 else restricted,
+            rng.randrange(1, clan_count(user_count) + 1) if rng.random() < 0.3 else 0,
+            rng.randrange(4),
+        )
+
+
+def generate_user_stats(rng: random.Random, user_count: int) -> Iterator[Row]:
+    for user_id in user_ids(user_count):
+        for akatsuki_mode in dataset.AKATSUKI_MODES:
+            # most users only play one or two modes, and few play much
+            playcount = int(rng.paretovariate(1.2)) - 1 if rng.random() < 0.4 else 0
+            pp = int(rng.lognormvariate(7, 1.2)) if playcount else 0
+            yield (
+                user_id,
+                akatsuki_mode.value,
+                pp * rng.randint(10_000, 200_000),
+                pp * rng.randint(20_000, 400_000),
+                playcount,
+                playcount // 10,
+                pp * 300,
+                round(rng.uniform(60, 100), 4) if playcount else 0,
+                pp,
+                playcount * 180,
+                rng.randrange(2000) if playcount else 0,
+            )
+
+
+def generate_relationships(rng: random.Random, user_count: int) -> Iterator[Row]:
+    # a few users are followed by a large share of everyone (zipf-like);
+    # popularity is spread across ids rather than concentrated at low ids
+    popular_user_ids = list(user_ids(user_count))
+    rng.shuffle(popular_user_ids)
+    cum_weights = list(
+        itertools.accumulate(1 / (rank + 1) for rank in range(user_count)),
+    )
+
+    for user_id in user_ids(user_count):
+        following_count = min(int(rng.expovariate(1 / 5)), 500)
+        targets = set(
+            rng.choices(popular_user_ids, cum_weights=cum_weights, k=following_count),
+        )
+        targets.discard(user_id)
+        for target_user_id in sorted(targets):
+            yield (user_id, target_user_id)
+
+
+def generate_badges(rng: random.Random, user_count: int) -> Iterator[Row]:
+    for badge_id in range(1, BADGE_COUNT + 1):
+        yield (badge_id, f"Badge {badge_id}", "fa-star", rng.choice(["blue", "red"]))
+
+
+def generate_user_badges(rng: random.Random, user_count: int) -> Iterator[Row]:
+    for user_id in user_ids(user_count):
+        if rng.random() < 0.05:
+            for badge_id in rng.sample(range(1, BADGE_COUNT + 1), rng.randint(1, 3)):
+                yield (user_id, badge_id)
+
+
+def generate_tournament_badges(rng: random.Random, user_count: int) -> Iterator[Row]:
+    for badge_id in range(1, TOURNAMENT_BADGE_COUNT + 1):
+        yield (badge_id, f"Tournament {badge_id}", f"tournament-{badge_id}.png")
+
+
+def generate_user_tournament_badges(
+    rng: random.Random,
+    user_count: int,
+) -> Iterator[Row]:
+    for user_id in user_ids(user_count):
+        if rng.random() < 0.01:
+            yield (user_id, rng.randrange(1, TOURNAMENT_BADGE_COUNT + 1))
+
+
+def generate_clans(rng: random.Random, user_count: int) -> Iterator[Row]:
+    for clan_id in range(1, clan_count(user_count) + 1):
+        yield (
+            clan_id,
+            f"Clan {clan_id}",
+            f"C{clan_id}"[:6],
+            "",
+            rng.choice(user_ids(user_count)),
+            rng.randrange(4),
+        )
+
+
+def generate_lastfm_flags(rng: random.Random, user_count: int) -> Iterator[Row]:
+    for user_id in user_ids(user_count):
+        if rng.random() < 0.03:
+            for _ in range(rng.randint(1, 20)):
+                flag = 1 << rng.randrange(23)
+                yield (
+                    user_id,
+                    REFERENCE_TIMESTAMP - rng.randrange(60 * 60 * 24 * 365 * 5),
+                    flag,
+                    f"[{flag}] synthetic flag",
+                )
+
+
+def generate_ip_associations(rng: random.Random, user_count: int) -> Iterator[Row]:
+    for user_id in user_ids(user_count):
+        for _ in range(min(int(rng.expovariate(1 / 3)) + 1, 200)):
+            yield (
+                user_id,
+                f"{rng.randrange(1, 224)}.{rng.randrange(256)}."
+                f"{rng.randrange(256)}.{rng.randrange(256)}",
+                int(rng.paretovariate(1.5)),
+            )
+
+
+def generate_hwid_associations(rng: random.Random, user_count: int) -> Iterator[Row]:
+    for user_id in user_ids(user_count):
+        for _ in range(min(int(rng.expovariate(1 / 1.5)) + 1, 50)):
+            yield (
+                user_id,
+                rng.randbytes(16).hex(),
+                rng.randbytes(16).hex(),
+                rng.randbytes(16).hex(),
+                int(rng.paretovariate(1.5)),
+                int(rng.random() < 0.9),
+            )
+
+
+TABLES = [
+    Table(
+        "users",
+        [
+            "id",
+            "username",
+            "username_safe",
+            "password_md5",
+            "email",
+            "register_datetime",
+            "latest_activity",
+            "country",
+            "privileges",
+            "clan_id",
+            "favourite_mode",
+        ],
+        generate_users,
+    ),
+    Table(
+        "user_stats",
+        [
+            "user_id",
+            "mode",
+            "ranked_score",
+            "total_score",
+            "playcount",
+            "replays_watched",
+            "total_hits",
+            "avg_accuracy",
+            "pp",
+            "playtime",
+            "max_combo",
+        ],
+        generate_user_stats,
+    ),
+    Table("users_relationships", ["user1", "user2"], generate_relationships),
+    Table("badges", ["id", "name", "icon", "colour"], generate_badges),
+    Table("user_badges", ["user", "badge"], generate_user_badges),
+    Table("tourmnt_badges", ["id", "name", "icon"], generate_tournament_badges),
+    Table("user_tourmnt_badges", ["user", "badge"], generate_user_tournament_badges),
+    Table(
+        "clans",
+        ["id", "name", "tag", "description", "owner", "status"],
+        generate_clans,
+    ),
+    Table(
+        "lastfm_flags",
+        ["user_id", "timestamp", "flag_enum", "flag_text"],
+        generate_lastfm_flags,
+    ),
+    Table("ip_user", ["userid", "ip", "occurencies"], generate_ip_associations),
+    Table(
+        "hw_user",
+        ["userid", "mac", "unique_id", "disk_id", "occurencies", "activated"],
+        generate_hwid_associations,
+    ),
+]
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+
+
+def write_table_file(table_name: str, user_count: int, seed: int, path: Path) -> int:
+    """Generate a table's rows into a tab-separated file; returns the row count."""
+    table = TABLES_BY_NAME[table_name]
+    # seeded per table, so tables are reproducible independently of each other
+    rng = random.Random(f"{seed}:{table.name}")
+
+    row_count = 0
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f, delimiter="\t", lineterminator="\n")
+        for row in table.generate(rng, user_count):
+            writer.writerow(row)
+            row_count += 1
+    return row_count
+
+
+def read_table_file(path: Path) -> Iterator[list[str]]:
+    with path.open(newline="") as f:
+        yield from csv.reader(f, delimiter="\t", lineterminator="\n")
+
+
+async def connect() -> Any:
+    return await aiomysql.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        user=settings.DB_USER,
+        password=settings.DB_PASS,
+        db=settings.DB_NAME,
+        autocommit=True,
+        local_infile=True,
+    )
+
+
+async def load_table(table: Table, path: Path, *, loader: str) -> None:
+    connection = await connect()
+    try:
+        async with connection.cursor() as cursor:
+            await cursor.execute("SET unique_checks = 0, foreign_key_checks = 0")
+
+            if loader == "load-data":
+                await cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {table.name} "
+                    "FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+                    f"({', '.join(table.columns)})",
+                    (str(path),),
+                )
+            else:
+                # aiomysql rewrites INSERT ... VALUES executemany calls into
+                # multi-row statements
+                query = (
+                    f"INSERT INTO {table.name} ({', '.join(table.columns)}) "
+                    f"VALUES ({', '.join(['%s'] * len(table.columns))})"
+                )
+                rows = read_table_file(path)
+                while batch := list(itertools.islice(rows, INSERT_BATCH_SIZE)):
+                    await cursor.executemany(query, batch)
+    finally:
+        connection.close()
+
+
+async def truncate_tables(table_names: list[str]) -> None:
+    connection = await connect()
+    try:
+        async with connection.cursor() as cursor:
+            for table_name in table_names:
+                await cursor.execute(f"TRUNCATE TABLE {table_name}")
+    finally:
+        connection.close()
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=list(TABLES_BY_NAME),
+        default=list(TABLES_BY_NAME),
+    )
+    parser.add_argument(
+        "--loader", choices=["load-data", "insert"], default="load-data"
+    )
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="empty the tables before loading",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        help="keep the generated files in this directory",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = args.output_dir or Path(temp_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {name: output_dir / f"{name}.tsv" for name in args.tables}
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            row_counts = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor,
+                        write_table_file,
+                        name,
+                        args.users,
+                        args.seed,
+                        paths[name],
+                    )
+                    for name in args.tables
+                ),
+            )
+        for name, row_count in zip(args.tables, row_counts):
+            print(f"generated {row_count:>12,} rows for {name}")
+        print(f"generated data in {time.perf_counter() - start:.1f}s")
+
+        if args.truncate:
+            await truncate_tables(args.tables)
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                load_table(TABLES_BY_NAME[name], paths[name], loader=args.loader)
+                for name in args.tables
+            ),
+        )
+        print(f"loaded data in {time.perf_counter() - start:.1f}s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(asyncio.run(main()))